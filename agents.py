@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+from agno.agent import Agent
+from agno.models.openai import OpenAIChat
+
+from analysis_schema import ANALYSIS_RESPONSE_FORMAT
+from screening import ANALYZER_MODEL_ID
+
+
+# Builds the analyzer without touching session state, so worker threads, the service and the CLI can call it.
+# The model is held to the ResumeAnalysis schema (OpenAI structured outputs); the raw JSON string is still
+# what the agent returns, so screening.run_analysis decodes and validates it the same way for any backend.
+# For screening.run_multi_role_analysis, pass response_format=MULTI_ROLE_RESPONSE_FORMAT.
+def build_resume_analyzer(api_key: str, http_client = None, base_url: Optional[str] = None,
+                          model_id: str = ANALYZER_MODEL_ID,
+                          response_format: Dict[str, Any] = ANALYSIS_RESPONSE_FORMAT) -> Agent:
+    return Agent(
+        model = OpenAIChat(
+            id=model_id,
+            api_key = api_key,
+            http_client = http_client,
+            base_url = base_url,
+            request_params = {"response_format": response_format}
+        ),
+        description = "You are a expert Technical Recruiter who analyzes resumes",
+        instructions=[
+            "Analyze the resume against the provided job requirements",
+            "Be linient with AI/ML candidates who show strong potential",
+            "Consider project experience as valid experience",
+            "Value hands-on-experience with key technologies",
+            "Return the result in a JSON response with selection decision and feedback"
+        ],
+        # Markdown formatting is what wraps the JSON in code fences
+        markdown=False
+    )
+
+# The agent only drafts; the outbox sends, so it has no tools
+def build_email_agent(api_key: str, company_name: str, http_client = None, base_url: Optional[str] = None) -> Agent:
+    return Agent(
+        model = OpenAIChat(
+            id = "gpt-4.1-nano",
+            api_key=api_key,
+            http_client = http_client,
+            base_url = base_url
+        ),
+        description="You are a expert technical recruiter coordinator handling email communications.",
+        instructions=[
+            "Draft and send professional recruitment emails",
+            "Act like a huma writing an email and eliminate unnecessary capital letters",
+            "Maintain a friendly yet professional tone",
+            f"Always end the mail with exactly: 'Best Regards\nTeam HR at {company_name}",
+            "Never include the sender's or receiver's name in the signature",
+            f"The name of the company is {company_name}"
+        ],
+        markdown=True
+    )
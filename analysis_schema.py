@@ -0,0 +1,283 @@
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+# Fields an analysis cannot be used without; the rest fall back to their defaults
+REQUIRED_FIELDS = ("selected", "feedback")
+
+
+class ResumeAnalysis(BaseModel):
+    """The analyzer's verdict; pydantic's compiled validator also coerces "true"/"yes" and the like"""
+
+    selected: bool
+    feedback: str
+    matching_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+    experience_level: str = ""
+
+
+# OpenAI structured outputs: the model can only produce an object of this shape.
+# Strict mode wants every property listed as required and no extra properties.
+# MULTI_ROLE_RESPONSE_FORMAT below is the same for one resume judged against several roles.
+ANALYSIS_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "resume_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "selected": {"type": "boolean"},
+                "feedback": {"type": "string"},
+                "matching_skills": {"type": "array", "items": {"type": "string"}},
+                "missing_skills": {"type": "array", "items": {"type": "string"}},
+                "experience_level": {"type": "string", "enum": ["junior", "mid", "senior"]},
+            },
+            "required": ["selected", "feedback", "matching_skills", "missing_skills", "experience_level"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class RoleFit(BaseModel):
+    """One role's verdict within a multi-role analysis"""
+
+    role: str
+    selected: bool
+    feedback: str = ""
+    matching_skills: List[str] = Field(default_factory=list)
+    missing_skills: List[str] = Field(default_factory=list)
+
+
+MULTI_ROLE_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "multi_role_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "roles": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "role": {"type": "string"},
+                            "selected": {"type": "boolean"},
+                            "feedback": {"type": "string"},
+                            "matching_skills": {"type": "array", "items": {"type": "string"}},
+                            "missing_skills": {"type": "array", "items": {"type": "string"}},
+                        },
+                        "required": ["role", "selected", "feedback", "matching_skills", "missing_skills"],
+                        "additionalProperties": False,
+                    },
+                },
+                "experience_level": {"type": "string", "enum": ["junior", "mid", "senior"]},
+            },
+            "required": ["roles", "experience_level"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def repair_json(text: str) -> str:
+    """
+    Cheap local fixes for the usual ways a model breaks its JSON: markdown fences or prose
+    around the object, trailing commas, and an answer cut off mid-object (open brackets are
+    closed, or the object is cut back to its last complete member).
+    Raises ValueError when no object can be recovered.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No JSON object in the response")
+    text = text[start:]
+    closers: List[str] = []
+    # (position, closers open there) of every comma outside a string: places the object can be cut back to
+    commas: List[tuple] = []
+    in_string = escaped = False
+    end = None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if closers:
+                closers.pop()
+            if not closers:
+                end = i + 1
+                break
+        elif ch == ",":
+            commas.append((i, tuple(closers)))
+    if end is not None:
+        candidates = [text[:end]]
+    else:
+        # A string cut off mid-way is dropped rather than closed, so a half sentence of feedback
+        # comes back as a missing field instead of being sent to the candidate
+        candidates = [] if in_string else [text + "".join(reversed(closers))]
+        candidates += [text[:i] + "".join(reversed(open_)) for i, open_ in reversed(commas)]
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+            try:
+                json.loads(attempt)
+                return attempt
+            except ValueError:
+                continue
+    raise ValueError("Could not repair the JSON response")
+
+
+@dataclass
+class DecodedAnalysis:
+    """
+    What could be recovered from one or more analyzer answers: the raw `fields`, the names
+    of the fields still missing or invalid, and the validated `result` once there are none.
+    """
+
+    fields: Dict[str, Any] = field(default_factory=dict)
+    invalid: List[str] = field(default_factory=lambda: list(REQUIRED_FIELDS))
+    result: Optional[Dict[str, Any]] = None
+    repaired: bool = False
+
+    def merge(self, other: "DecodedAnalysis") -> "DecodedAnalysis":
+        """Fills this answer's invalid fields from a later one, keeping everything already valid"""
+        fields = dict(self.fields)
+        fields.update({name: other.fields[name] for name in self.invalid if name in other.fields})
+        return validate_fields(fields, repaired=self.repaired or other.repaired)
+
+
+def validate_fields(fields: Dict[str, Any], repaired: bool = False) -> DecodedAnalysis:
+    """
+    Validates the fields of an answer. Optional fields normally fall back to their defaults,
+    but not in a repaired answer: one cut back to its last complete member may have lost
+    them, so every field it lacks counts as invalid and is asked for again.
+    """
+    absent = [name for name in ResumeAnalysis.model_fields if name not in fields] if repaired else []
+    try:
+        result = ResumeAnalysis.model_validate(fields).model_dump()
+    except ValidationError as e:
+        invalid = sorted({str(error["loc"][0]) for error in e.errors() if error["loc"]} | set(absent))
+        return DecodedAnalysis(fields=fields, invalid=invalid or list(REQUIRED_FIELDS), repaired=repaired)
+    if absent:
+        return DecodedAnalysis(fields=fields, invalid=sorted(absent), repaired=repaired)
+    return DecodedAnalysis(fields=fields, invalid=[], result=result, repaired=repaired)
+
+
+def decode_analysis(assistant_message: Optional[str]) -> DecodedAnalysis:
+    """Decodes and validates an analyzer answer, repairing the JSON locally when it does not parse"""
+    if not assistant_message:
+        return DecodedAnalysis()
+    repaired = False
+    try:
+        fields = json.loads(assistant_message)
+    except ValueError:
+        try:
+            fields = json.loads(repair_json(assistant_message))
+            repaired = True
+        except ValueError:
+            return DecodedAnalysis()
+    if not isinstance(fields, dict):
+        return DecodedAnalysis()
+    return validate_fields(fields, repaired=repaired)
+
+
+def decode_role_fits(assistant_message: Optional[str]) -> Tuple[Dict[str, Dict[str, Any]], str, bool]:
+    """
+    Decodes a multi-role answer into (valid verdicts by role, experience level, repaired).
+    A role whose entry is missing or invalid is simply absent, so the caller can ask again for
+    just those roles; the JSON is repaired locally first, as for single-role answers.
+    """
+    if not assistant_message:
+        return {}, "", False
+    repaired = False
+    try:
+        fields = json.loads(assistant_message)
+    except ValueError:
+        try:
+            fields = json.loads(repair_json(assistant_message))
+            repaired = True
+        except ValueError:
+            return {}, "", False
+    if not isinstance(fields, dict) or not isinstance(fields.get("roles"), list):
+        return {}, "", repaired
+    fits = {}
+    for entry in fields["roles"]:
+        try:
+            fit = RoleFit.model_validate(entry).model_dump()
+        except ValidationError:
+            continue
+        fits.setdefault(fit["role"], fit)
+    return fits, str(fields.get("experience_level") or ""), repaired
+
+
+def build_retry_prompt(prompt: str, invalid: List[str]) -> str:
+    """Asks again for just the fields that were missing or invalid in the previous answer"""
+    names = ", ".join(f'"{name}"' for name in invalid)
+    return f"""{prompt}
+            Your previous answer could not be used because these fields were missing or invalid: {names}.
+            Return ONLY a JSON object with the keys {names}.
+            """
+
+
+class ParseStats:
+    """
+    Counts how analyzer answers were decoded: valid as sent, fixed by local repair, completed
+    by a targeted retry, or given up on. Thread-safe; the process keeps one in `parse_stats`.
+    """
+
+    OUTCOMES = ("clean", "repaired", "retried", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.OUTCOMES, 0)
+        self.retried_answers = 0
+        self.retries = 0
+
+    def record(self, decoded: DecodedAnalysis, retries: int) -> None:
+        if decoded.invalid:
+            outcome = "failed"
+        elif retries:
+            outcome = "retried"
+        else:
+            outcome = "repaired" if decoded.repaired else "clean"
+        with self._lock:
+            self.counts[outcome] += 1
+            self.retried_answers += bool(retries)
+            self.retries += retries
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = dict.fromkeys(self.OUTCOMES, 0)
+            self.retried_answers = 0
+            self.retries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            rate = lambda n: n / total if total else 0.0
+            return {
+                "responses": total,
+                **self.counts,
+                "retries": self.retries,
+                # Answers a plain json.loads plus key check would have rejected
+                "parse_failure_rate": rate(total - self.counts["clean"]),
+                "retry_rate": rate(self.retried_answers),
+                "failure_rate": rate(self.counts["failed"]),
+            }
+
+
+parse_stats = ParseStats()
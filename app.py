@@ -1,101 +1,45 @@
+import time
+# Taken before any other import, so the first run's figure covers every module the app loads
+_RUN_STARTED = time.perf_counter()
+
 import os
+import sys
 import json
-import time
-import pytz
-import PyPDF2
-import requests
+import uuid
+import hashlib
+import importlib
+import statistics
+import threading
 import streamlit as st
 
-from agno.agent import Agent
+from collections import deque
+from datetime import datetime
+from functools import partial
 from phi.utils.log import logger
-from phi.tools.zoom import ZoomTool
-from agno.tools.email import EmailTools
-from datetime import datetime, timedelta
-from agno.models.openai import OpenAIChat
-from streamlit_pdf_viewer import pdf_viewer
-from typing import Literal, Tuple, Dict, Optional
-
-# Class for controlling zoom access
-class CustomZoomTool(ZoomTool):
-    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None,
-             client_secret: Optional[str] = None, name: str = "zoom_tool"):
-        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
-        self.token_url = "https://zoom.us/oauth/token"
-        self.access_token = None
-        self.token_expires_at = 0
-        
-# This method fetches and returns a valid Zoom access token, either from cache or by making an API call.
-    def get_access_token(self) -> str:
-        # If token exists and hasn't expired, return it (avoids unnecessary API calls).
-        if self.access_token and time.time() < self.token_expires_at:
-            return str(self.access_token)
-        # Sets up headers and payload for the Zoom OAuth token request.
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        data = {
-            "grant_type": "account_credentials", 
-            "account_id": self.account_id
-            }
-        # Makes a POST request to Zoom's token endpoint using the client secret for authentication.
-        try:
-            resp = requests.post(
-                self.token_url, 
-                headers= headers, 
-                data = data, 
-                auth = (self.client_secret)
-            )
-            
-            resp.raise_for_status()
-            
-            token_info = resp.json()
-            
-            self.access_token = token_info["access_token"]
-            expires_in = token_info["expires_in"]
-            self.token_expires_at = time.time() + expires_in + 60
-            
-            self._set_parent_token(str(self.access_token))
-            return str(self.access_token)
-        # Logs and safely handles any network or response issues.
-        except requests.RequestException as e:
-            logger.error(f"Error Fetching access token: {e}")
-            return ""
-    
-    def _set_parent_token(self, token: str) -> None:
-        """
-        Helper Function to set the token in parent ZoomTool class
-        """
-        if token:
-            self._ZoomTool_access_token = token
-            
-# ROLE Requirements as a constant dictionary
-
-ROLE_REQUIREMENTS: Dict[str, str] = {
-    "ai_ml_engineer": """
-        Required Skills:
-        - Python, Pytorch/Tensorflow
-        - Machine Learning Algorithms and Frameworks
-        - Deep Learning and Neural Networks
-        - Data Preprocessing and Analysis
-        - MLOps and Model Deployment
-        - RAG, LLMs, Finetuning and Prompt Engineering
-    """,
-    "frontend_engineer":"""
-        Required Skills:
-        - React/Vue.js/Angular
-        - HTML5, CSS3, JavaScript/TypeScript
-        - Responsive Design
-        - State Management
-        - Frontend Testing
-    """,
-    "backend_engineer": """
-        Required Skills:
-        - Python/Java/Node.js
-        - REST APIs
-        - Database Design and Management
-        - System Architecture
-        - Cloud Services (AWS/GCP/Azure)
-        - Kubernetes, Docker, CI/CD
-    """
-}
+from typing import TYPE_CHECKING, Any, Tuple, Dict, List, Optional
+from screening import ANALYZER_MODEL_ID, run_analysis
+from role_registry import role_registry
+from batch_screening import BatchScreener, collect_from_folder, collect_from_uploads
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+from pdf_extraction import available_tiers, render_page_images, tiered_extractor
+from prefilter import Prefilter
+from candidate_store import CandidateStore, DEFAULT_STORE_PATH
+from prompt_compaction import PromptCompactor, DEFAULT_TOKEN_BUDGET
+from resource_pool import LeasedResource, ResourcePool, fingerprint
+from email_outbox import EmailOutbox, DEFAULT_OUTBOX_PATH
+from analysis_schema import ANALYSIS_RESPONSE_FORMAT
+from model_routing import role_routes
+from application_workflow import ApplicationWorkflow, DEFAULT_WORKFLOW_PATH
+from pipeline import ScreeningPipeline, build_outbox, build_scheduler, build_workflow, contact_key
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from interview_scheduler import InterviewScheduler
+
+# Uploads whose extracted text and preview stay memoized, and for how long
+UPLOAD_CACHE_ENTRIES = 64
+UPLOAD_CACHE_TTL = 3600
+PREVIEW_PAGES = 2
 
 #  safely initialize only the required keys in st.session_state with default values, preventing errors during use in a Streamlit app.
 def init_session_state() -> None:
@@ -112,204 +56,373 @@ def init_session_state() -> None:
         "email_sender": "",
         "email_passkey": "",
         "company_name": "",
-        "current_pdf": None
+        "current_pdf": None,
+        "analysis_result": None,
+        "trace_id": None
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
             
+class RunTimings:
+    """
+    How long each script run of this process spent importing and rendering, newest last.
+    Streamlit re-executes the whole script on every interaction: the first run pays for the
+    imports, later runs should only pay for rendering. Modules loaded through `lazy_import`
+    are recorded with their one-off cost.
+    """
+
+    def __init__(self, keep: int = 100):
+        self.runs: deque = deque(maxlen=keep)
+        self.lazy_imports: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, import_seconds: float, render_seconds: float) -> None:
+        with self._lock:
+            self.runs.append((import_seconds, render_seconds))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = list(self.runs)
+            lazy = dict(self.lazy_imports)
+        ms = lambda seconds: round(seconds * 1000, 1)
+        later = [imports + render for imports, render in runs[1:]]
+        return {
+            "runs": len(runs),
+            "first_run_ms": {"imports": ms(runs[0][0]), "render": ms(runs[0][1])} if runs else None,
+            "last_run_ms": {"imports": ms(runs[-1][0]), "render": ms(runs[-1][1])} if runs else None,
+            "later_runs_median_ms": ms(statistics.median(later)) if later else None,
+            "lazy_imports_ms": {module: ms(seconds) for module, seconds in lazy.items()},
+        }
+
+# One per process, so the very first run (the cold start) is kept
+@st.cache_resource
+def get_run_timings() -> RunTimings:
+    return RunTimings()
+
+def lazy_import(module: str) -> Any:
+    """Imports a heavy module (agents and their SDKs, the PDF viewer) on first use instead of at startup"""
+    loaded = sys.modules.get(module)
+    if loaded is not None:
+        return loaded
+    started = time.perf_counter()
+    loaded = importlib.import_module(module)
+    get_run_timings().lazy_imports[module] = time.perf_counter() - started
+    return loaded
+
+def render_timings_panel() -> None:
+    """
+    Shows what the cold start cost and how little later reruns take
+    """
+    with st.expander("⚡ Run timings"):
+        stats = get_run_timings().stats()
+        if not stats["runs"]:
+            st.caption("Timings appear after the first run")
+            return
+        st.caption(f"First run: {stats['first_run_ms']['imports']} ms importing, {stats['first_run_ms']['render']} ms rendering")
+        st.caption(f"Last run: {stats['last_run_ms']['imports']} ms importing, {stats['last_run_ms']['render']} ms rendering")
+        if stats["later_runs_median_ms"] is not None:
+            st.caption(f"Median of the {stats['runs'] - 1} later runs: {stats['later_runs_median_ms']} ms")
+        for module, ms in stats["lazy_imports_ms"].items():
+            st.caption(f"Loaded {module} on first use: {ms} ms")
+
 # This function returns a function if the API is already initialized
-def create_resume_analyzer() -> Agent:
-    """Creates and returns a resume analysis agent"""
+# One pool per process: HTTP clients and the Zoom session are shared by every session, idle agents reused
+@st.cache_resource
+def get_resource_pool() -> ResourcePool:
+    return ResourcePool()
+
+def create_resume_analyzer(model_id: str = ANALYZER_MODEL_ID, response_format: Dict = ANALYSIS_RESPONSE_FORMAT) -> LeasedResource:
+    """Creates and returns a resume analysis agent running on `model_id`, answering in `response_format`"""
     if not st.session_state.openai_api_key:
         st.error("Please enter your OpenAI API Key before procedding!")
         return None
-    return Agent(
-        model = OpenAIChat(id="gpt-4.1-nano", api_key = st.session_state.openai_api_key),
-        description = "You are a expert Technical Recruiter who analyzes resumes",
-        instructions=[
-            "Analyze the resume against the provided job requirements",
-            "Be linient with AI/ML candidates who show strong potential",
-            "Consider project experience as valid experience",
-            "Value hands-on-experience with key technologies",
-            "Return the result in a JSON response with selection decision and feedback"
-        ],
-        markdown=True
-    )
-    
-def create_email_agent() -> Agent:
-    return Agent(
-        model = OpenAIChat(
-            id = "gpt-4.1-nano",
-            api_key=st.session_state.openai_api_key
-        ),
-        description="You are a expert technical recruiter coordinator handling email communications.",
-        instructions=[
-            "Draft and send professional recruitment emails",
-            "Act like a huma writing an email and eliminate unnecessary capital letters",
-            "Maintain a friendly yet professional tone",
-            f"Always end the mail with exactly: 'Best Regards\nTeam HR at {st.session_state.company_name}",
-            "Never include the sender's or receiver's name in the signature",
-            f"The name of the company is {st.session_state.company_name}"
-        ],
-        markdown=True, 
-        show_tool_calls=True
+    pool = get_resource_pool()
+    api_key = st.session_state.openai_api_key
+    # Agents keep per-run state, so each analysis (from any session or worker thread) runs on one of its own
+    return pool.leased(
+        "resume_analyzer",
+        (fingerprint(api_key), model_id, response_format["json_schema"]["name"]),
+        lambda: lazy_import("agents").build_resume_analyzer(api_key, http_client = pool.httpx_client(), model_id = model_id,
+                                                            response_format = response_format)
     )
 
-def create_scheduler_agent() -> Agent:
-    zoom_tools = CustomZoomTool(
-        account_id = st.session_state.zoom_account_id,
-        client_id = st.session_state.zoom_client_id,
-        client_secret = st.session_state.zoom_client_secret
-    )
-    
-    return Agent(
-        name = "Interview Scheduler",
-        model = OpenAIChat(
-            id = "gpt-4o-mini",
-            api_key = st.session_state.openai_api_key
-        ),
-        tools = [zoom_tools],
-        description = "You are an interview scheduling coordinator",
-        instructions = [
-            "You are an expert at scheduling technical interviews using zoom",
-            "Schedule interviews during business hours (9AM - 5PM IST)",
-            "Create meetings with proper titles and descriptions",
-            "Ensure all meeting details are included in responses",
-            "Use ISO 8601 format for dates",
-            "Handle scheduling errors gracefully"
-        ],
-        markdown=True,
-        show_tool_calls=True
-    )
-    
-def extract_text_from_pdf(pdf_file) -> str:
+def upload_digest(upload: Any) -> str:
+    """Content hash of an upload, computed once per uploaded file rather than on every rerun"""
+    digests = st.session_state.setdefault("upload_digests", {})
+    if upload.file_id not in digests:
+        digests[upload.file_id] = hashlib.sha256(upload.getvalue()).hexdigest()
+    return digests[upload.file_id]
+
+# Keyed by the upload's hash (the leading underscore keeps Streamlit from hashing the bytes again),
+# so a re-uploaded or re-opened resume is neither parsed nor rendered twice
+@st.cache_data(max_entries = UPLOAD_CACHE_ENTRIES, ttl = UPLOAD_CACHE_TTL, show_spinner = False)
+def cached_resume_text(digest: str, _pdf_bytes: bytes) -> str:
+    return tiered_extractor.extract(_pdf_bytes)
+
+@st.cache_data(max_entries = UPLOAD_CACHE_ENTRIES, ttl = UPLOAD_CACHE_TTL, show_spinner = False)
+def cached_preview(digest: str, _pdf_bytes: bytes) -> List[bytes]:
+    return render_page_images(_pdf_bytes, max_pages = PREVIEW_PAGES)
+
+def extract_text_from_pdf(pdf_bytes: bytes, digest: str) -> str:
     try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""  # Initialize the variable here
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:  # Some pages may return None
-                text += page_text
-        return text
+        return cached_resume_text(digest, pdf_bytes)
     except Exception as e:
         st.error(f"Error while parsing PDF File: {str(e)}")
         return ""
 
+def render_pdf_preview(pdf_bytes: bytes, digest: str) -> None:
+    """Page images rendered once per upload; the PDF.js viewer only when pdfium is not installed"""
+    images = cached_preview(digest, pdf_bytes)
+    if images:
+        st.image(images, use_container_width = True)
+    else:
+        lazy_import("streamlit_pdf_viewer").pdf_viewer(pdf_bytes)
+
+
+# One cache per process, shared by every session and rerun
+@st.cache_resource
+def get_analysis_cache() -> AnalysisCache:
+    return AnalysisCache(os.getenv("ANALYSIS_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+# Shared so the pre-filter's pass rate and saved calls accumulate across sessions
+@st.cache_resource
+def get_prefilter() -> Prefilter:
+    return Prefilter()
 
-def analyze_resume(resume_text: str, 
-                   role: Literal["ai_ml_engineer", "frontend_engineer", "backend_engineer"],
-                   analyzer: Agent) -> Tuple[bool, str]:
+# Shared so the before/after token totals accumulate across sessions
+@st.cache_resource
+def get_compactor() -> PromptCompactor:
+    return PromptCompactor(DEFAULT_TOKEN_BUDGET)
+
+# Every screened candidate lands here so the pool can be ranked after the session ends
+@st.cache_resource
+def get_candidate_store() -> CandidateStore:
+    return CandidateStore(os.getenv("CANDIDATE_STORE_PATH", DEFAULT_STORE_PATH))
+
+# The UI drives the same pipeline as the HTTP service and the CLI, in this process. It shares
+# their SQLite stores, so it can run next to `cli.py serve`, but it does not call the service
+def current_pipeline() -> ScreeningPipeline:
+    return ScreeningPipeline(
+        analyzer_factory = create_resume_analyzer,
+        cache = get_analysis_cache(),
+        prefilter = get_prefilter(),
+        compactor = get_compactor(),
+        store = get_candidate_store(),
+        outbox = current_outbox(),
+        scheduler = current_scheduler(),
+        routes = role_routes()
+    )
+
+def analyze_resume(pipeline: ScreeningPipeline, resume_text: str,
+                   role: str) -> Tuple[bool, str]:
     try:
-        resp = analyzer.run(
-            f"""Please analyze this resume against the following requirements and provide your response in valid JSON format:
-            Role Requirements:
-            {ROLE_REQUIREMENTS[role]}
-            Resume Text:
-            {resume_text}
-            
-            Your response must be a valid JSON object, just like this:
-            {{
-                "selected": true,
-                "feedback": "The resume shows strong alignment with the AI/ML Engineer role, particularly in TensorFlow and Python.",
-                "matching_skills": ["Python", "TensorFlow", "Scikit-learn"],
-                "missing_skills": ["Kubernetes", "Docker"],
-                "experience_level": "mid"
-            }}
-            
-            Evaluation Criteria:
-            1. Match at least 70% of required skills.
-            2. Consider both theoritical knowledge and pratical knowledge.
-            3. Value project experience and real-world applications.
-            4. Consider transferrable skills from similar technologies.
-            5. Look for evidence for continuous learning and adaptability.
-            Important: Return ONLY the JSON object without any formatting or backticks.
-            """
-        )
-        
-        assistant_message = next((msg.content for msg in resp.messages if msg.role == "assistant"), None)
-        
-        if not assistant_message:
-            raise ValueError("No assistant message found in the response")
-        result = json.loads(assistant_message.strip())
-        if not isinstance(result, dict) or not all(k in result for k in ["selected", "feedback"]):
-            raise ValueError("Invalid Response Format")
+        result = pipeline.analyze(resume_text, role)
+        st.session_state.analysis_result = result
         return result["selected"], result["feedback"]
     except (json.JSONDecodeError, ValueError) as e:
         st.error(f"Error, while decoding JSON or due to format: {str(e)}")
         return False, f"Error while analyzing resume: {str(e)}"
 
-def send_selection_email(email_agent: Agent, to_email: str, role: str) -> None:
+# One scheduler per Zoom account, so every session books against the same calendar
+@st.cache_resource
+def get_interview_scheduler(zoom_account_id: str, zoom_client_id: str, zoom_client_secret: str) -> "InterviewScheduler":
+    return build_scheduler(zoom_account_id, zoom_client_id, zoom_client_secret, get_resource_pool(),
+                           path = os.getenv("INTERVIEW_SCHEDULE_PATH") or None,
+                           interviewers_path = os.getenv("INTERVIEWERS_PATH", ""))
+
+def current_scheduler() -> "InterviewScheduler":
+    return get_interview_scheduler(
+        st.session_state.zoom_account_id,
+        st.session_state.zoom_client_id,
+        st.session_state.zoom_client_secret
+    )
+
+# One outbox per sender account; its workers draft and send in the background. How emails are
+# drafted is a server setting (LLM_DRAFTS), so sessions never open a second outbox on the file
+@st.cache_resource
+def get_outbox(sender_email: str, email_passkey: str, api_key: str, company_name: str) -> EmailOutbox:
+    return build_outbox(sender_email, email_passkey, api_key, company_name, get_resource_pool(),
+                        llm_drafts = os.getenv("LLM_DRAFTS", "").lower() in ("1", "true", "yes"),
+                        path = os.getenv("OUTBOX_PATH", DEFAULT_OUTBOX_PATH))
+
+def current_outbox() -> EmailOutbox:
+    return get_outbox(
+        st.session_state.email_sender,
+        st.session_state.email_passkey,
+        st.session_state.openai_api_key,
+        st.session_state.company_name
+    )
+
+# One workflow per outbox/scheduler pair; the application state lives in SQLite, not in the session
+@st.cache_resource
+def get_application_workflow(sender_email: str, email_passkey: str, api_key: str, company_name: str,
+                             zoom_account_id: str, zoom_client_id: str, zoom_client_secret: str) -> ApplicationWorkflow:
+    return build_workflow(
+        get_outbox(sender_email, email_passkey, api_key, company_name),
+        get_interview_scheduler(zoom_account_id, zoom_client_id, zoom_client_secret),
+        path = os.getenv("APPLICATION_WORKFLOW_PATH", DEFAULT_WORKFLOW_PATH)
+    )
+
+def current_workflow() -> ApplicationWorkflow:
+    return get_application_workflow(
+        st.session_state.email_sender,
+        st.session_state.email_passkey,
+        st.session_state.openai_api_key,
+        st.session_state.company_name,
+        st.session_state.zoom_account_id,
+        st.session_state.zoom_client_id,
+        st.session_state.zoom_client_secret
+    )
+
+def send_rejection_email(outbox: EmailOutbox, to_email : str, role : str, feedback : str,
+                         missing_skills: Optional[List[str]] = None, candidate: Optional[str] = None) -> bool:
     """
-    Send a selection email with a congratuations.
+    Queue a rejection mail with constructive feedback. Returns False if it was already queued,
+    for this candidate or, with `candidate`, for the earlier submission this one repeats.
     """
-    email_agent.run(
-        f"""
-        Send an email to {to_email} regarding their selection for the {role} position.
-        The email should:
-        1. Congratulate them on being selected.
-        2. Explain the next steps in the process.
-        3. Mention that they will receive interview details shortly.
-        4. The name of the company is {st.session_state.company_name}.
-        """
-    )
+    context = {"feedback": feedback, "missing_skills": missing_skills or []}
+    _, created = outbox.enqueue(to_email, role, "rejected", context = context, candidate = candidate)
+    return created
+    
+def process_application(workflow: ApplicationWorkflow, candidate_email: str, role: str,
+                        candidate: Optional[str] = None) -> None:
+    """
+    Queue the selection email and book the interview (in an interviewer's working hours, with a Zoom meeting) as one
+    resumable application. Both run at once; steps finished on an earlier attempt are not run again.
+    Both go to `candidate_email`; with `candidate`, the application is keyed on that instead.
+    """
+    application_id, _ = workflow.submit(candidate or candidate_email, role, deliver_to = candidate_email)
+    application = workflow.run([application_id])[0]
+    email_step, interview_step = application["steps"]["selection_email"], application["steps"]["interview"]
+    if email_step["status"] == "done":
+        st.write("✅ Confirmation email queued!" if email_step["result"].get("queued") else "✅ Confirmation email already sent")
+    if interview_step["status"] == "done" and not interview_step["result"].get("skipped"):
+        slot = interview_step["result"]
+        st.success(f"Interview Scheduled for {datetime.fromisoformat(slot['start']).strftime('%A, %d %B %Y at %I:%M %p')} IST")
+        if slot.get("join_url"):
+            st.write(f"Zoom link: {slot['join_url']}")
+    if application["status"] != "done":
+        logger.error(f"Application {application_id} incomplete: {application['last_error']}")
+        unfinished = [name.replace("_", " ") for name, step in application["steps"].items() if step["status"] != "done"]
+        raise RuntimeError(f"Could not complete: {', '.join(unfinished)}. Proceeding again retries only these steps")
+        
+def candidate_span(stage: str):
+    """A span for one step of the current application; every rerun adds to the same trace"""
+    if not st.session_state.trace_id:
+        st.session_state.trace_id = uuid.uuid4().hex
+    return tracer.span(stage, trace_id = st.session_state.trace_id)
 
-def send_rejection_email(email_agent: Agent, to_email : str, role : str, feedback : str) -> None:
+def render_trace_panel() -> None:
+    """
+    Shows where time went for the current candidate, stage by stage
     """
-    Send a rejection mail with constructive feedback
+    with st.expander("⏱️ Where time goes"):
+        if not tracer.active:
+            st.caption("Turn on 'Trace pipeline stages' in the sidebar to record timings")
+            return
+        breakdown = tracer.breakdown(st.session_state.trace_id) if st.session_state.trace_id else []
+        if not breakdown:
+            st.caption("No timings recorded for this application yet")
+            return
+        st.bar_chart({row["stage"]: row["total_ms"] for row in breakdown}, horizontal=True)
+        st.dataframe([{**row, "total_ms": round(row["total_ms"], 1)} for row in breakdown], use_container_width=True)
+        spans = tracer.get_trace(st.session_state.trace_id)
+        st.dataframe([{"stage": span.name, "ms": round(span.duration * 1000, 1), "error": span.error or "",
+                       **{k: v for k, v in span.attributes.items() if isinstance(v, (str, int, float, bool))}}
+                      for span in spans], use_container_width=True)
+
+def render_batch_screening(role: str) -> None:
     """
-    email_agent.run(
-        f"""
-        Send an email to {to_email} regarding their application for the {role} position.
-        Use this specific style:
-        1. Avoid unnecessary capital letters.
-        2. Be empathetic and human
-        3. Mention specific feedback from: {feedback}
-        4. Encourage them to upskill and try again
-        5. Suggest some learning resources based on missing skills.
-        6. End the email with exactly:
-            Best Regards,
-            Team HR at {st.session_state.company_name}
-        Do not include any name in the signature.
-        The tone should be like a human writing a quick but thoughtful email.
-        """
+    Screens a folder, zip or multi-file upload of resumes concurrently and streams results into a table
+    """
+    uploads = st.file_uploader("Upload resumes (PDFs or a zip)", type=["pdf", "zip"], accept_multiple_files=True, key="batch_uploads")
+    folder = st.text_input("...or a folder of resumes on the server", key="batch_folder")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        max_workers = st.number_input("Concurrent workers", min_value=1, max_value=32, value=4)
+    with col2:
+        requests_per_minute = st.number_input("Requests per minute per worker (0 = unlimited)", min_value=0, value=30)
+    
+    if not st.button("Screen Batch 🚀"):
+        return
+    
+    try:
+        sources = collect_from_uploads(uploads or [])
+        if folder:
+            sources.extend(collect_from_folder(folder))
+    except (OSError, ValueError) as e:
+        st.error(f"Could not read the resumes: {str(e)}")
+        return
+    if not sources:
+        st.warning("Please upload or point to at least one resume")
+        return
+    
+    screener = BatchScreener(
+        analyzer_factory = partial(lazy_import("agents").build_resume_analyzer, st.session_state.openai_api_key, http_client = get_resource_pool().httpx_client()),
+        role = role,
+        max_workers = int(max_workers),
+        requests_per_minute = requests_per_minute,
+        cache = get_analysis_cache(),
+        prefilter = get_prefilter(),
+        compactor = get_compactor() if get_compactor().token_budget else None
     )
+    progress = st.progress(0.0, text=f"Screening {len(sources)} resumes...")
+    metrics = st.empty()
+    table = st.empty()
+    rows = []
+    store = get_candidate_store()
+    for result in screener.screen(sources):
+        rows.append(result.to_row())
+        if result.analysis:
+            store.add(result.resume_text, name = result.name, role = role, analysis = result.analysis)
+        stats = screener.stats
+        progress.progress(stats.completed / stats.total, text=f"Screened {stats.completed}/{stats.total}")
+        metrics.caption(f"Selected: {stats.selected} | Failed: {stats.failed} | Throughput: {stats.resumes_per_minute:.1f} resumes/min | LLM calls saved by pre-filter: {screener.prefilter.llm_calls_saved}")
+        table.dataframe(rows, use_container_width=True)
+    st.success(f"Screened {screener.stats.completed} resumes in {screener.stats.elapsed:.1f}s")
+
+def render_candidate_pool(role: str) -> None:
+    """
+    Ranks every stored candidate for the selected role, optionally requiring some skills
+    """
+    store = get_candidate_store()
+    must_have = st.text_input("Must-have skills (comma separated)", placeholder="Kubernetes, AWS")
+    top_k = st.number_input("Show top", min_value=1, max_value=500, value=20)
     
-def schedule_interview(scheduler: Agent, candidate_email: str, email_agent: Agent, role: str) -> None:
+    started = time.perf_counter()
+    ranked = store.rank(role, [s.strip() for s in must_have.split(",") if s.strip()], int(top_k))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    st.caption(f"Ranked {len(store)} candidates in {elapsed_ms:.1f} ms")
+    if ranked:
+        st.dataframe([candidate.to_row() for candidate in ranked], use_container_width=True)
+    else:
+        st.info("No stored candidates match these criteria yet")
+
+def render_role_match() -> None:
     """
-    Schedule interview during business hours (9 AM - 5 PM IST)
+    Ranks every open role for one resume, judged in a single analyzer call
     """
-    try:
-        # getting the current time
-        ist_tz = pytz.timezone("Asia/Kolkata")
-        current_time_ist = datetime.now(ist_tz)
-        
-        tomorrow_ist = current_time_ist + timedelta(days=1)
-        interview_time = tomorrow_ist.replace(hour=11, minute=0, second=0, microsecond=0)
-        formatted_time = interview_time.strftime("%Y-%m-%dT%H:%M:%S")
-        
-        meeting_resp = scheduler.run(
-            f"""Schedule a 60-minute technical interview with these specifications:
-                - Title: '{role} Technical Interview'
-                - Date: {formatted_time}
-                - Timezone: IST (Indian Standard Time)
-                - Attendee: {candidate_email}
-                
-            Important Notes:
-                - The meeting must be between 9 AM - 5 PM IST
-                - Use IST (UTC+5:30) timezone for all communications
-                - Include timezone information in the meeting details
-                - Ask him to be confident and not so nervous and prepare well for the interview
-                - Also, include a small joke or sarcasm to make him relax.
-            """
-        )
-        
-        st.success("Interview Scheduled Successfully! Check your email for details.")
-    except Exception as e:
-        logger.error(f"Error scheduling Interview: {str(e)}")
-        st.error("Unable to schedule interview. Please try again")
-        
+    resume_file = st.file_uploader("Upload a resume (PDF)", type=["pdf"], key="role_match_upload")
+    if resume_file is None or not st.button("Match Roles 🧭"):
+        return
+    with st.spinner("Matching the resume against every role..."):
+        result = current_pipeline().match_roles(resume_file.name, pdf_bytes = resume_file.getvalue())
+    if result["error"]:
+        st.error(result["error"])
+        return
+    st.caption(f"Judged against {len(result['roles'])} roles in {result['seconds']:.1f}s")
+    if result["fitting_roles"]:
+        st.success(f"Fits: {', '.join(role_registry.title(role) for role in result['fitting_roles'])}")
+    else:
+        st.info("The resume does not meet the bar for any open role")
+    st.dataframe([{"role": fit["title"], "selected": fit["selected"], "match": f"{fit['match']:.0%}",
+                   "matching": ", ".join(fit["matching_skills"]), "missing": ", ".join(fit["missing_skills"]),
+                   "feedback": fit["feedback"]} for fit in result["roles"]], use_container_width=True)
+
 def main() -> None:
     st.title("HeyHR Aide 🏢")
     
@@ -338,6 +451,9 @@ def main() -> None:
         
         company_name = st.text_input("Company Name", value=st.session_state.company_name, help = "Name to use in email communications")
         
+        # Only this session's runs are traced (see the tracer.session call below main); TRACING_ENABLED traces all of them
+        st.checkbox("Trace pipeline stages", value=tracer.enabled, key="trace_stages", help="Records how long each stage takes in this session; adds no measurable overhead when off")
+        
         if zoom_account_id: st.session_state.zoom_account_id = zoom_account_id
         if zoom_client_id: st.session_state.zoom_client_id = zoom_client_id
         if zoom_client_secret: st.session_state.zoom_client_secret = zoom_client_secret
@@ -346,6 +462,26 @@ def main() -> None:
         if email_passkey: st.session_state.email_passkey = email_passkey
         if company_name: st.session_state.company_name = company_name
         
+        # Pre-filter settings
+        st.subheader("Screening")
+        prefilter = get_prefilter()
+        prefilter.threshold = st.slider("Pre-filter threshold", min_value=0.0, max_value=1.0, value=prefilter.threshold, step=0.05, help="Resumes scoring below this keyword match are rejected without an LLM call")
+        prefilter_stats = prefilter.stats()
+        st.caption(f"Pre-filter: {prefilter_stats['passed']}/{prefilter_stats['screened']} passed, {prefilter_stats['llm_calls_saved']} LLM calls saved")
+        compactor = get_compactor()
+        compactor.token_budget = st.number_input("Prompt token budget (0 = send the full resume)", min_value=0, value=compactor.token_budget, step=250)
+        if compactor.tokens_before:
+            st.caption(f"Prompt compaction: {compactor.tokens_before} -> {compactor.tokens_after} resume tokens")
+        cache_stats = get_analysis_cache().stats()
+        st.caption(f"Analysis cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['entries']} entries)")
+        if all(st.session_state[k] for k in ("email_sender", "email_passkey", "openai_api_key", "company_name")):
+            outbox_counts = current_outbox().counts()
+            st.caption("Outbox: " + (", ".join(f"{n} {status}" for status, n in outbox_counts.items()) or "empty"))
+        with st.expander("Shared resources"):
+            for kind, pool_stats in get_resource_pool().stats().items():
+                st.caption(f"{kind}: {pool_stats['cold']} cold builds ({pool_stats['cold_ms']:.1f} ms), {pool_stats['warm']} warm hits ({pool_stats['warm_ms']:.3f} ms)")
+        render_timings_panel()
+        
         required_configs = {
             "OpenAI API Key": st.session_state.openai_api_key, 
             "Zoom Account ID": st.session_state.zoom_account_id,
@@ -364,18 +500,33 @@ def main() -> None:
         st.warning("Please enter your OpenAI API Key in the sidebar to continue")
         return
     
-    role = st.selectbox("Select the role you're applying for: ", ["ai_ml_engineer", "frontend_engineer", "backend_engineer"])
+    role = st.selectbox("Select the role you're applying for: ", role_registry.roles(),
+                        format_func = role_registry.title)
+    
+    with st.expander("View Required Skills", expanded = True):
+        compiled = role_registry.get(role)
+        st.markdown(compiled.requirements)
+        st.caption(f"Requirements version {compiled.version}")
     
-    with st.expander("View Required Skills", expanded = True): st.markdown(ROLE_REQUIREMENTS[role])
+    mode = st.radio("Mode", ["Single Application", "Batch Screening", "Candidate Pool", "Role Match"], horizontal=True)
+    if mode == "Role Match":
+        render_role_match()
+        return
+    if mode == "Batch Screening":
+        render_batch_screening(role)
+        return
+    if mode == "Candidate Pool":
+        render_candidate_pool(role)
+        return
     
     # Add a "New Application" button before the resume upload
     if st.button("New Application 🔍"):
         # Clear all the application related status
-        keys_to_clear = ["resume_text", "analysis_complete", "is_selected", "candidate_email", "current_pdf"]
+        keys_to_clear = ["resume_text", "analysis_complete", "is_selected", "candidate_email", "current_pdf", "analysis_result", "trace_id"]
         
         for key in keys_to_clear:
             if key in st.session_state:
-                st.session_state[key] = None if key == "current_pdf" else ""
+                st.session_state[key] = None if key in ("current_pdf", "analysis_result", "trace_id") else ""
         st.rerun()
     
     resume_file = st.file_uploader("Upload your resume (PDF)", type = ["pdf"], key = "resume_uploaded")
@@ -391,28 +542,25 @@ def main() -> None:
         st.subheader("Uploaded Resume")
         col1, col2 = st.columns([4, 1])
         
+        # Read the upload once and hand the same bytes to the viewer, the download button and the parser
+        pdf_bytes = resume_file.getvalue()
+        digest = upload_digest(resume_file)
         with col1:
-            import tempfile, os
-            with tempfile.NamedTemporaryFile(delete = False, suffix=".pdf") as tmp_file:
-                tmp_file.write(resume_file.read())
-                tmp_file_path = tmp_file.name
-            resume_file.seek(0)
-            try:
-                pdf_viewer(tmp_file_path)
-            finally:
-                os.unlink(tmp_file_path)
+            render_pdf_preview(pdf_bytes, digest)
         with col2:
             st.download_button(label="Download", 
-                               data = resume_file,
+                               data = pdf_bytes,
                                file_name=resume_file.name, 
                                mime="application/pdf")
         # Process the resume text
         if not st.session_state.resume_text:
-            with st.spinner("Processing your resume..."):
-                resume_text = extract_text_from_pdf(resume_file)
+            with st.spinner("Processing your resume..."), candidate_span("resume_upload"):
+                resume_text = extract_text_from_pdf(pdf_bytes, digest)
                 if resume_text:
                     st.session_state.resume_text = resume_text
                     st.success("Resume Processed Successfully!")
+                elif "ocr" not in available_tiers():
+                    st.error("No text found in the PDF. Scanned resumes need Tesseract OCR installed on the server")
                 else:
                     st.error("Could not process the PDF. Please try again")
     
@@ -429,17 +577,24 @@ def main() -> None:
     if st.session_state.resume_text and email and not st.session_state.analysis_complete:
         if st.button("Analyze Resume"):
             with st.spinner("Analyzing the resume..."):
-                resume_analyzer = create_resume_analyzer()
-                email_agent = create_email_agent()
-                
-                if resume_analyzer and email_agent:
-                    print("DEBUG: Starting Resume Analysis")
-                    is_selected, feedback = analyze_resume(
-                        st.session_state.resume_text,
-                        role, 
-                        resume_analyzer
-                    )
-                print(f"DEBUG: Analysis Complete\n----------\nSelected: {is_selected}\nFeedback: {feedback}")
+                # st.rerun() below must not be recorded as a failure of this stage
+                with candidate_span("resume_review"):
+                    pipeline = current_pipeline()
+                    is_selected, feedback = analyze_resume(pipeline, st.session_state.resume_text, role)
+                    logger.debug(f"Analysis complete, selected: {is_selected}")
+                    if st.session_state.analysis_result:
+                        pipeline.record(st.session_state.resume_text, resume_file.name, email, role,
+                                        st.session_state.analysis_result)
+                prompt_tokens = (st.session_state.analysis_result or {}).get("prompt_tokens")
+                if prompt_tokens:
+                    st.caption(f"Resume prompt: {prompt_tokens['before']} -> {prompt_tokens['after']} tokens")
+                duplicate = (st.session_state.analysis_result or {}).get("duplicate")
+                if duplicate:
+                    st.caption(f"Near-duplicate of an earlier submission ({duplicate['similarity']:.0%} similar)"
+                               + ("; its analysis was reused" if duplicate["reused"] else ""))
+                routing = (st.session_state.analysis_result or {}).get("routing")
+                if routing and routing["reasons"]:
+                    st.caption(f"Reviewed by {' then '.join(routing['models'])} ({', '.join(routing['reasons'])})")
                 
                 if is_selected:
                     st.success("Congratulations! Your skills match our requirements.")
@@ -451,15 +606,20 @@ def main() -> None:
                     st.write(f"Feedback: {feedback}")
                     
                     # Send Rejection mail
-                    with st.spinner("Sending Feedback Mail.."):
+                    with st.spinner("Sending Feedback Mail.."), candidate_span("feedback_email"):
                         try:
-                            send_rejection_email(
-                            email_agent = email_agent,
+                            queued = send_rejection_email(
+                            outbox = current_outbox(),
                             to_email = email,
                             role = role, 
-                            feedback = feedback
+                            feedback = feedback,
+                            missing_skills = (st.session_state.analysis_result or {}).get("missing_skills"),
+                            candidate = contact_key(email, st.session_state.analysis_result or {})
                             )
-                            st.info("We've sent you a email with detailed feedback.")
+                            if queued:
+                                st.info("We're sending you an email with detailed feedback.")
+                            else:
+                                st.info("A feedback email for this application was already sent.")
                         except Exception as e:
                             logger.error(f"Error sending rejection mail: {str(e)}")
                             st.error("Could not send the email. Please try again.")
@@ -469,41 +629,19 @@ def main() -> None:
         st.info("Click 'Proceed with Application' to continue with the interview process.")
         
         if st.button("Proceed with Application", key="proceed_button"):
-            print("DEBUG: Proceed button clicked")  # Debug
-            with st.spinner("🔄 Processing your application..."):
+            with st.spinner("🔄 Processing your application..."), candidate_span("application"):
                 try:
-                    print("DEBUG: Creating email agent")  # Debug
-                    email_agent = create_email_agent()
-                    print(f"DEBUG: Email agent created: {email_agent}")  # Debug
-                    
-                    print("DEBUG: Creating scheduler agent")  # Debug
-                    scheduler_agent = create_scheduler_agent()
-                    print(f"DEBUG: Scheduler agent created: {scheduler_agent}")  # Debug
-
-                    # 3. Send selection email
-                    with st.status("📧 Sending confirmation email...", expanded=True) as status:
-                        print(f"DEBUG: Attempting to send email to {st.session_state.candidate_email}")  # Debug
-                        send_selection_email(
-                            email_agent,
-                            st.session_state.candidate_email,
-                            role
-                        )
-                        print("DEBUG: Email sent successfully")  # Debug
-                        status.update(label="✅ Confirmation email sent!")
-
-                    # 4. Schedule interview
-                    with st.status("📅 Scheduling interview...", expanded=True) as status:
-                        print("DEBUG: Attempting to schedule interview")  # Debug
-                        schedule_interview(
-                            scheduler_agent,
+                    # 3 & 4. Selection email and interview, recorded step by step so a failure can be resumed
+                    with st.status("📧📅 Sending confirmation email and scheduling interview...", expanded=True) as status:
+                        process_application(
+                            current_workflow(),
                             st.session_state.candidate_email,
-                            email_agent,
-                            role
+                            role,
+                            candidate = contact_key(st.session_state.candidate_email,
+                                                    st.session_state.analysis_result or {})
                         )
-                        print("DEBUG: Interview scheduled successfully")  # Debug
-                        status.update(label="✅ Interview scheduled!")
+                        status.update(label="✅ Confirmation email queued and interview scheduled!")
 
-                    print("DEBUG: All processes completed successfully")  # Debug
                     st.success("""
                         🎉 Application Successfully Processed!
                         
@@ -518,13 +656,12 @@ def main() -> None:
                     """)
 
                 except Exception as e:
-                    print(f"DEBUG: Error occurred: {str(e)}")  # Debug
-                    print(f"DEBUG: Error type: {type(e)}")  # Debug
-                    import traceback
-                    print(f"DEBUG: Full traceback: {traceback.format_exc()}")  # Debug
+                    logger.exception(f"Error processing the application: {str(e)}")
                     st.error(f"An error occurred: {str(e)}")
                     st.error("Please try again or contact support.")
 
+    render_trace_panel()
+
     # Reset button
     if st.sidebar.button("Reset Application"):
         for key in st.session_state.keys():
@@ -533,4 +670,11 @@ def main() -> None:
         st.rerun()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    _imports_done = time.perf_counter()
+    try:
+        # The checkbox's value is in the session state before the rerun it triggers starts
+        with tracer.session(st.session_state.get("trace_stages")):
+            main()
+    finally:
+        # Also runs when st.rerun() or st.stop() cut the run short
+        get_run_timings().record(_imports_done - _RUN_STARTED, time.perf_counter() - _imports_done)
\ No newline at end of file
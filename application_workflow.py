@@ -0,0 +1,374 @@
+import contextvars
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from phi.utils.log import logger
+
+from tracing import tracer
+
+DEFAULT_WORKFLOW_PATH = os.path.join(".cache", "applications.sqlite3")
+
+
+@dataclass
+class Application:
+    id: int
+    candidate_email: str
+    role: str
+    context: Dict[str, Any]
+    attempts: int
+    # Results of the steps that already finished, by step name
+    results: Dict[str, Any] = field(default_factory=dict)
+    # Where the candidate is mailed and invited when that differs from the key they applied under
+    deliver_to: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        return self.deliver_to or self.candidate_email
+
+
+@dataclass(frozen=True)
+class WorkflowStep:
+    """
+    One step of an application. `run` takes a batch of applications and returns one result
+    per application, in order, or an Exception in place of each one it failed. A step starts
+    once every step in `after` has finished; steps that do not depend on each other run at the
+    same time. Steps must be idempotent: one interrupted after its effect but before its result
+    was recorded runs again.
+    """
+
+    name: str
+    run: Callable[[List[Application]], List[Any]]
+    after: Tuple[str, ...] = ()
+
+
+class ApplicationWorkflow:
+    """
+    Durable SQLite state machine for the steps that follow a selection (confirmation email,
+    interview booking, ...). Each finished step is recorded with its result, so a rerun, a
+    retry or another process picks an application up at its first unfinished step.
+
+    Applications are unique per (candidate, role); the candidate key need not be the address
+    their steps deliver to (see `deliver_to`). Runs claim them under a lease; a lease
+    left by a crashed process expires after `lease_seconds` and the application becomes due
+    again. Failed steps are retried with exponential backoff and jitter up to `max_attempts`.
+    Background workers (`start`) or `drain` process due applications `batch_size` at a time,
+    so a step such as interview booking can handle a whole batch at once.
+    """
+
+    def __init__(self, steps: Sequence[WorkflowStep], path: str = DEFAULT_WORKFLOW_PATH, workers: int = 1,
+                 batch_size: int = 50, max_attempts: int = 5, base_delay: float = 2.0,
+                 lease_seconds: float = 300.0, poll_interval: float = 0.5):
+        names = [step.name for step in steps]
+        unknown = {dep for step in steps for dep in step.after} - set(names)
+        if unknown or len(set(names)) != len(names):
+            raise ValueError(f"Invalid workflow steps: duplicate names or unknown dependencies {sorted(unknown)}")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.steps = list(steps)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Waits for a write lock held by another process's workflow instead of failing
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS applications (
+                    id INTEGER PRIMARY KEY,
+                    candidate_email TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    context TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    claimed_at REAL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    deliver_to TEXT,
+                    UNIQUE (candidate_email, role)
+                )"""
+            )
+            # Stores created before applications kept their own delivery address
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(applications)")}
+            if "deliver_to" not in columns:
+                self._conn.execute("ALTER TABLE applications ADD COLUMN deliver_to TEXT")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS application_steps (
+                    application_id INTEGER NOT NULL,
+                    step TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    finished_at REAL,
+                    PRIMARY KEY (application_id, step)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS applications_due ON applications (status, next_attempt_at)")
+        self._recover()
+
+    # --- producer side ----------------------------------------------------------
+
+    def submit(self, candidate_email: str, role: str, context: Optional[Dict[str, Any]] = None,
+               deliver_to: Optional[str] = None) -> Tuple[int, bool]:
+        """
+        Records an application and returns (application id, created). Submitting one that
+        already exists creates nothing, but makes a failed application due again so its
+        unfinished steps get a fresh set of attempts. `deliver_to` is the address the steps
+        mail and invite, when the application is keyed on another one.
+        """
+        now = time.time()
+        deliver_to = deliver_to if deliver_to and deliver_to != candidate_email else None
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO applications (candidate_email, role, context, next_attempt_at, created_at, "
+                "deliver_to) VALUES (?, ?, ?, ?, ?, ?)",
+                (candidate_email, role, json.dumps(context or {}), now, now, deliver_to)
+            )
+            created = cursor.rowcount == 1
+            application_id = self._conn.execute(
+                "SELECT id FROM applications WHERE candidate_email = ? AND role = ?", (candidate_email, role)
+            ).fetchone()[0]
+            if not created:
+                self._conn.execute(
+                    "UPDATE applications SET status = 'pending', attempts = 0, next_attempt_at = ? "
+                    "WHERE id = ? AND status = 'failed'", (now, application_id)
+                )
+        self._wakeup.set()
+        return application_id, created
+
+    def find(self, candidate_email: str, role: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM applications WHERE candidate_email = ? AND role = ?", (candidate_email, role)
+            ).fetchone()
+        return row[0] if row else None
+
+    def status(self, application_id: int) -> Optional[Dict[str, Any]]:
+        """The application's status and every step's status, result and error"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT candidate_email, role, status, attempts, last_error, finished_at, deliver_to FROM applications "
+                "WHERE id = ?",
+                (application_id,)
+            ).fetchone()
+            steps = self._conn.execute(
+                "SELECT step, status, result, error, attempts FROM application_steps WHERE application_id = ?",
+                (application_id,)
+            ).fetchall()
+        if row is None:
+            return None
+        recorded = {name: {"status": status, "result": json.loads(result) if result else None, "error": error,
+                           "attempts": attempts}
+                    for name, status, result, error, attempts in steps}
+        return {
+            "id": application_id,
+            "candidate_email": row[0],
+            "deliver_to": row[6] or row[0],
+            "role": row[1],
+            "status": row[2],
+            "attempts": row[3],
+            "last_error": row[4],
+            "finished_at": row[5],
+            "steps": {step.name: recorded.get(step.name, {"status": "pending", "result": None, "error": None,
+                                                          "attempts": 0})
+                      for step in self.steps},
+        }
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM applications GROUP BY status").fetchall())
+
+    # --- worker side ------------------------------------------------------------
+
+    def _recover(self, lease_seconds: Optional[float] = None) -> None:
+        """Makes applications whose run died with its process due again"""
+        expired = time.time() - (self.lease_seconds if lease_seconds is None else lease_seconds)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE applications SET status = 'pending', claimed_at = NULL WHERE status = 'running' AND claimed_at <= ?",
+                (expired,)
+            )
+
+    def _claim(self, ids: Optional[Sequence[int]] = None) -> List[Application]:
+        now = time.time()
+        with self._lock, self._conn:
+            if ids is None:
+                rows = self._conn.execute(
+                    "SELECT id, candidate_email, role, context, attempts, deliver_to FROM applications "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                    (now, self.batch_size)
+                ).fetchall()
+            else:
+                # An explicit run does not wait for a retry's backoff
+                placeholders = ",".join("?" * len(ids))
+                rows = self._conn.execute(
+                    "SELECT id, candidate_email, role, context, attempts, deliver_to FROM applications "
+                    f"WHERE status = 'pending' AND id IN ({placeholders})", tuple(ids)
+                ).fetchall()
+            # Another workflow on the same file may have claimed some of them since the SELECT
+            rows = [row for row in rows if self._conn.execute(
+                "UPDATE applications SET status = 'running', claimed_at = ? WHERE id = ? AND status = 'pending'",
+                (now, row[0])
+            ).rowcount]
+            if not rows:
+                return []
+            claimed = [row[0] for row in rows]
+            placeholders = ",".join("?" * len(claimed))
+            results: Dict[int, Dict[str, Any]] = {}
+            for application_id, step, result in self._conn.execute(
+                "SELECT application_id, step, result FROM application_steps "
+                f"WHERE status = 'done' AND application_id IN ({placeholders})", tuple(claimed)
+            ):
+                results.setdefault(application_id, {})[step] = json.loads(result) if result else None
+        return [Application(id=row[0], candidate_email=row[1], role=row[2], context=json.loads(row[3]),
+                            attempts=row[4], results=results.get(row[0], {}), deliver_to=row[5])
+                for row in rows]
+
+    def _run_step(self, step: WorkflowStep, applications: List[Application]) -> List[Any]:
+        with tracer.span("application_step", step=step.name, applications=len(applications)):
+            try:
+                outcomes = list(step.run(applications))
+            except Exception as e:
+                return [e] * len(applications)
+        if len(outcomes) != len(applications):
+            error = RuntimeError(f"Step {step.name} returned {len(outcomes)} results for {len(applications)} applications")
+            return [error] * len(applications)
+        return outcomes
+
+    def _record_step(self, step: WorkflowStep, applications: List[Application], outcomes: List[Any]) -> None:
+        now = time.time()
+        rows = []
+        for application, outcome in zip(applications, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Application {application.id} step {step.name} failed: {outcome}")
+                rows.append((application.id, step.name, "failed", None, str(outcome), None))
+            else:
+                application.results[step.name] = outcome
+                rows.append((application.id, step.name, "done", json.dumps(outcome, default=str), None, now))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO application_steps (application_id, step, status, result, error, attempts, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) ON CONFLICT (application_id, step) DO UPDATE SET "
+                "status = excluded.status, result = excluded.result, error = excluded.error, "
+                "attempts = attempts + 1, finished_at = excluded.finished_at", rows
+            )
+
+    def _execute(self, applications: List[Application]) -> None:
+        """Runs every unfinished step of the claimed applications, independent steps concurrently"""
+        failed: Dict[int, Dict[str, str]] = {application.id: {} for application in applications}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.steps)), thread_name_prefix="workflow-step") as pool:
+            while True:
+                # Each step's batch: applications for which it has not run yet and whose dependencies are done
+                ready = {}
+                for step in self.steps:
+                    batch = [application for application in applications
+                             if step.name not in application.results and step.name not in failed[application.id]
+                             and all(dep in application.results for dep in step.after)]
+                    if batch:
+                        ready[step] = batch
+                if not ready:
+                    break
+                # Each step runs in a copy of this context so its spans join the current trace
+                futures = {step: pool.submit(contextvars.copy_context().run, self._run_step, step, batch)
+                           for step, batch in ready.items()}
+                for step, future in futures.items():
+                    outcomes = future.result()
+                    self._record_step(step, ready[step], outcomes)
+                    for application, outcome in zip(ready[step], outcomes):
+                        if isinstance(outcome, Exception):
+                            failed[application.id][step.name] = str(outcome)
+        now = time.time()
+        with self._lock, self._conn:
+            for application in applications:
+                if all(step.name in application.results for step in self.steps):
+                    self._conn.execute(
+                        "UPDATE applications SET status = 'done', finished_at = ?, last_error = NULL WHERE id = ?",
+                        (now, application.id)
+                    )
+                    continue
+                attempts = application.attempts + 1
+                error = "; ".join(f"{name}: {message}" for name, message in failed[application.id].items())
+                if attempts >= self.max_attempts:
+                    self._conn.execute("UPDATE applications SET status = 'failed', attempts = ?, last_error = ? "
+                                       "WHERE id = ?", (attempts, error, application.id))
+                else:
+                    delay = self.base_delay * 2 ** (attempts - 1) * (1 + random.random() / 2)
+                    self._conn.execute(
+                        "UPDATE applications SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ? "
+                        "WHERE id = ?", (attempts, error, now + delay, application.id)
+                    )
+
+    def run(self, application_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """
+        Runs the given applications now, in the calling thread, and returns their statuses.
+        Ones already finished, or being run elsewhere, are left alone.
+        """
+        applications = self._claim(list(application_ids))
+        if applications:
+            self._execute(applications)
+        return [self.status(application_id) for application_id in application_ids]
+
+    def process_batch(self) -> int:
+        """Runs up to `batch_size` due applications; returns how many there were"""
+        applications = self._claim()
+        if applications:
+            self._execute(applications)
+        return len(applications)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if not self.process_batch():
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> "ApplicationWorkflow":
+        if not self._threads:
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"workflow-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def drain(self, workers: int = 1, timeout: float = 3600.0, reclaim: bool = False) -> Dict[str, int]:
+        """
+        Processes due applications with `workers` threads until none are left or `timeout`
+        passes (scripts and recovery after a crash); returns the final counts by status.
+        Applications waiting out a retry backoff are not due, so they are left for later.
+        `reclaim` takes over runs whose lease has not expired yet; only use it when no other
+        process is working on the store, e.g. right after the one that was crashed.
+        """
+        self._recover(0.0 if reclaim else None)
+        deadline = time.monotonic() + timeout
+
+        def work() -> None:
+            while time.monotonic() < deadline and self.process_batch():
+                pass
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="workflow-drain") as pool:
+            for future in [pool.submit(work) for _ in range(max(1, workers))]:
+                future.result()
+        return self.counts()
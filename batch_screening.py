@@ -0,0 +1,253 @@
+import contextvars
+import io
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pdf_extraction import tiered_extractor
+from role_registry import role_registry
+from screening import run_analysis
+from tracing import tracer
+
+# A resume source is a (file name, raw PDF bytes) pair
+ResumeSource = Tuple[str, bytes]
+
+
+def collect_from_folder(folder: str) -> List[ResumeSource]:
+    """Reads every PDF (and every PDF inside a zip) found in a folder"""
+    sources: List[ResumeSource] = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        if name.lower().endswith(".pdf"):
+            with open(path, "rb") as f:
+                sources.append((name, f.read()))
+        elif name.lower().endswith(".zip"):
+            with open(path, "rb") as f:
+                sources.extend(collect_from_zip(f))
+    return sources
+
+
+def collect_from_zip(zip_file: Any) -> List[ResumeSource]:
+    """Reads every PDF inside a zip archive (a path or a file-like object)"""
+    sources: List[ResumeSource] = []
+    with zipfile.ZipFile(zip_file) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                continue
+            # Skip the resource forks macOS adds when zipping a folder
+            if os.path.basename(info.filename).startswith("._"):
+                continue
+            sources.append((os.path.basename(info.filename), archive.read(info)))
+    return sources
+
+
+def collect_from_uploads(uploaded_files: Iterable[Any]) -> List[ResumeSource]:
+    """Turns Streamlit uploads (PDFs and zips) into resume sources"""
+    sources: List[ResumeSource] = []
+    for uploaded in uploaded_files:
+        data = uploaded.getvalue()
+        if uploaded.name.lower().endswith(".zip"):
+            sources.extend(collect_from_zip(io.BytesIO(data)))
+        else:
+            sources.append((uploaded.name, data))
+    return sources
+
+
+class RateLimiter:
+    """
+    Spaces calls so that a single worker never exceeds `requests_per_minute`.
+    A value of 0 (or less) disables the limit.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next_slot:
+            time.sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = now + self.interval
+
+
+@dataclass
+class ScreeningResult:
+    name: str
+    selected: bool = False
+    feedback: str = ""
+    matching_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+    experience_level: str = ""
+    seconds: float = 0.0
+    error: Optional[str] = None
+    resume_text: str = ""
+    analysis: Dict[str, Any] = field(default_factory=dict)
+
+    def to_row(self) -> Dict[str, Any]:
+        """Flattens the result into a row for the results table"""
+        return {
+            "resume": self.name,
+            "selected": self.selected,
+            "experience_level": self.experience_level,
+            "matching_skills": ", ".join(self.matching_skills),
+            "missing_skills": ", ".join(self.missing_skills),
+            "feedback": self.error or self.feedback,
+            "seconds": round(self.seconds, 2),
+        }
+
+
+@dataclass
+class BatchStats:
+    total: int = 0
+    completed: int = 0
+    selected: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def resumes_per_minute(self) -> float:
+        return self.completed * 60.0 / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class BatchScreener:
+    """
+    Screens many resumes through a bounded pool of worker threads.
+
+    Each worker builds its own analyzer with `analyzer_factory` (agents are not
+    shared between threads) and is throttled by its own RateLimiter.
+    Results are yielded in completion order so callers can stream them.
+    """
+
+    def __init__(self, analyzer_factory: Callable[[], Any], role: str, max_workers: int = 4,
+                 requests_per_minute: float = 0,
+                 extract: Callable[[bytes], str] = tiered_extractor.extract, cache: Any = None,
+                 prefilter: Any = None, compactor: Any = None):
+        if role not in role_registry:
+            raise ValueError(f"Unknown role: {role}")
+        self.analyzer_factory = analyzer_factory
+        self.role = role
+        self.max_workers = max(1, max_workers)
+        self.requests_per_minute = requests_per_minute
+        self.extract = extract
+        self.cache = cache
+        self.prefilter = prefilter
+        self.compactor = compactor
+        self.stats = BatchStats()
+        self._local = threading.local()
+
+    def _worker_state(self) -> SimpleNamespace:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = SimpleNamespace(analyzer=self.analyzer_factory(),
+                                    limiter=RateLimiter(self.requests_per_minute))
+            self._local.state = state
+        return state
+
+    def screen_one(self, name: str, data: bytes) -> ScreeningResult:
+        """Extracts and analyzes a single resume, never raising"""
+        started = time.monotonic()
+        result = ScreeningResult(name=name)
+        try:
+            with tracer.span("candidate", resume=name, role=self.role):
+                resume_text = self.extract(data)
+                if not resume_text.strip():
+                    raise ValueError("No text could be extracted from the PDF")
+                result.resume_text = resume_text
+                state = self._worker_state()
+                analysis = run_analysis(resume_text, self.role, state.analyzer,
+                                        cache=self.cache, throttle=state.limiter.wait,
+                                        prefilter=self.prefilter, compactor=self.compactor)
+            result.analysis = analysis
+            result.selected = bool(analysis["selected"])
+            result.feedback = analysis["feedback"]
+            result.matching_skills = list(analysis.get("matching_skills", []))
+            result.missing_skills = list(analysis.get("missing_skills", []))
+            result.experience_level = analysis.get("experience_level", "")
+        except Exception as e:
+            result.error = f"Error while analyzing resume: {str(e)}"
+        result.seconds = time.monotonic() - started
+        return result
+
+    def screen(self, sources: List[ResumeSource]) -> Iterator[ScreeningResult]:
+        """Screens all sources concurrently, yielding each result as soon as it finishes"""
+        self.stats = BatchStats(total=len(sources))
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="screener") as pool:
+            # Each resume runs in a copy of this context so its spans follow the caller's tracing
+            futures = [pool.submit(contextvars.copy_context().run, self.screen_one, name, data) for name, data in sources]
+            for future in as_completed(futures):
+                result = future.result()
+                self.stats.completed += 1
+                if result.error:
+                    self.stats.failed += 1
+                elif result.selected:
+                    self.stats.selected += 1
+                yield result
+
+
+class StubAnalyzer:
+    """
+    Deterministic local stand-in for an OpenAIChat-backed agent.
+
+    Answers the analysis prompt by keyword matching the role requirements against
+    the resume, after an optional fixed plus per-token artificial latency. Useful for
+    dry runs of the batch pipeline and for testing without an API key. Multi-role
+    prompts (see screening.build_multi_role_prompt) get one verdict per role.
+    """
+
+    ROLE_HEADER = re.compile(r'^\s*Role "([^"]+)"', re.MULTILINE)
+
+    def __init__(self, latency: float = 0.0, latency_per_1k_tokens: float = 0.0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.calls = 0
+
+    def run(self, prompt: str) -> SimpleNamespace:
+        self.calls += 1
+        # Prompt processing time grows with prompt length, ~4 characters per token
+        delay = self.latency + self.latency_per_1k_tokens * len(prompt) / 4000
+        if delay:
+            time.sleep(delay)
+        requirements, _, rest = prompt.partition("Resume Text:")
+        resume_text = rest.split("Your response must be", 1)[0].lower()
+        headers = list(self.ROLE_HEADER.finditer(requirements))
+        if headers:
+            ends = [header.start() for header in headers[1:]] + [len(requirements)]
+            content = json.dumps({
+                "roles": [dict(self.verdict(requirements[header.end():end], resume_text), role=header.group(1))
+                          for header, end in zip(headers, ends)],
+                "experience_level": "mid",
+            })
+        else:
+            content = json.dumps(dict(self.verdict(requirements, resume_text), experience_level="mid"))
+        return SimpleNamespace(messages=[SimpleNamespace(role="assistant", content=content)])
+
+    @staticmethod
+    def verdict(requirements: str, resume_text: str) -> Dict[str, Any]:
+        skills = [s.strip() for line in requirements.splitlines() if line.strip().startswith("-")
+                  for s in line.strip()[1:].split(",") if s.strip()]
+        # "React/Vue.js/Angular" is met by any one of its alternatives
+        matching = [s for s in skills
+                    if any(alt.strip().lower() in resume_text for alt in re.split(r"/| and ", s) if alt.strip())]
+        missing = [s for s in skills if s not in matching]
+        return {
+            "selected": bool(skills) and len(matching) / len(skills) >= 0.7,
+            "feedback": f"Matched {len(matching)} of {len(skills)} required skills.",
+            "matching_skills": matching,
+            "missing_skills": missing,
+        }
@@ -0,0 +1,97 @@
+"""
+Cold start and rerun cost of the Streamlit app. First, importing app.py in a fresh interpreter
+that has already loaded Streamlit (as `streamlit run` has), and which heavy modules that left
+unloaded. Then the whole script driven by Streamlit's AppTest: the first run and --reruns more,
+as every widget interaction triggers. Last, extracting and rendering the preview of one upload,
+the first time and when memoized by its hash.
+
+    python -m benchmarks.bench_app_startup --reruns 20
+"""
+import argparse
+import hashlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from benchmarks.fixtures import make_resume_pdf
+
+HEAVY_MODULES = ("agno", "openai", "agents", "pytesseract", "pandas", "streamlit_pdf_viewer")
+
+COLD_IMPORT = f"""
+import json, sys, time
+import streamlit, streamlit.delta_generator
+started = time.perf_counter()
+import app
+print(json.dumps({{"ms": (time.perf_counter() - started) * 1000,
+                   "deferred": [m for m in {HEAVY_MODULES!r} if m not in sys.modules]}}))
+"""
+
+CONFIG = {"openai_api_key": "sk-fake", "zoom_account_id": "fake", "zoom_client_id": "fake",
+          "zoom_client_secret": "fake", "email_sender": "hr@acme.test", "email_passkey": "fake",
+          "company_name": "Acme"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--cold-starts", type=int, default=3)
+    args = parser.parse_args()
+
+    colds = []
+    for _ in range(args.cold_starts):
+        output = subprocess.run([sys.executable, "-c", COLD_IMPORT], capture_output=True, text=True, check=True)
+        colds.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    print(f"cold import of app.py: {statistics.median(c['ms'] for c in colds):.0f} ms median of {len(colds)}; "
+          f"not loaded at startup: {', '.join(colds[0]['deferred']) or 'none'}")
+
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Streamlit warns on every cached call made outside `streamlit run`
+    set_log_level("error")
+
+    at = AppTest.from_file("app.py", default_timeout=60)
+    for key, value in CONFIG.items():
+        at.session_state[key] = value
+    started = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - started
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception[0].message}")
+    reruns = []
+    for _ in range(args.reruns):
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+    # What the app measured about itself, as shown in its sidebar
+    for caption in at.sidebar.caption:
+        if caption.value.startswith(("First run", "Last run", "Median", "Loaded")):
+            print(f"  app: {caption.value}")
+    print(f"first run {first * 1000:.0f} ms; reruns median {statistics.median(reruns) * 1000:.1f} ms, "
+          f"max {max(reruns) * 1000:.1f} ms over {len(reruns)}")
+
+    with warnings.catch_warnings():
+        # Outside `streamlit run` st.cache_data falls back to an in-memory store and says so;
+        # AppTest's runs reset the log level from Streamlit's config
+        warnings.simplefilter("ignore")
+        set_log_level("error")
+        import app
+
+        pdf = make_resume_pdf(seed=1, pages=2)
+        digest = hashlib.sha256(pdf).hexdigest()
+        for label in ("first upload", "same upload again"):
+            started = time.perf_counter()
+            text = app.cached_resume_text(digest, pdf)
+            extracted = time.perf_counter() - started
+            started = time.perf_counter()
+            images = app.cached_preview(digest, pdf)
+            rendered = time.perf_counter() - started
+            print(f"{label:18s} text {extracted * 1000:7.2f} ms ({len(text)} chars)  "
+                  f"preview {rendered * 1000:7.2f} ms ({len(images)} pages)")
+
+
+if __name__ == "__main__":
+    main()
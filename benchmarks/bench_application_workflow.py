@@ -0,0 +1,96 @@
+"""
+Crash-recovery load test of the application workflow. Thousands of selected candidates are
+submitted, a worker process starts draining them (confirmation email + interview booking
+against the fake Zoom server) and is killed part-way; a second drain reclaims its leases and
+finishes the rest. Reports throughput, and what the crash cost: steps that ran again and
+Zoom meetings created twice (a meeting made but not yet booked when the process died).
+
+    python -m benchmarks.bench_application_workflow --applications 2000 --kill-after 3
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from application_workflow import ApplicationWorkflow
+from email_outbox import EmailOutbox
+from interview_scheduler import InterviewScheduler
+from pipeline import build_workflow
+from resource_pool import ResourcePool
+from zoom_tool import CustomZoomTool
+
+
+def build(directory: str, token_url: str, api_base: str, batch_size: int) -> ApplicationWorkflow:
+    # Nothing is delivered here; the outbox is only enqueued into, which is the workflow's step
+    outbox = EmailOutbox(drafter=lambda message: ("", ""), sender=None, path=os.path.join(directory, "outbox.sqlite3"),
+                         sender_address="hr@acme.test")
+    zoom_tool = CustomZoomTool(account_id="fake-account", client_id="fake-client", client_secret="fake-secret",
+                               session=ResourcePool().http_session("zoom"), token_url=token_url, api_base=api_base)
+    scheduler = InterviewScheduler(zoom_tool, interviewers=[f"interviewer-{i}" for i in range(8)],
+                                   path=os.path.join(directory, "interviews.sqlite3"))
+    return build_workflow(outbox, scheduler, path=os.path.join(directory, "applications.sqlite3"),
+                          batch_size=batch_size)
+
+
+def child(args: argparse.Namespace) -> None:
+    build(args.directory, args.token_url, args.api_base, args.batch_size).drain(workers=args.workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--zoom-latency", type=float, default=0.005)
+    parser.add_argument("--kill-after", type=float, default=3.0, help="Seconds before the first worker is killed")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    parser.add_argument("--token-url", help=argparse.SUPPRESS)
+    parser.add_argument("--api-base", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    from benchmarks.fakes import FakeZoomServer
+
+    zoom = FakeZoomServer(latency=args.zoom_latency).start()
+    directory = tempfile.mkdtemp(prefix="workflow-bench-")
+    workflow = build(directory, zoom.token_url, zoom.api_base, args.batch_size)
+    started = time.perf_counter()
+    for i in range(args.applications):
+        workflow.submit(f"candidate{i}@example.com", "backend_engineer")
+    print(f"submitted {args.applications} applications in {time.perf_counter() - started:.2f} s")
+
+    started = time.perf_counter()
+    worker = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_application_workflow", "--child",
+                               "--directory", directory, "--token-url", zoom.token_url, "--api-base", zoom.api_base,
+                               "--workers", str(args.workers), "--batch-size", str(args.batch_size)])
+    try:
+        worker.wait(timeout=args.kill_after)
+    except subprocess.TimeoutExpired:
+        worker.kill()
+        worker.wait()
+    first = time.perf_counter() - started
+    before = workflow.counts()
+    print(f"worker killed after {first:.2f} s: {before}")
+
+    started = time.perf_counter()
+    after = workflow.drain(workers=args.workers, reclaim=True)
+    second = time.perf_counter() - started
+    resumed = before.get("pending", 0) + before.get("running", 0)
+    print(f"resumed drain finished {resumed} applications in {second:.2f} s ({resumed / second:.0f}/s): {after}")
+
+    conn = sqlite3.connect(os.path.join(directory, "applications.sqlite3"))
+    redone = conn.execute("SELECT step, COUNT(*) FROM application_steps WHERE attempts > 1 GROUP BY step").fetchall()
+    emails = sqlite3.connect(os.path.join(directory, "outbox.sqlite3")).execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+    print(f"steps run more than once: {dict(redone) or 0}; emails queued {emails}; "
+          f"zoom meetings {len(zoom.meetings)} for {args.applications} applications "
+          f"({len(zoom.meetings) - args.applications} duplicates)")
+    zoom.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares fully LLM-drafted emails with template-first drafting, where the LLM only writes
+the feedback paragraph of rejections. The model is a stub whose latency grows with the
+prompt and generated token counts.
+
+    python -m benchmarks.bench_email_drafting --emails 40
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from email_drafting import draft_with_agent
+from email_outbox import OutboxMessage
+from email_templates import FeedbackPersonalizer, TemplateEmailDrafter
+from prompt_compaction import count_tokens
+
+EMAIL_BODY = ("thank you for applying, we appreciate the effort you put into your application. " * 12).strip()
+FEEDBACK_PARAGRAPH = "your python background is solid, but we were looking for more hands-on kubernetes and cloud work."
+
+
+class FakeEmailAgent:
+    """Answers with a canned email or paragraph; latency = base + per-token input and output cost"""
+
+    def __init__(self, base: float, per_input_token: float, per_output_token: float):
+        self.base = base
+        self.per_input_token = per_input_token
+        self.per_output_token = per_output_token
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def run(self, prompt: str) -> SimpleNamespace:
+        self.calls += 1
+        content = FEEDBACK_PARAGRAPH if "one short paragraph" in prompt else f"Subject: Your application\n\n{EMAIL_BODY}"
+        input_tokens, output_tokens = count_tokens(prompt), count_tokens(content)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        time.sleep(self.base + self.per_input_token * input_tokens + self.per_output_token * output_tokens)
+        return SimpleNamespace(messages=[SimpleNamespace(role="assistant", content=content)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=40)
+    parser.add_argument("--distinct-feedback", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = [
+        OutboxMessage(id=i, to_email=f"candidate{i}@example.com", role="backend_engineer",
+                      decision=rng.choice(["selected", "rejected"]),
+                      context={"feedback": f"missing kubernetes and cloud experience ({rng.randrange(args.distinct_feedback)})",
+                               "missing_skills": ["Kubernetes", "Cloud Services (AWS/GCP/Azure)"]},
+                      subject=None, body=None, attempts=0)
+        for i in range(args.emails)
+    ]
+
+    for label in ("llm", "template"):
+        agent = FakeEmailAgent(base=0.05, per_input_token=0.00002, per_output_token=0.002)
+        if label == "llm":
+            draft = lambda m: draft_with_agent(agent, "Acme", m)
+        else:
+            draft = TemplateEmailDrafter("Acme", FeedbackPersonalizer(agent))
+        started = time.perf_counter()
+        for message in messages:
+            draft(message)
+        elapsed = time.perf_counter() - started
+        print(f"{label:9s} {elapsed / len(messages) * 1000:7.1f} ms/email  llm calls {agent.calls:3d}  "
+              f"tokens in {agent.input_tokens:6d}  out {agent.output_tokens:6d}")
+
+
+if __name__ == "__main__":
+    main()
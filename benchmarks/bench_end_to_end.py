@@ -0,0 +1,320 @@
+"""
+End-to-end benchmark and load test of the screening pipeline against local fakes: an
+OpenAI-compatible server with configurable latency and jitter, an SMTP server and the
+Zoom API. Generated resumes of several page counts go through every stage
+(extract -> analyze -> notify -> schedule) with `--concurrency` callers at a time.
+
+Reports p50/p95/p99 latency, throughput and peak RSS per stage, and writes them as JSON
+so runs can be compared; `--compare` prints the change against an earlier result file and
+exits non-zero if a stage regressed by more than `--tolerance`.
+
+    python -m benchmarks.bench_end_to_end --resumes 100 --concurrency 8 --latency 0.3 --jitter 0.1
+    python -m benchmarks.bench_end_to_end --compare benchmarks/results/e2e-20260101-120000.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.fakes import FakeOpenAIServer, FakeSmtpServer, FakeZoomServer
+from benchmarks.fixtures import make_resume_pdf
+from pipeline import PipelineSettings, ScreeningPipeline, build_pipeline
+from resource_pool import ResourcePool
+from role_registry import role_registry
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # No procfs: fall back to the process-wide peak (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class RssSampler:
+    """Samples the resident set size on a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak_mb = current_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for no samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_stage(items: List[Any], fn: Callable[[Any], Any], concurrency: int) -> Dict[str, Any]:
+    """Calls fn on every item from `concurrency` threads and summarizes the latencies"""
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def timed(item: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(item)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return None
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            outputs = list(pool.map(timed, items))
+        wall = time.perf_counter() - started
+    return {
+        "outputs": outputs,
+        "summary": summarize(latencies, wall, rss.peak_mb, errors),
+    }
+
+
+def summarize(latencies: Sequence[float], wall: float, peak_rss_mb: float, errors: Sequence[str]) -> Dict[str, Any]:
+    return {
+        "count": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+def make_workload(count: int, role: str, page_choices: Sequence[int], strong_ratio: float,
+                  seed: int) -> List[Dict[str, Any]]:
+    """Resumes of varied page counts; `strong_ratio` of them list every required skill for `role`"""
+    rng = random.Random(seed)
+    required = [group.label for group in role_registry.get(role).groups]
+    workload = []
+    for i in range(count):
+        pages = rng.choice(page_choices)
+        skills = required if rng.random() < strong_ratio else None
+        workload.append({"name": f"resume_{i:04d}.pdf", "pages": pages,
+                         "pdf": make_resume_pdf(seed=seed + i, pages=pages, skills=skills)})
+    return workload
+
+
+def wait_for_delivery(outbox: Any, message_ids: List[int], enqueued_at: Dict[int, float],
+                      timeout: float) -> Dict[str, Any]:
+    """Latency from enqueue until the background workers report each message sent"""
+    deadline = time.time() + timeout
+    pending = set(message_ids)
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    with RssSampler() as rss:
+        while pending and time.time() < deadline:
+            for message_id in list(pending):
+                status = outbox.status(message_id)
+                if status["status"] == "sent":
+                    latencies.append(status["sent_at"] - enqueued_at[message_id])
+                    pending.discard(message_id)
+                elif status["status"] == "failed":
+                    errors.append(status["last_error"] or "failed")
+                    pending.discard(message_id)
+            time.sleep(0.01)
+    errors.extend("not delivered before the timeout" for _ in pending)
+    return summarize(latencies, time.perf_counter() - started, rss.peak_mb, errors)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    llm = FakeOpenAIServer(latency=args.latency, jitter=args.jitter, per_1k_prompt_tokens=args.per_1k_tokens,
+                           seed=args.seed).start()
+    smtp = FakeSmtpServer(latency=args.smtp_latency).start()
+    zoom = FakeZoomServer(latency=args.zoom_latency).start()
+    workdir = tempfile.mkdtemp(prefix="bench-e2e-")
+    settings = PipelineSettings(
+        openai_api_key="fake-key", openai_base_url=llm.base_url, company_name="Acme",
+        email_sender="hr@acme.test", email_passkey="fake-pass",
+        smtp_host="127.0.0.1", smtp_port=smtp.port, smtp_ssl=False,
+        zoom_account_id="fake-account", zoom_client_id="fake-client", zoom_client_secret="fake-secret",
+        zoom_token_url=zoom.token_url, zoom_api_base=zoom.api_base, token_budget=args.token_budget,
+        cache_path=os.path.join(workdir, "analysis.sqlite3"), store_path=os.path.join(workdir, "candidates.sqlite3"),
+        outbox_path=os.path.join(workdir, "outbox.sqlite3"), schedule_path=os.path.join(workdir, "interviews.sqlite3"),
+    )
+    pipeline: ScreeningPipeline = build_pipeline(settings, pool=ResourcePool(pool_maxsize=max(16, args.concurrency)))
+    # The outbox starts with its default worker count; restart it with the requested one
+    pipeline.outbox.stop()
+    pipeline.outbox.workers = args.outbox_workers
+    pipeline.outbox.start()
+    stages: Dict[str, Any] = {}
+    try:
+        workload = make_workload(args.resumes, args.role, args.pages, args.strong_ratio, args.seed)
+
+        extracted = run_stage(workload, lambda item: pipeline.extract(item["pdf"]), args.concurrency)
+        stages["extract"] = extracted["summary"]
+        for item, text in zip(workload, extracted["outputs"]):
+            item["text"] = text or ""
+
+        analyzed = run_stage(workload, lambda item: pipeline.analyze(item["text"], args.role), args.concurrency)
+        stages["analyze"] = analyzed["summary"]
+        candidates = [(i, analysis) for i, analysis in enumerate(analyzed["outputs"]) if analysis]
+
+        enqueued_at: Dict[str, float] = {}
+
+        def notify(candidate: Any) -> str:
+            i, analysis = candidate
+            email = f"candidate{i}@example.com"
+            enqueued_at[email] = time.time()
+            pipeline.notify(email, args.role, analysis)
+            return email
+
+        notified = run_stage(candidates, notify, args.concurrency)
+        stages["notify"] = notified["summary"]
+        # Enqueueing is idempotent, so this only looks up the ids of the messages queued above
+        message_times = {}
+        for (i, analysis), email in zip(candidates, notified["outputs"]):
+            if email is not None:
+                message_id, _ = pipeline.outbox.enqueue(email, args.role, "selected" if analysis["selected"] else "rejected")
+                message_times[message_id] = enqueued_at[email]
+        stages["deliver"] = wait_for_delivery(pipeline.outbox, list(message_times), message_times, args.delivery_timeout)
+
+        selected = [f"candidate{i}@example.com" for i, analysis in candidates if analysis["selected"]]
+
+        def schedule(email: str) -> Any:
+            slot = pipeline.schedule([email], args.role)[0]
+            if slot.error:
+                raise RuntimeError(slot.error)
+            return slot
+
+        stages["schedule"] = run_stage(selected, schedule, args.concurrency)["summary"]
+    finally:
+        pipeline.outbox.stop()
+        for server in (llm, smtp, zoom):
+            server.stop()
+
+    return {
+        "benchmark": "end_to_end",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "counters": {
+            "llm_requests": llm.requests,
+            "llm_prompt_tokens": llm.prompt_tokens,
+            "smtp_connections": smtp.connections,
+            "emails_sent": len(smtp.messages),
+            "zoom_token_requests": zoom.token_requests,
+            "zoom_meetings": len(zoom.meetings),
+            "selected": stages["schedule"]["count"],
+        },
+        "stages": stages,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Prints per-stage changes against a baseline and returns the stages that regressed"""
+    regressions = []
+    print(f"\nChange vs {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp')}):")
+    for stage, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        changes = []
+        for metric, higher_is_worse in (("p95_ms", True), ("throughput_per_s", False)):
+            if not before[metric]:
+                continue
+            change = (now[metric] - before[metric]) / before[metric]
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            changes.append(f"{metric} {change:+.1%}{' REGRESSION' if worse else ''}")
+            if worse:
+                regressions.append(f"{stage}.{metric}")
+        print(f"  {stage:9s} " + "  ".join(changes))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--pages", type=lambda s: [int(p) for p in s.split(",")], default=[1, 2, 4, 8],
+                        help="Comma separated page counts to draw resumes from")
+    parser.add_argument("--role", default="backend_engineer", choices=role_registry.roles())
+    parser.add_argument("--strong-ratio", type=float, default=0.4, help="Share of resumes that meet every requirement")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.25, help="Fake LLM base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Fake LLM latency jitter (+/- s)")
+    parser.add_argument("--per-1k-tokens", type=float, default=0.02, help="Fake LLM latency per 1k prompt tokens (s)")
+    parser.add_argument("--smtp-latency", type=float, default=0.01)
+    parser.add_argument("--zoom-latency", type=float, default=0.05)
+    parser.add_argument("--outbox-workers", type=int, default=2)
+    parser.add_argument("--token-budget", type=int, default=1500)
+    parser.add_argument("--delivery-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/e2e-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    print(f"{'stage':9s} {'n':>5s} {'err':>4s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'per s':>8s} {'peak MB':>8s}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:9s} {s['count']:5d} {s['errors']:4d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['p99_ms']:9.1f} "
+              f"{s['throughput_per_s']:8.1f} {s['peak_rss_mb']:8.1f}")
+    print("counters: " + ", ".join(f"{k}={v}" for k, v in report["counters"].items()))
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("e2e-%Y%m%d-%H%M%S.json"))
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("regressed: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Cost against accuracy of the analyzer model cascade, on resumes spread across the whole
+skill-match range so plenty of them are close calls. The fake OpenAI server plays a cheap
+model that flips some close-call verdicts and a slower, exact strong model; accuracy is
+measured against the strong model's verdict. Compares the strong model alone, the cheap
+model alone and the cascade (the route in the role's file).
+
+    python -m benchmarks.bench_model_routing --resumes 200 --cheap-noise 0.3
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import build_resume_analyzer
+from batch_screening import StubAnalyzer
+from benchmarks.fakes import FakeOpenAIServer
+from benchmarks.fixtures import SKILL_POOL, make_resume_pdf
+from model_routing import ModelRoute, RoutingStats, role_routes, run_routed_analysis
+from pdf_extraction import extract_text
+from role_registry import role_registry
+from screening import build_analysis_prompt
+
+# USD per 1M input tokens; prompts dominate the cost of an analysis
+PRICES = {"gpt-4.1-nano": 0.10, "gpt-4.1-mini": 0.40}
+
+
+def make_texts(count: int, role: str, seed: int) -> list:
+    """Resumes listing a uniformly random share of the role's required skills, plus unrelated ones"""
+    rng = random.Random(seed)
+    required = [group.label for group in role_registry.get(role).groups]
+    others = [skill for skill in SKILL_POOL if skill not in required]
+    texts = []
+    for i in range(count):
+        skills = rng.sample(required, rng.randint(0, len(required))) + rng.sample(others, 3)
+        texts.append(extract_text(make_resume_pdf(seed=seed + i, skills=skills)))
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--role", default="backend_engineer")
+    parser.add_argument("--cheap-noise", type=float, default=0.3, help="Chance the cheap model flips a close call")
+    parser.add_argument("--cheap-latency", type=float, default=0.05)
+    parser.add_argument("--strong-latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cascade = role_routes()[args.role]
+    cheap, strong = cascade.models[0], cascade.models[-1]
+    texts = make_texts(args.resumes, args.role, args.seed)
+    truth = [StubAnalyzer().run(build_analysis_prompt(text, args.role)).messages[0].content for text in texts]
+    truth = ['"selected": true' in answer for answer in truth]
+
+    llm = FakeOpenAIServer(latency=args.cheap_latency, jitter=0.0, seed=args.seed,
+                           model_latency={cheap: args.cheap_latency, strong: args.strong_latency},
+                           model_noise={cheap: args.cheap_noise}).start()
+    try:
+        strong_only_cost = None
+        for label, route in (("strong only", ModelRoute((strong,))), ("cheap only", ModelRoute((cheap,))),
+                             ("cascade", cascade)):
+            stats = RoutingStats()
+            local = threading.local()
+
+            def analyzer_for(model_id: str):
+                analyzers = local.__dict__.setdefault("analyzers", {})
+                if model_id not in analyzers:
+                    analyzers[model_id] = build_resume_analyzer("fake-key", base_url=llm.base_url, model_id=model_id)
+                return analyzers[model_id]
+
+            def analyze(text: str) -> bool:
+                return bool(run_routed_analysis(text, args.role, analyzer_for, route, stats=stats)["selected"])
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                verdicts = list(pool.map(analyze, texts))
+            wall = time.perf_counter() - started
+
+            summary = stats.stats()
+            accuracy = sum(v == t for v, t in zip(verdicts, truth)) / len(texts)
+            cost = sum(PRICES.get(model, 0.0) * tier["calls"] for model, tier in summary["models"].items())
+            strong_only_cost = cost if label == "strong only" else strong_only_cost
+            tiers = "  ".join(f"{model}: {tier['calls']} calls, {tier['mean_ms']:.0f} ms mean"
+                              for model, tier in summary["models"].items())
+            print(f"{label:12s} accuracy {accuracy:6.1%}  wall {wall:5.2f} s  {tiers}")
+            if strong_only_cost:
+                print(f"{'':12s} cost {cost / strong_only_cost:5.0%} of the strong model alone")
+            if len(route.models) > 1:
+                print(f"{'':12s} escalated {summary['escalation_rate']:.1%} {summary['reasons']}, "
+                      f"strong model agreed with the cheap one {summary['agreement_rate']:.1%}")
+    finally:
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
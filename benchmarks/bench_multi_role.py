@@ -0,0 +1,97 @@
+"""
+One analyzer call per resume for every role, against the baseline of one full-resume call per
+role. Both run through the real OpenAI-backed agent against the fake OpenAI server, whose
+latency grows with prompt length. Reports prompt tokens and requests per resume, latency per
+resume (N calls one after another, N calls in parallel, and one multi-role call), and whether
+the single pass reaches the same verdicts. --extra-roles adds synthetic roles next to the real
+ones, to show how both approaches scale with the number of open roles.
+
+    python -m benchmarks.bench_multi_role --resumes 40 --extra-roles 7
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from agents import build_resume_analyzer
+from analysis_schema import MULTI_ROLE_RESPONSE_FORMAT
+from benchmarks.bench_role_registry import write_roles
+from benchmarks.fakes import FakeOpenAIServer
+from benchmarks.fixtures import SKILL_POOL, make_resume_pdf
+from pdf_extraction import extract_text
+from role_registry import DEFAULT_ROLES_DIR, role_registry
+from screening import run_analysis, run_multi_role_analysis
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def measure(label: str, llm: FakeOpenAIServer, texts: List[str], analyze: Callable[[str], dict]) -> List[dict]:
+    requests, tokens = llm.requests, llm.prompt_tokens
+    latencies, results = [], []
+    for text in texts:
+        started = time.perf_counter()
+        results.append(analyze(text))
+        latencies.append(time.perf_counter() - started)
+    count = len(texts)
+    print(f"  {label:24s} {(llm.requests - requests) / count:5.1f} calls  "
+          f"{(llm.prompt_tokens - tokens) / count:7.0f} prompt tokens  "
+          f"p50 {percentile(latencies, 0.5) * 1000:6.0f} ms  p95 {percentile(latencies, 0.95) * 1000:6.0f} ms per resume")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--extra-roles", type=int, default=0, help="Synthetic roles added to the real ones")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed latency of a model call")
+    parser.add_argument("--per-1k-tokens", type=float, default=0.1, help="Extra latency per 1k prompt tokens")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.extra_roles:
+        directory = tempfile.mkdtemp(prefix="roles-bench-")
+        for name in os.listdir(DEFAULT_ROLES_DIR):
+            shutil.copy(os.path.join(DEFAULT_ROLES_DIR, name), directory)
+        write_roles(directory, args.extra_roles, args.seed)
+        role_registry.directory = directory
+    roles = role_registry.roles()
+    rng = random.Random(args.seed)
+    texts = [extract_text(make_resume_pdf(seed=args.seed + i, pages=rng.choice((1, 2)),
+                                          skills=rng.sample(SKILL_POOL, rng.randint(4, 12))))
+             for i in range(args.resumes)]
+    print(f"{len(texts)} resumes, {len(roles)} roles")
+
+    llm = FakeOpenAIServer(latency=args.latency, jitter=0.0, per_1k_prompt_tokens=args.per_1k_tokens,
+                           seed=args.seed).start()
+    pool = ThreadPoolExecutor(max_workers=len(roles))
+    try:
+        single = build_resume_analyzer("fake-key", base_url=llm.base_url)
+        multi = build_resume_analyzer("fake-key", base_url=llm.base_url, response_format=MULTI_ROLE_RESPONSE_FORMAT)
+        # Agents are not shared across threads, so the parallel baseline gets one per role
+        parallel = {role: build_resume_analyzer("fake-key", base_url=llm.base_url) for role in roles}
+
+        baseline = measure("N calls, sequential", llm, texts,
+                           lambda text: {role: run_analysis(text, role, single) for role in roles})
+        measure("N calls, parallel", llm, texts,
+                lambda text: dict(zip(roles, pool.map(lambda role: run_analysis(text, role, parallel[role]), roles))))
+        matched = measure("1 multi-role call", llm, texts, lambda text: run_multi_role_analysis(text, multi, roles))
+    finally:
+        pool.shutdown()
+        llm.stop()
+
+    agree = sum(fit["selected"] == verdicts[fit["role"]]["selected"]
+                and fit["matching_skills"] == verdicts[fit["role"]]["matching_skills"]
+                for verdicts, result in zip(baseline, matched) for fit in result["roles"])
+    fitting = sum(bool(result["fitting_roles"]) for result in matched)
+    print(f"  verdicts agreeing with the per-role calls: {agree}/{len(texts) * len(roles)}; "
+          f"{fitting} resumes fit at least one role")
+
+
+if __name__ == "__main__":
+    main()
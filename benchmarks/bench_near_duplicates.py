@@ -0,0 +1,126 @@
+"""
+Near-duplicate detection at scale, then end to end. First the MinHash/LSH index on its own:
+signing cost, lookup latency and memory once it holds --index-size resumes (fixture resumes,
+topped up with signatures of unrelated documents), and how many lightly edited resubmissions
+it catches. Then a stream of applications where a share are resubmissions, screened through
+the pipeline with and without near-duplicate detection: analyzer calls and emails queued.
+
+    python -m benchmarks.bench_near_duplicates --index-size 100000 --resubmit 0.3
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from batch_screening import StubAnalyzer
+from benchmarks.fixtures import make_resume_pages
+from candidate_store import DUPLICATE_THRESHOLD, CandidateStore
+from email_outbox import EmailOutbox
+from near_duplicates import MinHasher, MinHashIndex
+from pipeline import ScreeningPipeline
+
+
+def resume_text(seed: int) -> str:
+    return "\n".join(make_resume_pages(random.Random(seed), pages=1)[0])
+
+
+def resubmit(text: str, rng: random.Random) -> str:
+    """A lightly edited copy: a typo, a reworded line, a new contact address or one extra line"""
+    lines = text.split("\n")
+    edit = rng.choice(("typo", "reword", "email", "append"))
+    if edit == "typo":
+        line = rng.randrange(7, len(lines))
+        lines[line] = lines[line].replace("e", "a", 1)
+    elif edit == "reword":
+        line = rng.randrange(7, len(lines))
+        lines[line] = lines[line].replace("Led", "Headed").replace("Wrote", "Authored").replace("using", "with")
+    elif edit == "email":
+        lines[2] = lines[2].replace("@example.com", "@mail.test")
+    else:
+        lines.insert(-1, "Volunteer mentor at a local coding club")
+    return "\n".join(lines)
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench_index(args: argparse.Namespace) -> None:
+    hasher = MinHasher()
+    texts = [resume_text(seed) for seed in range(args.resumes)]
+    started = time.perf_counter()
+    signatures = np.stack([hasher.signature(text) for text in texts])
+    signing = (time.perf_counter() - started) / len(texts)
+
+    index = MinHashIndex(hasher.num_perm)
+    index.extend(np.arange(len(texts)), signatures)
+    filler = max(0, args.index_size - len(texts))
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    index.extend(np.arange(len(texts), len(texts) + filler),
+                 rng.integers(0, 1 << 16, size=(filler, hasher.num_perm), dtype=np.uint16))
+    print(f"index of {len(index)} resumes built in {time.perf_counter() - started:.2f} s, "
+          f"{index.nbytes / 1e6:.1f} MB ({index.nbytes / len(index):.0f} bytes per resume); "
+          f"signing {signing * 1e6:.0f} us per resume")
+
+    edit_rng = random.Random(args.seed)
+    probes = [(i, resubmit(texts[i], edit_rng)) for i in edit_rng.sample(range(len(texts)), min(1000, len(texts)))]
+    latencies, caught = [], 0
+    for original, text in probes:
+        signature = hasher.signature(text)
+        started = time.perf_counter()
+        matches = index.query(signature, DUPLICATE_THRESHOLD)
+        latencies.append(time.perf_counter() - started)
+        caught += any(key == original for key, _ in matches)
+    unrelated = [hasher.signature(resume_text(seed)) for seed in range(10 ** 6, 10 ** 6 + 1000)]
+    false = sum(bool(index.query(signature, DUPLICATE_THRESHOLD)) for signature in unrelated)
+    print(f"  lookup p50 {percentile(latencies, 0.5) * 1e6:.0f} us  p99 {percentile(latencies, 0.99) * 1e6:.0f} us; "
+          f"caught {caught}/{len(probes)} resubmissions, {false}/{len(unrelated)} unrelated resumes matched")
+
+
+def bench_pipeline(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    stream, originals = [], []
+    for i in range(args.applications):
+        if originals and rng.random() < args.resubmit:
+            stream.append(resubmit(rng.choice(originals), rng))
+        else:
+            originals.append(resume_text(2 * 10 ** 6 + i))
+            stream.append(originals[-1])
+    print(f"{len(stream)} applications, {len(stream) - len(originals)} of them resubmissions")
+    for dedupe in (False, True):
+        directory = tempfile.mkdtemp(prefix="dedupe-bench-")
+        analyzer = StubAnalyzer()
+        outbox = EmailOutbox(drafter=lambda message: ("", ""), sender=None, sender_address="hr@acme.test",
+                             path=os.path.join(directory, "outbox.sqlite3"))
+        pipeline = ScreeningPipeline(lambda: analyzer, store=CandidateStore(os.path.join(directory, "store.sqlite3")),
+                                     outbox=outbox, dedupe=dedupe)
+        started = time.perf_counter()
+        results = [pipeline.process(f"resume_{i}.pdf", args.role, resume_text=text) for i, text in enumerate(stream)]
+        wall = time.perf_counter() - started
+        queued = sum(bool(result.email_queued) for result in results)
+        errors = sum(bool(result.error) for result in results)
+        print(f"  dedupe {'on ' if dedupe else 'off'}  analyzer calls {analyzer.calls:5d}  emails queued {queued:5d}  "
+              f"errors {errors}  {wall / len(stream) * 1000:.2f} ms per application")
+        if dedupe:
+            print(f"  {pipeline.store.duplicate_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--index-size", type=int, default=100000)
+    parser.add_argument("--resumes", type=int, default=5000, help="Fixture resumes in the index; the rest is filler")
+    parser.add_argument("--applications", type=int, default=2000)
+    parser.add_argument("--resubmit", type=float, default=0.3, help="Share of applications that resubmit a resume")
+    parser.add_argument("--role", default="backend_engineer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    bench_index(args)
+    bench_pipeline(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares the original UI-thread extraction (string concatenation, one file at a time)
+with pdf_extraction's process pool on a synthetic corpus.
+
+    python -m benchmarks.bench_pdf_extraction --resumes 200 --workers 4
+"""
+import argparse
+import io
+import time
+
+import PyPDF2
+
+from benchmarks.fixtures import make_corpus, make_resume_pdf
+from pdf_extraction import count_pages, extract_many, extract_text_parallel
+
+
+def baseline_extract(data: bytes) -> str:
+    # The original extract_text_from_pdf loop
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = ""
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text
+    return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--long-pages", type=int, default=48)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.resumes)
+    pages = sum(count_pages(data) for _, data in corpus)
+
+    started = time.perf_counter()
+    for _, data in corpus:
+        baseline_extract(data)
+    baseline = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in extract_many(corpus, max_workers=args.workers):
+        pass
+    pooled = time.perf_counter() - started
+
+    print(f"multi-file: {len(corpus)} resumes, {pages} pages")
+    print(f"  baseline   {pages / baseline:8.1f} pages/s")
+    print(f"  pooled     {pages / pooled:8.1f} pages/s  ({baseline / pooled:.2f}x)")
+
+    long_pdf = make_resume_pdf(seed=1, pages=args.long_pages)
+    started = time.perf_counter()
+    baseline_extract(long_pdf)
+    baseline = time.perf_counter() - started
+    started = time.perf_counter()
+    extract_text_parallel(long_pdf, max_workers=args.workers, max_pages=args.long_pages)
+    pooled = time.perf_counter() - started
+    print(f"single {args.long_pages}-page document")
+    print(f"  baseline   {args.long_pages / baseline:8.1f} pages/s")
+    print(f"  pooled     {args.long_pages / pooled:8.1f} pages/s  ({baseline / pooled:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
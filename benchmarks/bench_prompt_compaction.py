@@ -0,0 +1,47 @@
+"""
+Measures prompt tokens and end-to-end analysis latency with and without prompt compaction
+on a fixture corpus, using StubAnalyzer with a per-token latency as the model.
+
+    python -m benchmarks.bench_prompt_compaction --resumes 50 --budget 1500
+"""
+import argparse
+import statistics
+import time
+
+from batch_screening import StubAnalyzer
+from benchmarks.fixtures import make_corpus
+from pdf_extraction import extract_text
+from prompt_compaction import PromptCompactor, compact_resume, count_tokens
+from screening import build_analysis_prompt, run_analysis
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=1500)
+    parser.add_argument("--role", default="backend_engineer")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=40.0,
+                        help="simulated prompt processing time of the model")
+    args = parser.parse_args()
+
+    texts = [extract_text(data) for _, data in make_corpus(args.resumes)]
+    compactor = PromptCompactor(args.budget)
+
+    for label, stage in (("raw", None), ("compacted", compactor)):
+        analyzer = StubAnalyzer(latency_per_1k_tokens=args.ms_per_1k_tokens / 1000)
+        tokens, latencies = [], []
+        for text in texts:
+            prompt_text = compact_resume(text, args.budget).text if stage else text
+            tokens.append(count_tokens(build_analysis_prompt(prompt_text, args.role)))
+            started = time.perf_counter()
+            run_analysis(text, args.role, analyzer, compactor=stage)
+            latencies.append(time.perf_counter() - started)
+        print(f"{label:10s} prompt tokens: mean {statistics.mean(tokens):7.0f}  total {sum(tokens):8d}   "
+              f"latency: mean {statistics.mean(latencies) * 1000:6.1f} ms  total {sum(latencies):6.2f} s")
+
+    print(f"resume tokens before/after compaction: {compactor.tokens_before} -> {compactor.tokens_after} "
+          f"({1 - compactor.tokens_after / compactor.tokens_before:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
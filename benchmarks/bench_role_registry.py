@@ -0,0 +1,68 @@
+"""
+Startup and lookup cost of the role registry with hundreds of role files. Writes --roles
+synthetic YAML roles (random skills from the fixture pool, some weights and synonyms) to a
+temporary directory, then times: listing the roles (what startup pays), the first and later
+lookups of one role, a lookup after its file was edited, and compiling every role up front
+as a registry without lazy loading would at startup.
+
+    python -m benchmarks.bench_role_registry --roles 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.fixtures import SKILL_POOL
+from role_registry import RoleRegistry
+
+
+def write_roles(directory: str, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for i in range(count):
+        skills = rng.sample(SKILL_POOL, min(len(SKILL_POOL), rng.randint(6, 14)))
+        bullets = [", ".join(skills[start:start + 3]) for start in range(0, len(skills), 3)]
+        definition = {"title": f"Role {i}", "requirements": bullets,
+                      "weights": {skills[0]: 2}, "synonyms": {skills[1].lower(): [f"{skills[1].lower()} {i}"]}}
+        with open(os.path.join(directory, f"role_{i:04d}.yaml"), "w", encoding="utf-8") as f:
+            yaml.safe_dump(definition, f)
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="roles-bench-")
+    write_roles(directory, args.roles, args.seed)
+    registry = RoleRegistry(directory)
+    print(f"{args.roles} role files in {directory}")
+    print(f"  startup (list roles)     {timed(registry.roles):8.2f} ms")
+    role = registry.roles()[0]
+    print(f"  first lookup (compile)   {timed(lambda: registry.get(role)):8.2f} ms")
+    warm = timed(lambda: [registry.get(role) for _ in range(args.lookups)]) / args.lookups
+    print(f"  cached lookup            {warm * 1000:8.2f} us")
+
+    path = registry.get(role).source
+    before = registry.version(role)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("route: {band: 0.2}\n")
+    print(f"  lookup after an edit     {timed(lambda: registry.get(role)):8.2f} ms  "
+          f"(version {before} -> {registry.version(role)})")
+
+    eager = RoleRegistry(directory)
+    print(f"  compile every role       {timed(eager.compiled):8.2f} ms  (startup without lazy loading)")
+
+
+if __name__ == "__main__":
+    main()
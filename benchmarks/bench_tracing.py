@@ -0,0 +1,62 @@
+"""
+Measures what the stage instrumentation costs: the per-span overhead with tracing off and
+on, and the end-to-end effect on screening a corpus with a zero-latency stub analyzer
+(the worst case, since a real LLM call dwarfs any span).
+
+    python -m benchmarks.bench_tracing --resumes 200
+"""
+import argparse
+import time
+
+from batch_screening import StubAnalyzer
+from benchmarks.fixtures import make_corpus
+from pdf_extraction import extract_text
+from prefilter import Prefilter
+from prompt_compaction import PromptCompactor
+from screening import run_analysis
+from tracing import Tracer, tracer
+
+
+def span_cost_ns(spans: Tracer, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with spans.span("stage", attempt=1) as span:
+            span.set(tokens=1)
+    return (time.perf_counter() - started) / iterations * 1e9
+
+
+def screen(texts, analyzer, prefilter, compactor) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        with tracer.span("candidate"):
+            run_analysis(text, "backend_engineer", analyzer, prefilter=prefilter, compactor=compactor)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    off_ns = span_cost_ns(Tracer(enabled=False), args.iterations)
+    on_ns = span_cost_ns(Tracer(enabled=True), args.iterations // 10)
+    print(f"per span: {off_ns:7.0f} ns disabled, {on_ns:7.0f} ns enabled")
+
+    texts = [extract_text(data) for _, data in make_corpus(args.resumes, page_choices=(1, 2))]
+    # Threshold 0 so every resume reaches the (stub) model call and all stages run
+    prefilter, compactor, analyzer = Prefilter(threshold=0.0), PromptCompactor(1500), StubAnalyzer()
+    screen(texts, analyzer, prefilter, compactor)
+    timings = {}
+    for enabled in (False, True):
+        tracer.enabled = enabled
+        timings[enabled] = min(screen(texts, analyzer, prefilter, compactor) for _ in range(args.rounds))
+    tracer.enabled = False
+    overhead = timings[True] / timings[False] - 1
+    print(f"screening {len(texts)} resumes: {timings[False] * 1000:7.1f} ms tracing off, "
+          f"{timings[True] * 1000:7.1f} ms tracing on ({overhead:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
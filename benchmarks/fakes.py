@@ -0,0 +1,301 @@
+"""
+Deterministic local stand-ins for the services the pipeline talks to, so benchmarks and
+load tests run offline: an OpenAI-compatible chat completions server, an SMTP server and
+the two Zoom endpoints the scheduler uses. Each runs on a daemon thread on a free port.
+"""
+import itertools
+import json
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from batch_screening import StubAnalyzer
+from prompt_compaction import count_tokens
+
+FEEDBACK_PARAGRAPH = "your python background is solid, but we were looking for more hands-on kubernetes and cloud work."
+EMAIL_BODY = ("thank you for applying, we appreciate the effort you put into your application. " * 12).strip()
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body waits ~40 ms for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return {}
+
+    def send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that go away mid-request (e.g. a killed worker process) are expected here
+        pass
+
+    def start(self) -> "_Server":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeOpenAIServer(_Server):
+    """
+    Answers POST /v1/chat/completions. Analysis prompts get the StubAnalyzer's keyword-match
+    verdict, email prompts a canned draft. Each response waits latency + per-token cost of
+    the prompt, plus uniform jitter drawn from a seeded generator.
+
+    With `malformed_rate`, that share of analysis answers is broken the way real models break
+    JSON (see MALFORMATIONS); `malformed` counts them by kind.
+
+    `model_latency` and `model_noise` give named models their own base latency and their own
+    chance of flipping the verdict on a close call (skill match within 0.2 of 70%), to stand
+    in for a cheap and a strong model; `calls_by_model` counts requests per model.
+    """
+
+    MALFORMATIONS = ("fenced", "prose", "trailing_comma", "truncated", "missing_field")
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, per_1k_prompt_tokens: float = 0.0,
+                 seed: int = 0, malformed_rate: float = 0.0, model_latency: Optional[Dict[str, float]] = None,
+                 model_noise: Optional[Dict[str, float]] = None):
+        super().__init__(("127.0.0.1", 0), self._handler())
+        self.latency = latency
+        self.jitter = jitter
+        self.per_1k_prompt_tokens = per_1k_prompt_tokens
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.malformed_rate = malformed_rate
+        self.model_latency = model_latency or {}
+        self.model_noise = model_noise or {}
+        self.calls_by_model: Dict[str, int] = {}
+        self.malformed: Dict[str, int] = dict.fromkeys(self.MALFORMATIONS, 0)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return self.url + "/v1"
+
+    def answer(self, prompt: str, model: str = "") -> str:
+        if "Resume Text:" in prompt:
+            return self.malform(self.perturb(StubAnalyzer().run(prompt).messages[0].content, model))
+        if "one short paragraph" in prompt:
+            return FEEDBACK_PARAGRAPH
+        return f"Subject: Your application\n\n{EMAIL_BODY}"
+
+    def perturb(self, content: str, model: str) -> str:
+        noise = self.model_noise.get(model, 0.0)
+        if not noise:
+            return content
+        fields = json.loads(content)
+        flipped = False
+        # A multi-role answer has one verdict per role, each of which may flip
+        for verdict in fields.get("roles", [fields]):
+            total = len(verdict["matching_skills"]) + len(verdict["missing_skills"])
+            match = len(verdict["matching_skills"]) / total if total else 0.0
+            with self._lock:
+                flip = abs(match - 0.7) <= 0.2 and self._rng.random() < noise
+            if flip:
+                verdict["selected"] = not verdict["selected"]
+                flipped = True
+        return json.dumps(fields) if flipped else content
+
+    def malform(self, content: str) -> str:
+        with self._lock:
+            if self._rng.random() >= self.malformed_rate:
+                return content
+            kind = self._rng.choice(self.MALFORMATIONS)
+            cut = self._rng.uniform(0.5, 0.95)
+            self.malformed[kind] += 1
+        if kind == "fenced":
+            return f"```json\n{content}\n```"
+        if kind == "prose":
+            return f"Here is my assessment of the candidate:\n{content}\nLet me know if you need anything else."
+        if kind == "trailing_comma":
+            return content[:-1] + ",}"
+        if kind == "truncated":
+            return content[:int(len(content) * cut)]
+        fields = json.loads(content)
+        fields.pop("feedback" if cut < 0.725 else "selected")
+        return json.dumps(fields)
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(_JsonHandler):
+            def do_POST(self) -> None:
+                request = self.read_json()
+                messages = request.get("messages", [])
+                prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+                tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+                model = request.get("model", "fake")
+                with server._lock:
+                    server.requests += 1
+                    server.calls_by_model[model] = server.calls_by_model.get(model, 0) + 1
+                    server.prompt_tokens += tokens
+                    delay = server.model_latency.get(model, server.latency) + server.per_1k_prompt_tokens * tokens / 1000
+                    delay += server._rng.uniform(-server.jitter, server.jitter)
+                    completion_id = next(server._ids)
+                time.sleep(max(0.0, delay))
+                content = server.answer(prompt, model)
+                self.send_json({
+                    "id": f"chatcmpl-{completion_id}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": tokens, "completion_tokens": count_tokens(content),
+                              "total_tokens": tokens + count_tokens(content)},
+                })
+
+        return Handler
+
+
+class FakeZoomServer(_Server):
+    """Serves the OAuth token endpoint and POST /v2/users/me/meetings, after `latency` seconds"""
+
+    def __init__(self, latency: float = 0.05):
+        super().__init__(("127.0.0.1", 0), self._handler())
+        self.latency = latency
+        self.token_requests = 0
+        self.meetings: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1000)
+
+    @property
+    def token_url(self) -> str:
+        return self.url + "/oauth/token"
+
+    @property
+    def api_base(self) -> str:
+        return self.url + "/v2"
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(_JsonHandler):
+            def do_POST(self) -> None:
+                request = self.read_json()
+                time.sleep(server.latency)
+                if self.path.startswith("/oauth/token"):
+                    with server._lock:
+                        server.token_requests += 1
+                    self.send_json({"access_token": "fake-token", "token_type": "bearer", "expires_in": 3600})
+                    return
+                with server._lock:
+                    meeting_id = next(server._ids)
+                    server.meetings.append(request)
+                self.send_json({
+                    "id": meeting_id,
+                    "topic": request.get("topic", ""),
+                    "start_time": request.get("start_time", ""),
+                    "duration": request.get("duration", 60),
+                    "join_url": f"{server.url}/j/{meeting_id}",
+                }, status=201)
+
+        return Handler
+
+
+class FakeSmtpServer(socketserver.ThreadingTCPServer):
+    """
+    Minimal SMTP server (EHLO, AUTH, MAIL, RCPT, DATA) that keeps every message in memory.
+    The next `fail_next` messages are refused with a transient 451 after their DATA.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency: float = 0.0, fail_next: int = 0):
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.latency = latency
+        self.fail_next = fail_next
+        self.refused = 0
+        self.messages: List[str] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeSmtpServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    # Multi-line replies are written line by line; see _JsonHandler
+    disable_nagle_algorithm = True
+
+    def reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+
+    def handle(self) -> None:
+        server: FakeSmtpServer = self.server
+        with server._lock:
+            server.connections += 1
+        self.reply("220 fake-smtp ready")
+        in_data, lines = False, []
+        for raw in self.rfile:
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    time.sleep(server.latency)
+                    with server._lock:
+                        refuse = server.fail_next > 0
+                        if refuse:
+                            server.fail_next -= 1
+                            server.refused += 1
+                        else:
+                            server.messages.append("\n".join(lines))
+                    lines = []
+                    self.reply("451 try again later" if refuse else "250 queued")
+                else:
+                    lines.append(line)
+                continue
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250-fake-smtp")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command == "AUTH":
+                self.reply("235 authenticated")
+            elif command == "DATA":
+                in_data = True
+                self.reply("354 end with .")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
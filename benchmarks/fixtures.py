@@ -0,0 +1,131 @@
+import random
+import zlib
+from typing import List, Optional, Sequence
+
+SKILL_POOL = [
+    "Python", "PyTorch", "TensorFlow", "Machine Learning", "Deep Learning", "Neural Networks",
+    "Data Preprocessing", "MLOps", "Model Deployment", "RAG", "LLMs", "Prompt Engineering",
+    "React", "Vue.js", "Angular", "HTML5", "CSS3", "JavaScript", "TypeScript", "Responsive Design",
+    "Redux", "Jest", "Java", "Node.js", "REST APIs", "PostgreSQL", "System Architecture", "AWS",
+    "GCP", "Azure", "Kubernetes", "Docker", "CI/CD", "Go", "Rust", "Excel", "Sales", "Marketing",
+]
+
+FILLER = [
+    "Led a team of engineers delivering features on a fixed schedule",
+    "Improved service latency by profiling hot paths and removing redundant work",
+    "Collaborated with product and design to ship customer facing improvements",
+    "Mentored junior developers and ran weekly code review sessions",
+    "Wrote documentation and onboarding guides for new team members",
+    "Migrated legacy services to a containerised deployment pipeline",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: Sequence[Sequence[str]]) -> bytes:
+    """
+    Writes a minimal, valid PDF with one Helvetica text page per entry in `pages`.
+    No third-party PDF writer is needed, so the fixtures build anywhere PyPDF2 runs.
+    """
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 2 * i} 0 R" for i in range(page_count)), page_count),
+    ]
+    for i, lines in enumerate(pages):
+        content = "BT /F1 10 Tf 50 760 Td 13 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    return _write_pdf(objects)
+
+
+def make_scanned_pdf(pages: Sequence[Sequence[str]], dpi: int = 150) -> bytes:
+    """
+    Writes an image-only PDF the way a scanner does: each page is a grayscale picture of its
+    lines with no text layer, so only OCR can read it. Needs Pillow, which pytesseract pulls in.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    scale = dpi / 72
+    width, height = int(612 * scale), int(792 * scale)
+    font = ImageFont.load_default(size=int(10 * scale))
+    page_count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 3 * i} 0 R" for i in range(page_count)), page_count),
+    ]
+    for i, lines in enumerate(pages):
+        image = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(image)
+        for n, line in enumerate(lines):
+            draw.text((50 * scale, (22 + 13 * n) * scale), line, fill=0, font=font)
+        pixels = zlib.compress(image.tobytes()).decode("latin-1")
+        content = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 3 * i} 0 R "
+            f"/Resources << /XObject << /Im1 {5 + 3 * i} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceGray "
+                       f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>\nstream\n{pixels}\nendstream")
+    return _write_pdf(objects)
+
+
+def _write_pdf(objects: List[str]) -> bytes:
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_resume_lines(rng: random.Random, skills: Optional[List[str]] = None, lines: int = 40) -> List[str]:
+    """Generates the lines of a plausible one-page resume with the given (or random) skills"""
+    return make_resume_pages(rng, skills, pages=1, lines_per_page=lines)[0]
+
+
+def make_resume_pages(rng: random.Random, skills: Optional[List[str]] = None, pages: int = 1,
+                      lines_per_page: int = 40) -> List[List[str]]:
+    """
+    Generates a resume laid out over `pages` pages, with the running header and
+    "Page i of n" footer real exports carry, which prompt compaction should strip.
+    """
+    skills = skills if skills is not None else rng.sample(SKILL_POOL, rng.randint(4, 12))
+    name = f"Candidate {rng.randint(1000, 9999)}"
+    body = [name, f"{name.lower().replace(' ', '.')}@example.com", "SUMMARY",
+            f"Engineer with {rng.randint(1, 12)} years of experience in {', '.join(skills[:3])}",
+            "SKILLS", ", ".join(skills), "EXPERIENCE"]
+    total = pages * (lines_per_page - 2)
+    projects_at = int(total * 0.7)
+    while len(body) < total - 3:
+        if len(body) == projects_at:
+            body.append("PROJECTS")
+        body.append(f"- {rng.choice(FILLER)} using {rng.choice(skills)}")
+    body += ["EDUCATION", "B.Tech in Computer Science", "References available upon request"]
+    per_page = lines_per_page - 2
+    return [[f"{name} - Resume"] + body[i * per_page:(i + 1) * per_page] + [f"Page {i + 1} of {pages}"]
+            for i in range(pages)]
+
+
+def make_resume_pdf(seed: int = 0, pages: int = 1, skills: Optional[List[str]] = None, scanned: bool = False) -> bytes:
+    layout = make_resume_pages(random.Random(seed), skills, pages)
+    return make_scanned_pdf(layout) if scanned else make_pdf(layout)
+
+
+def make_corpus(count: int, page_choices: Sequence[int] = (1, 2, 3, 5, 10), seed: int = 0) -> List[tuple]:
+    """Returns `count` (name, pdf bytes) resumes of varied page counts"""
+    rng = random.Random(seed)
+    return [(f"resume_{i:04d}.pdf", make_resume_pdf(seed=seed + i, pages=rng.choice(page_choices)))
+            for i in range(count)]
@@ -0,0 +1,437 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from analysis_cache import normalize_resume_text
+from near_duplicates import MinHasher, MinHashIndex, jaccard
+from prefilter import SYNONYMS, SkillGroup, parse_skill_groups
+from role_registry import role_registry
+from tracing import tracer
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "candidates.sqlite3")
+
+# Estimated shingle overlap above which a resume is linked to an earlier submission
+DUPLICATE_THRESHOLD = 0.8
+# Exact overlap above which, with the same skills found, the earlier analysis is reused as is
+REUSE_THRESHOLD = 0.95
+
+
+class SkillVocabulary:
+    """
+    Role-independent list of skills. Every alias of a skill (k8s, Kubernetes) maps to the
+    same column, so candidate vectors never have to be rebuilt when a role is added,
+    only when the vocabulary itself grows.
+    """
+
+    def __init__(self, requirements: Optional[Dict[str, str]] = None):
+        self.skills: List[str] = []
+        self.alias_to_id: Dict[str, int] = {}
+        for canonical, aliases in SYNONYMS.items():
+            self._add(canonical, aliases)
+        if requirements is not None:
+            groups = [group for text in requirements.values() for group in parse_skill_groups(text)]
+        else:
+            # Compiles every registered role once, so the columns cover all their skills and synonyms
+            groups = [group for compiled in role_registry.compiled() for group in compiled.groups]
+        for group in groups:
+            for term in group.terms:
+                self._add(term, [])
+        alternation = "|".join(re.escape(a) for a in sorted(self.alias_to_id, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<![\w.+#-])(?:{alternation})(?![\w+#])")
+        self.version = hashlib.sha256("\n".join(sorted(self.alias_to_id)).encode()).hexdigest()[:16]
+
+    def _add(self, canonical: str, aliases: Iterable[str]) -> None:
+        skill_id = self.alias_to_id.get(canonical)
+        if skill_id is None:
+            skill_id = len(self.skills)
+            self.skills.append(canonical)
+            self.alias_to_id[canonical] = skill_id
+        for alias in aliases:
+            self.alias_to_id.setdefault(alias, skill_id)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def ids_for(self, terms: Iterable[str]) -> List[int]:
+        return sorted({self.alias_to_id[t.lower()] for t in terms if t.lower() in self.alias_to_id})
+
+    def vectorize(self, resume_text: str) -> np.ndarray:
+        """Log-scaled, L2-normalized skill term frequencies"""
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        for match in self.pattern.findall(resume_text.lower()):
+            vector[self.alias_to_id[match]] += 1.0
+        np.log1p(vector, out=vector)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+@dataclass
+class NearDuplicate:
+    """An earlier submission a resume nearly repeats; `analysis` is set when it can be reused for the role"""
+    candidate_id: int
+    email: str
+    similarity: float
+    analysis: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"candidate_id": self.candidate_id, "email": self.email, "similarity": round(self.similarity, 3),
+                "reused": self.analysis is not None}
+
+
+@dataclass
+class RankedCandidate:
+    candidate_id: int
+    name: str
+    email: str
+    score: float
+    analysis: Optional[Dict[str, Any]]
+
+    def to_row(self) -> Dict[str, Any]:
+        analysis = self.analysis or {}
+        return {
+            "candidate": self.name,
+            "email": self.email,
+            "score": round(self.score, 3),
+            "screened": bool(analysis),
+            "selected": analysis.get("selected"),
+            "experience_level": analysis.get("experience_level", ""),
+            "matching_skills": ", ".join(analysis.get("matching_skills", [])),
+            "missing_skills": ", ".join(analysis.get("missing_skills", [])),
+        }
+
+
+class CandidateStore:
+    """
+    Persistent pool of every screened candidate.
+
+    SQLite holds the resume text, the skill vector and the analyzer's JSON per role.
+    A dense float32 matrix of skill vectors and an inverted index (skill -> rows) are
+    kept in memory, so ranking the whole pool for any role, including roles added after
+    the candidates were screened, is a handful of vectorized NumPy operations.
+
+    Each resume's MinHash signature is stored too, and an LSH index over them (see
+    near_duplicates) finds earlier submissions a new resume nearly repeats. A near-duplicate
+    is stored as its own candidate, linked to the first submission through `duplicate_of`.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, vocabulary: Optional[SkillVocabulary] = None,
+                 hasher: Optional[MinHasher] = None, duplicate_threshold: float = DUPLICATE_THRESHOLD,
+                 reuse_threshold: float = REUSE_THRESHOLD):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Built on first use: the default one compiles every registered role
+        self._vocabulary = vocabulary
+        self.hasher = hasher or MinHasher()
+        self.duplicate_threshold = duplicate_threshold
+        self.reuse_threshold = reuse_threshold
+        self.duplicate_lookups = 0
+        self.duplicates_found = 0
+        self.analyses_reused = 0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS candidates (
+                    id INTEGER PRIMARY KEY,
+                    content_hash TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    resume_text TEXT NOT NULL,
+                    skills BLOB NOT NULL,
+                    vocab_version TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    minhash BLOB,
+                    minhash_version TEXT,
+                    duplicate_of INTEGER REFERENCES candidates (id)
+                )"""
+            )
+            # Stores created before near-duplicate detection; their signatures are filled in on first lookup
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(candidates)")}
+            for column, kind in (("minhash", "BLOB"), ("minhash_version", "TEXT"), ("duplicate_of", "INTEGER")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE candidates ADD COLUMN {column} {kind}")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS analyses (
+                    candidate_id INTEGER NOT NULL REFERENCES candidates (id),
+                    role TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    screened_at REAL NOT NULL,
+                    PRIMARY KEY (candidate_id, role)
+                )"""
+            )
+        # Row buffers grow geometrically so appending one candidate is amortized O(vocabulary)
+        self._size = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        # Sized to the vocabulary by _load
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._inverted: Dict[int, List[int]] = {}
+        self._posting_arrays: Dict[int, np.ndarray] = {}
+        self._loaded = False
+        self._minhash = MinHashIndex(self.hasher.num_perm)
+        self._minhash_loaded = False
+
+    @property
+    def vocabulary(self) -> SkillVocabulary:
+        if self._vocabulary is None:
+            with self._lock:
+                if self._vocabulary is None:
+                    self._vocabulary = SkillVocabulary()
+        return self._vocabulary
+
+    # --- writes ---------------------------------------------------------------
+
+    def add(self, resume_text: str, name: str = "", email: str = "", role: Optional[str] = None,
+            analysis: Optional[Dict[str, Any]] = None, duplicate_of: Optional[int] = None) -> int:
+        """
+        Stores (or updates) a candidate and, optionally, their analysis for a role.
+        `duplicate_of` links a new candidate to the earlier submission it nearly repeats.
+        """
+        content_hash = hashlib.sha256(normalize_resume_text(resume_text).encode("utf-8")).hexdigest()
+        vector = self.vocabulary.vectorize(resume_text)
+        signature = self.hasher.signature(resume_text)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM candidates WHERE content_hash = ?", (content_hash,)).fetchone()
+            if row is None:
+                if duplicate_of is not None:
+                    # Link to the first submission, not to whichever copy happened to match
+                    original = self._conn.execute("SELECT COALESCE(duplicate_of, id) FROM candidates WHERE id = ?",
+                                                  (duplicate_of,)).fetchone()
+                    duplicate_of = original[0] if original else None
+                cursor = self._conn.execute(
+                    "INSERT INTO candidates (content_hash, name, email, resume_text, skills, vocab_version, created_at, "
+                    "minhash, minhash_version, duplicate_of) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (content_hash, name, email, resume_text, vector.tobytes(), self.vocabulary.version, now,
+                     signature.tobytes(), self.hasher.version, duplicate_of)
+                )
+                candidate_id = cursor.lastrowid
+                if self._loaded:
+                    self._append(candidate_id, vector)
+                if self._minhash_loaded:
+                    self._minhash.add(candidate_id, signature)
+            else:
+                candidate_id = row[0]
+                if name or email:
+                    self._conn.execute(
+                        "UPDATE candidates SET name = COALESCE(NULLIF(?, ''), name), email = COALESCE(NULLIF(?, ''), email) "
+                        "WHERE id = ?", (name, email, candidate_id)
+                    )
+            if role is not None and analysis is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (candidate_id, role, result, screened_at) VALUES (?, ?, ?, ?)",
+                    (candidate_id, role, json.dumps(analysis), now)
+                )
+        return candidate_id
+
+    # --- in-memory index ------------------------------------------------------
+
+    def _load(self) -> None:
+        """Loads every skill vector, re-vectorizing rows written under an older vocabulary"""
+        rows = self._conn.execute("SELECT id, skills, vocab_version FROM candidates ORDER BY id").fetchall()
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        matrix = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        stale = []
+        for i, (candidate_id, blob, version) in enumerate(rows):
+            if version == self.vocabulary.version:
+                matrix[i] = np.frombuffer(blob, dtype=np.float32)
+            else:
+                resume_text = self._conn.execute("SELECT resume_text FROM candidates WHERE id = ?",
+                                                 (candidate_id,)).fetchone()[0]
+                matrix[i] = self.vocabulary.vectorize(resume_text)
+                stale.append((matrix[i].tobytes(), self.vocabulary.version, candidate_id))
+        if stale:
+            with self._conn:
+                self._conn.executemany("UPDATE candidates SET skills = ?, vocab_version = ? WHERE id = ?", stale)
+        self._size, self._ids, self._matrix = len(rows), ids, matrix
+        self._inverted = {skill_id: np.flatnonzero(matrix[:, skill_id]).tolist() for skill_id in range(matrix.shape[1])}
+        self._posting_arrays = {}
+        self._loaded = True
+
+    def _load_signatures(self) -> None:
+        """Builds the near-duplicate index, signing rows stored without a current signature"""
+        rows = self._conn.execute("SELECT id, minhash, minhash_version FROM candidates ORDER BY id").fetchall()
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        signatures = np.zeros((len(rows), self.hasher.num_perm), dtype=np.uint16)
+        stale = []
+        for i, (candidate_id, blob, version) in enumerate(rows):
+            if blob is not None and version == self.hasher.version:
+                signatures[i] = np.frombuffer(blob, dtype=np.uint16)
+            else:
+                resume_text = self._conn.execute("SELECT resume_text FROM candidates WHERE id = ?",
+                                                 (candidate_id,)).fetchone()[0]
+                signatures[i] = self.hasher.signature(resume_text)
+                stale.append((signatures[i].tobytes(), self.hasher.version, candidate_id))
+        if stale:
+            with self._conn:
+                self._conn.executemany("UPDATE candidates SET minhash = ?, minhash_version = ? WHERE id = ?", stale)
+        self._minhash = MinHashIndex(self.hasher.num_perm)
+        self._minhash.extend(ids, signatures)
+        self._minhash_loaded = True
+
+    def _append(self, candidate_id: int, vector: np.ndarray) -> None:
+        if self._size == len(self._ids):
+            capacity = max(64, 2 * len(self._ids))
+            self._ids = np.resize(self._ids, capacity)
+            matrix = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+        row = self._size
+        self._ids[row] = candidate_id
+        self._matrix[row] = vector
+        self._size += 1
+        for skill_id in np.flatnonzero(vector):
+            self._inverted.setdefault(int(skill_id), []).append(row)
+            self._posting_arrays.pop(int(skill_id), None)
+
+    def _postings(self, skill_id: int) -> np.ndarray:
+        postings = self._posting_arrays.get(skill_id)
+        if postings is None:
+            postings = np.asarray(self._inverted.get(skill_id, []), dtype=np.int64)
+            self._posting_arrays[skill_id] = postings
+        return postings
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    # --- queries --------------------------------------------------------------
+
+    def _negligible_change(self, resume_text: str, candidate_id: int) -> bool:
+        """True when a resume differs from a stored one by a few words and mentions the same skills"""
+        stored = self._conn.execute("SELECT resume_text FROM candidates WHERE id = ?", (candidate_id,)).fetchone()[0]
+        if jaccard(self.hasher.shingles(resume_text), self.hasher.shingles(stored)) < self.reuse_threshold:
+            return False
+        # A small edit that adds or drops a skill can change the verdict, so it is never negligible
+        return (np.flatnonzero(self.vocabulary.vectorize(resume_text)).tolist()
+                == np.flatnonzero(self.vocabulary.vectorize(stored)).tolist())
+
+    def find_duplicate(self, resume_text: str, role: Optional[str] = None,
+                       requirements_version: Optional[str] = None) -> Optional[NearDuplicate]:
+        """
+        The earlier submission a resume nearly repeats, or None. When one of the matches was
+        already screened for `role` (against `requirements_version`, if given) and the resume
+        barely changed since, its analysis is returned with it so the caller can skip the analyzer.
+        """
+        signature = self.hasher.signature(resume_text)
+        with tracer.span("near_duplicate") as span, self._lock:
+            if not self._minhash_loaded:
+                self._load_signatures()
+            self.duplicate_lookups += 1
+            matches = self._minhash.query(signature, self.duplicate_threshold)
+            span.set(matches=len(matches))
+            if not matches:
+                return None
+            self.duplicates_found += 1
+            analysis = None
+            candidate_id, similarity = matches[0]
+            if role is not None:
+                for match_id, match_similarity in matches:
+                    if match_similarity < self.reuse_threshold:
+                        break
+                    row = self._conn.execute("SELECT result FROM analyses WHERE candidate_id = ? AND role = ?",
+                                             (match_id, role)).fetchone()
+                    if row is None:
+                        continue
+                    prior = json.loads(row[0])
+                    if requirements_version is not None and prior.get("requirements_version") != requirements_version:
+                        continue
+                    if self._negligible_change(resume_text, match_id):
+                        candidate_id, similarity, analysis = match_id, match_similarity, prior
+                        self.analyses_reused += 1
+                        break
+            email = self._conn.execute("SELECT email FROM candidates WHERE id = ?", (candidate_id,)).fetchone()[0]
+            span.set(reused=analysis is not None)
+        return NearDuplicate(candidate_id=candidate_id, email=email, similarity=similarity, analysis=analysis)
+
+    def duplicate_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "lookups": self.duplicate_lookups,
+                "found": self.duplicates_found,
+                "reused": self.analyses_reused,
+                "indexed": len(self._minhash),
+                "index_bytes": self._minhash.nbytes,
+            }
+
+    def _rows_with(self, skill: str) -> np.ndarray:
+        """Rows mentioning a skill or any of its aliases, from the inverted index"""
+        terms = [skill] + [g_term for group in parse_skill_groups(f"- {skill}") for g_term in group.terms]
+        skill_ids = self.vocabulary.ids_for(terms)
+        if not skill_ids:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate([self._postings(i) for i in skill_ids]))
+
+    def role_scores(self, requirements: str) -> np.ndarray:
+        """
+        Scores every candidate against a requirement text: for each skill group, the
+        candidate's strongest alias weight, summed over groups and divided by group count.
+        """
+        return self._group_scores(parse_skill_groups(requirements))
+
+    def _group_scores(self, groups: List[SkillGroup], weights: Optional[List[float]] = None) -> np.ndarray:
+        weights = weights or [1.0] * len(groups)
+        matrix = self._matrix[:self._size]
+        scores = np.zeros(self._size, dtype=np.float32)
+        for group, weight in zip(groups, weights):
+            skill_ids = self.vocabulary.ids_for(group.terms)
+            if skill_ids:
+                scores += weight * matrix[:, skill_ids].max(axis=1)
+        return scores / max(1.0, sum(weights))
+
+    def rank(self, role: str, must_have: Iterable[str] = (), top_k: int = 20,
+             requirements: Optional[str] = None) -> List[RankedCandidate]:
+        """
+        Ranks the whole pool for a role, optionally restricted to candidates mentioning
+        every `must_have` skill, e.g. rank("backend_engineer", ["Kubernetes"]).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not self._size:
+                return []
+            if requirements is not None:
+                scores = self.role_scores(requirements)
+            else:
+                index = role_registry.get(role).index
+                scores = self._group_scores(index.groups, index.weights)
+            candidates: Optional[np.ndarray] = None
+            for skill in must_have:
+                rows = self._rows_with(skill)
+                candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if candidates is None:
+                candidates = np.arange(self._size)
+            if not len(candidates):
+                return []
+            subset = scores[candidates]
+            k = min(top_k, len(candidates))
+            best = np.argpartition(-subset, k - 1)[:k]
+            best = best[np.argsort(-subset[best], kind="stable")]
+            return self._fetch(self._ids[candidates[best]], subset[best], role)
+
+    def _fetch(self, candidate_ids: np.ndarray, scores: np.ndarray, role: str) -> List[RankedCandidate]:
+        ids = [int(i) for i in candidate_ids]
+        placeholders = ",".join("?" * len(ids))
+        people = {r[0]: r[1:] for r in self._conn.execute(
+            f"SELECT id, name, email FROM candidates WHERE id IN ({placeholders})", ids)}
+        analyses = {r[0]: json.loads(r[1]) for r in self._conn.execute(
+            f"SELECT candidate_id, result FROM analyses WHERE role = ? AND candidate_id IN ({placeholders})",
+            [role] + ids)}
+        return [RankedCandidate(candidate_id=i, name=people[i][0], email=people[i][1], score=float(s),
+                                analysis=analyses.get(i)) for i, s in zip(ids, scores)]
+
+    def get_analyses(self, candidate_id: int) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {role: json.loads(result) for role, result in self._conn.execute(
+                "SELECT role, result FROM analyses WHERE candidate_id = ?", (candidate_id,))}
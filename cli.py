@@ -0,0 +1,186 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from batch_screening import collect_from_folder
+from model_routing import routing_stats
+from pdf_extraction import extraction_stats
+from pipeline import PipelineSettings, build_pipeline
+from role_registry import role_registry
+
+
+def screen(args: argparse.Namespace) -> int:
+    sources = collect_from_folder(args.folder)
+    if not sources:
+        print(f"No PDF resumes found in {args.folder}", file=sys.stderr)
+        return 1
+    settings = PipelineSettings.from_env()
+    if args.token_budget is not None:
+        settings.token_budget = args.token_budget
+    if args.single_model:
+        settings.routing = False
+    try:
+        pipeline = build_pipeline(settings)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if args.notify and pipeline.outbox is None:
+        print("Email settings are missing; candidates will not be emailed", file=sys.stderr)
+    if args.schedule and pipeline.scheduler is None:
+        print("Zoom settings are missing; interviews will not be scheduled", file=sys.stderr)
+
+    failed = 0
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for result in pipeline.process_many(sources, args.role, max_workers=args.workers,
+                                            notify=args.notify, schedule=args.schedule):
+            failed += bool(result.error)
+            if output:
+                output.write(json.dumps(result.to_dict()) + "\n")
+            decision = "ERROR" if result.error else ("selected" if result.selected else "rejected")
+            line = f"{result.name}\t{decision}\t{result.seconds:.2f}s"
+            if result.interview:
+                line += f"\tinterview {result.interview['start']}"
+            print(line + (f"\t{result.error}" if result.error else ""))
+    finally:
+        if output:
+            output.close()
+        if pipeline.outbox is not None:
+            # Deliver what was queued before exiting; the outbox retries anything left on the next run
+            pipeline.outbox.drain()
+            pipeline.outbox.stop()
+    print(f"Screened {len(sources)} resumes, {failed} failed", file=sys.stderr)
+    extraction = extraction_stats.stats()
+    if extraction["slow_path_rate"] or extraction["empty_rate"]:
+        print(f"Extraction: {extraction['documents_by_tier']} resumes by slowest tier, "
+              f"{extraction['timeouts']} ran out of time", file=sys.stderr)
+    if pipeline.store is not None and pipeline.store.duplicates_found:
+        print(f"Near-duplicates: {pipeline.store.duplicates_found} linked to earlier submissions, "
+              f"{pipeline.store.analyses_reused} reused their analysis", file=sys.stderr)
+    routing = routing_stats.stats()
+    if routing["screened"]:
+        calls = ", ".join(f"{model} {tier['calls']}" for model, tier in routing["models"].items())
+        print(f"Model calls: {calls}; escalated {routing['escalated']} "
+              f"({routing['agreement_rate']:.0%} agreed with the cheaper model)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def match_roles(args: argparse.Namespace) -> int:
+    sources = collect_from_folder(args.folder)
+    if not sources:
+        print(f"No PDF resumes found in {args.folder}", file=sys.stderr)
+        return 1
+    settings = PipelineSettings.from_env()
+    if args.token_budget is not None:
+        settings.token_budget = args.token_budget
+    try:
+        pipeline = build_pipeline(settings)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    failed = 0
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for result in pipeline.match_many(sources, args.roles, max_workers=args.workers):
+            failed += bool(result["error"])
+            if output:
+                output.write(json.dumps(result) + "\n")
+            if result["error"]:
+                print(f"{result['name']}\tERROR\t{result['seconds']:.2f}s\t{result['error']}")
+                continue
+            ranked = ", ".join(f"{fit['role']} {fit['match']:.0%}{' *' if fit['selected'] else ''}"
+                               for fit in result["roles"][:args.top])
+            print(f"{result['name']}\t{ranked}\t{result['seconds']:.2f}s")
+    finally:
+        if output:
+            output.close()
+        if pipeline.outbox is not None:
+            pipeline.outbox.stop()
+    print(f"Matched {len(sources)} resumes against {len(args.roles or role_registry)} roles, {failed} failed "
+          f"(* = selected)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def resume_applications(args: argparse.Namespace) -> int:
+    settings = PipelineSettings.from_env()
+    try:
+        pipeline = build_pipeline(settings)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if pipeline.workflow is None:
+        print("Email and Zoom settings are missing; there is nothing to resume", file=sys.stderr)
+        return 2
+    pipeline.workflow.batch_size = args.batch_size
+    try:
+        counts = pipeline.workflow.drain(workers=args.workers, reclaim=args.reclaim)
+    finally:
+        if pipeline.outbox is not None:
+            pipeline.outbox.drain()
+            pipeline.outbox.stop()
+    print(", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "No applications")
+    return 1 if counts.get("failed") else 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    import uvicorn
+
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Headless entry point. Credentials come from the environment: OPENAI_API_KEY, COMPANY_NAME,
+    EMAIL_SENDER, EMAIL_PASSKEY, ZOOM_ACCOUNT_ID, ZOOM_CLIENT_ID and ZOOM_CLIENT_SECRET.
+    """
+    parser = argparse.ArgumentParser(description="Screen resumes without the Streamlit UI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    screen_parser = commands.add_parser("screen", help="Screen every PDF (and zip of PDFs) in a folder")
+    screen_parser.add_argument("folder")
+    screen_parser.add_argument("--role", required=True, choices=role_registry.roles())
+    screen_parser.add_argument("--workers", type=int, default=4, help="Resumes screened concurrently")
+    screen_parser.add_argument("--token-budget", type=int, default=None, help="Prompt token budget (0 = full resume)")
+    screen_parser.add_argument("--notify", action="store_true", help="Email each candidate the decision")
+    screen_parser.add_argument("--schedule", action="store_true", help="Book interviews for selected candidates")
+    screen_parser.add_argument("--single-model", action="store_true",
+                               help="Screen with the first model only, never escalating close calls")
+    screen_parser.add_argument("--output", help="Write one JSON result per line to this file")
+    screen_parser.set_defaults(handler=screen)
+
+    match_parser = commands.add_parser(
+        "match-roles", help="Rank the roles each resume in a folder fits, with one analyzer call per resume"
+    )
+    match_parser.add_argument("folder")
+    match_parser.add_argument("--roles", nargs="+", choices=role_registry.roles(), help="Only these roles (default: all)")
+    match_parser.add_argument("--top", type=int, default=3, help="Roles printed per resume")
+    match_parser.add_argument("--workers", type=int, default=4, help="Resumes matched concurrently")
+    match_parser.add_argument("--token-budget", type=int, default=None, help="Prompt token budget (0 = full resume)")
+    match_parser.add_argument("--output", help="Write one JSON result per line to this file")
+    match_parser.set_defaults(handler=match_roles)
+
+    resume_parser = commands.add_parser(
+        "resume-applications", help="Finish the email and interview steps of pending applications, e.g. after a crash"
+    )
+    resume_parser.add_argument("--workers", type=int, default=4, help="Batches of applications run concurrently")
+    resume_parser.add_argument("--batch-size", type=int, default=50, help="Applications claimed per batch")
+    resume_parser.add_argument("--reclaim", action="store_true",
+                               help="Take over applications still leased to a process that died")
+    resume_parser.set_defaults(handler=resume_applications)
+
+    serve_parser = commands.add_parser("serve", help="Run the HTTP screening service")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=1,
+                              help="Server processes; they share jobs, emails, applications and bookings through SQLite")
+    serve_parser.set_defaults(handler=serve)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
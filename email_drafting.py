@@ -0,0 +1,60 @@
+from typing import Any, Tuple
+
+from email_outbox import OutboxMessage
+from screening import get_assistant_message
+
+DEFAULT_SUBJECTS = {
+    "selected": "Your application for the {role} position",
+    "rejected": "Update on your application for the {role} position",
+}
+
+
+def selection_prompt(to_email: str, role: str, company_name: str) -> str:
+    return f"""
+        Write an email to {to_email} regarding their selection for the {role} position.
+        The email should:
+        1. Congratulate them on being selected.
+        2. Explain the next steps in the process.
+        3. Mention that they will receive interview details shortly.
+        4. The name of the company is {company_name}.
+        Start with a line "Subject: <subject>", then a blank line, then the body.
+        """
+
+
+def rejection_prompt(to_email: str, role: str, feedback: str, company_name: str) -> str:
+    return f"""
+        Write an email to {to_email} regarding their application for the {role} position.
+        Use this specific style:
+        1. Avoid unnecessary capital letters.
+        2. Be empathetic and human
+        3. Mention specific feedback from: {feedback}
+        4. Encourage them to upskill and try again
+        5. Suggest some learning resources based on missing skills.
+        6. End the email with exactly:
+            Best Regards,
+            Team HR at {company_name}
+        Do not include any name in the signature.
+        The tone should be like a human writing a quick but thoughtful email.
+        Start with a line "Subject: <subject>", then a blank line, then the body.
+        """
+
+
+def split_subject(text: str, default_subject: str) -> Tuple[str, str]:
+    """Splits a drafted email into (subject, body), using `default_subject` if none was written"""
+    text = text.strip()
+    first, _, rest = text.partition("\n")
+    if first.lower().startswith("subject:"):
+        return first.split(":", 1)[1].strip() or default_subject, rest.strip()
+    return default_subject, text
+
+
+def draft_with_agent(email_agent: Any, company_name: str, message: OutboxMessage) -> Tuple[str, str]:
+    """Drafts an outbox message with the email agent. The agent only writes; the outbox sends."""
+    if message.decision == "selected":
+        prompt = selection_prompt(message.to_email, message.role, company_name)
+    else:
+        prompt = rejection_prompt(message.to_email, message.role, message.context.get("feedback", ""), company_name)
+    content = get_assistant_message(email_agent.run(prompt))
+    if not content:
+        raise ValueError("The email agent returned no draft")
+    return split_subject(content, DEFAULT_SUBJECTS.get(message.decision, "").format(role=message.role))
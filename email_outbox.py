@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from phi.utils.log import logger
+
+from tracing import tracer
+
+DEFAULT_OUTBOX_PATH = os.path.join(".cache", "outbox.sqlite3")
+
+GMAIL_SMTP_HOST = "smtp.gmail.com"
+GMAIL_SMTP_SSL_PORT = 465
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    to_email: str
+    role: str
+    decision: str
+    context: Dict[str, Any]
+    subject: Optional[str]
+    body: Optional[str]
+    attempts: int
+
+
+def idempotency_key(candidate: str, role: str, decision: str) -> str:
+    """One email per (candidate, role, decision), however many times the app reruns"""
+    return hashlib.sha256(f"{candidate.strip().lower()}\x00{role}\x00{decision}".encode("utf-8")).hexdigest()
+
+
+class SmtpSender:
+    """
+    Sends mail over one SMTP connection per worker thread, reconnecting only when the
+    server drops it, instead of logging in again for every message.
+    """
+
+    def __init__(self, username: str, password: str, host: str = GMAIL_SMTP_HOST, port: int = GMAIL_SMTP_SSL_PORT,
+                 use_ssl: bool = True, starttls: bool = False, timeout: float = 30.0):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._local = threading.local()
+        self._all: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        conn = smtp_class(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.password:
+            conn.login(self.username, self.password)
+        with self._lock:
+            self.connections_opened += 1
+            self._all.append(conn)
+        return conn
+
+    def _connection(self) -> smtplib.SMTP:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def send(self, to_email: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.username
+        message["To"] = to_email
+        message["Subject"] = subject
+        message.set_content(body)
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle connections get closed by the server; reconnect once and retry
+            self._local.conn = None
+            self._connection().send_message(message)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._local = threading.local()
+
+
+class EmailOutbox:
+    """
+    Durable SQLite outbox drained by a pool of background workers.
+
+    Enqueueing is idempotent per (candidate, role, decision). A worker claims a message,
+    drafts it with `drafter` (once; the draft is stored so retries do not redraft),
+    sends it with `sender` and marks it sent. Failures are retried with exponential
+    backoff and jitter up to `max_attempts`. A message whose delivery was interrupted
+    by a crash after the SMTP send began is marked failed rather than resent, so a
+    rerun can never double-send.
+    """
+
+    def __init__(self, drafter: Callable[[OutboxMessage], Tuple[str, str]], sender: Any,
+                 path: str = DEFAULT_OUTBOX_PATH, sender_address: str = "", workers: int = 2,
+                 max_attempts: int = 5, base_delay: float = 2.0, lease_seconds: float = 300.0,
+                 poll_interval: float = 0.5):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.drafter = drafter
+        self.sender = sender
+        self.sender_address = sender_address or getattr(sender, "username", "")
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Waits for a write lock held by another outbox on the same file instead of failing
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY,
+                    idempotency_key TEXT UNIQUE NOT NULL,
+                    sender TEXT NOT NULL,
+                    to_email TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    decision TEXT NOT NULL,
+                    context TEXT NOT NULL,
+                    subject TEXT,
+                    body TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    claimed_at REAL,
+                    send_started_at REAL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    sent_at REAL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, sender, next_attempt_at)")
+        self._recover()
+
+    # --- producer side ----------------------------------------------------------
+
+    def enqueue(self, to_email: str, role: str, decision: str, context: Optional[Dict[str, Any]] = None,
+                candidate: Optional[str] = None) -> Tuple[int, bool]:
+        """
+        Queues an email and returns (message id, created). `created` is False when the same
+        candidate/role/decision was already queued or sent, in which case nothing new is sent.
+        """
+        key = idempotency_key(candidate or to_email, role, decision)
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, sender, to_email, role, decision, context, "
+                "next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, self.sender_address, to_email, role, decision, json.dumps(context or {}), now, now)
+            )
+            created = cursor.rowcount == 1
+            message_id = self._conn.execute("SELECT id FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()[0]
+        if created:
+            self._wakeup.set()
+        return message_id, created
+
+    def status(self, message_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, last_error, sent_at FROM outbox WHERE id = ?", (message_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "attempts": row[1], "last_error": row[2], "sent_at": row[3]}
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    # --- worker side ------------------------------------------------------------
+
+    def _recover(self) -> None:
+        """Releases messages whose worker died; never re-sends one whose SMTP send had begun"""
+        expired = time.time() - self.lease_seconds
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_at = NULL "
+                "WHERE status = 'sending' AND claimed_at < ? AND send_started_at IS NULL", (expired,)
+            )
+            self._conn.execute(
+                "UPDATE outbox SET status = 'failed', last_error = 'interrupted during delivery; not retried "
+                "to avoid a duplicate' WHERE status = 'sending' AND claimed_at < ? AND send_started_at IS NOT NULL",
+                (expired,)
+            )
+
+    def _claim(self) -> Optional[OutboxMessage]:
+        """
+        Claims the most overdue message. Other outboxes may share the file (other processes,
+        or another sender configuration in the app), so the claim only counts when this
+        outbox's UPDATE is the one that moved the row out of 'pending'.
+        """
+        while True:
+            now = time.time()
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT id, to_email, role, decision, context, subject, body, attempts FROM outbox "
+                    "WHERE status = 'pending' AND sender = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT 1",
+                    (self.sender_address, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                claimed = self._conn.execute(
+                    "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND status = 'pending'",
+                    (now, row[0])
+                ).rowcount
+            if claimed:
+                break
+        return OutboxMessage(id=row[0], to_email=row[1], role=row[2], decision=row[3], context=json.loads(row[4]),
+                             subject=row[5], body=row[6], attempts=row[7])
+
+    def _update(self, sql: str, params: Tuple) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def process_one(self) -> bool:
+        """Drafts and sends one due message; returns False when nothing was due"""
+        message = self._claim()
+        if message is None:
+            return False
+        try:
+            with tracer.span("email", decision=message.decision, attempt=message.attempts + 1):
+                if message.body is None:
+                    with tracer.span("email_draft"):
+                        message.subject, message.body = self.drafter(message)
+                    self._update("UPDATE outbox SET subject = ?, body = ? WHERE id = ?",
+                                 (message.subject, message.body, message.id))
+                self._update("UPDATE outbox SET send_started_at = ? WHERE id = ?", (time.time(), message.id))
+                with tracer.span("email_send"):
+                    self.sender.send(message.to_email, message.subject, message.body)
+            self._update("UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, last_error = NULL "
+                         "WHERE id = ?", (time.time(), message.id))
+        except Exception as e:
+            attempts = message.attempts + 1
+            logger.error(f"Error sending email {message.id} (attempt {attempts}): {e}")
+            if attempts >= self.max_attempts:
+                self._update("UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                             (attempts, str(e), message.id))
+            else:
+                delay = self.base_delay * 2 ** (attempts - 1) * (1 + random.random() / 2)
+                # The send did not go through, so it is safe to attempt again
+                self._update("UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?, "
+                             "next_attempt_at = ?, send_started_at = NULL WHERE id = ?",
+                             (attempts, str(e), time.time() + delay, message.id))
+        return True
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if not self.process_one():
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> "EmailOutbox":
+        if not self._threads:
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        close = getattr(self.sender, "close", None)
+        if close:
+            close()
+
+    def drain(self, timeout: float = 60.0) -> None:
+        """Processes due messages in the calling thread until none are left (scripts and tests)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.process_one():
+            pass
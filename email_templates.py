@@ -0,0 +1,170 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from string import Template
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from email_outbox import OutboxMessage
+from role_registry import DEFAULT_NEXT_STEPS, role_registry
+from screening import get_assistant_message
+
+LEARNING_RESOURCES: Dict[str, str] = {
+    "python": "the official Python tutorial (docs.python.org/3/tutorial)",
+    "pytorch": "the PyTorch tutorials (pytorch.org/tutorials)",
+    "tensorflow": "the TensorFlow guides (tensorflow.org/learn)",
+    "machine learning": "Andrew Ng's Machine Learning Specialization on Coursera",
+    "deep learning": "fast.ai's Practical Deep Learning for Coders",
+    "mlops": "Made With ML's MLOps course (madewithml.com)",
+    "llms": "the Hugging Face LLM course (huggingface.co/learn)",
+    "rag": "the Hugging Face LLM course (huggingface.co/learn)",
+    "react": "the official React docs (react.dev/learn)",
+    "javascript": "MDN's JavaScript guide (developer.mozilla.org)",
+    "typescript": "the TypeScript handbook (typescriptlang.org/docs)",
+    "html5": "MDN's HTML and CSS learning area (developer.mozilla.org)",
+    "css3": "MDN's HTML and CSS learning area (developer.mozilla.org)",
+    "testing": "the Testing Library docs (testing-library.com)",
+    "rest apis": "Microsoft's REST API design guidelines",
+    "database": "CMU's Intro to Database Systems lectures",
+    "system architecture": "the System Design Primer on GitHub",
+    "cloud": "the AWS Skill Builder free courses",
+    "kubernetes": "the Kubernetes basics tutorial (kubernetes.io/docs/tutorials)",
+    "docker": "Docker's getting started guide (docs.docker.com/get-started)",
+    "ci/cd": "the GitHub Actions docs (docs.github.com/actions)",
+}
+
+SIGNATURE = "Best Regards,\nTeam HR at $company_name"
+
+_SELECTION = (
+    "Your application for the $role_title position at $company_name",
+    "Hi,\n\n"
+    "congratulations! we've reviewed your application for the $role_title position and we'd love to move "
+    "forward with you.\n\n"
+    "the next step is $next_steps. you'll receive a separate email with the interview details and a zoom link "
+    "shortly, so keep an eye on your inbox.\n\n"
+    "if you have any questions in the meantime, just reply to this email.\n\n"
+    + SIGNATURE,
+)
+
+_REJECTION = (
+    "Update on your application for the $role_title position",
+    "Hi,\n\n"
+    "thank you for applying for the $role_title position at $company_name and for the time you put into it. "
+    "after reviewing your resume, we've decided not to move forward with your application this time.\n\n"
+    "$feedback\n\n"
+    "${resources}"
+    "we'd really encourage you to keep building and to apply again in the future.\n\n"
+    + SIGNATURE,
+)
+
+
+class EmailTemplates:
+    """
+    Precompiled subject/body templates per (role, decision), with the role's title and next
+    steps taken from its role file. Templates are compiled once on first use and reused for
+    every email after that, until the role file changes.
+    """
+
+    def __init__(self, company_name: str):
+        self.company_name = company_name
+        self._compiled: Dict[Tuple[str, str, str], Tuple[Template, Template]] = {}
+
+    def _compile(self, role: str, decision: str) -> Tuple[Template, Template]:
+        # A role no longer registered still gets its mail, with generic wording
+        spec = role_registry.get(role) if role in role_registry else None
+        key = (role, decision, spec.version if spec is not None else "")
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            subject, body = _SELECTION if decision == "selected" else _REJECTION
+            fixed = {
+                "company_name": self.company_name,
+                "role_title": spec.title if spec is not None else role.replace("_", " ").title(),
+                "next_steps": spec.next_steps if spec is not None else DEFAULT_NEXT_STEPS,
+            }
+            # Escape "$" so the baked-in values survive the second compilation
+            fixed = {k: v.replace("$", "$$") for k, v in fixed.items()}
+            # Bake the per-role values in now so rendering only fills the per-candidate fields
+            compiled = (Template(Template(subject).safe_substitute(fixed)),
+                        Template(Template(body).safe_substitute(fixed)))
+            self._compiled[key] = compiled
+        return compiled
+
+    def render(self, role: str, decision: str, feedback: str = "", resources: str = "") -> Tuple[str, str]:
+        subject, body = self._compile(role, decision)
+        return subject.substitute(), body.substitute(feedback=feedback, resources=resources)
+
+
+def learning_resources(missing_skills: List[str], limit: int = 3) -> str:
+    """A short, deterministic list of learning resources for the candidate's missing skills"""
+    picked: List[str] = []
+    for skill in missing_skills:
+        lowered = skill.lower()
+        for key, resource in LEARNING_RESOURCES.items():
+            if key in lowered and resource not in picked:
+                picked.append(resource)
+                break
+        if len(picked) == limit:
+            break
+    if not picked:
+        return ""
+    return "a few resources that might help:\n" + "\n".join(f"- {r}" for r in picked) + "\n\n"
+
+
+def feedback_prompt(role: str, feedback: str) -> str:
+    return f"""
+        Rewrite this screening feedback for a {role} applicant as one short paragraph (at most 3 sentences).
+        Be empathetic and human, avoid unnecessary capital letters, mention the specific gaps and
+        do not add a greeting or signature.
+        Feedback: {feedback}
+        """
+
+
+class FeedbackPersonalizer:
+    """
+    Asks the LLM only for the personalized feedback paragraph of a rejection, and caches the
+    answer by feedback hash so identical feedback is never sent to the model twice.
+    """
+
+    def __init__(self, email_agent: Any, max_entries: int = 1024):
+        self.email_agent = email_agent
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, role: str, feedback: str) -> str:
+        key = hashlib.sha256(f"{role}\x00{feedback}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        paragraph = (get_assistant_message(self.email_agent.run(feedback_prompt(role, feedback))) or "").strip()
+        if not paragraph:
+            raise ValueError("The email agent returned no feedback paragraph")
+        with self._lock:
+            self._cache[key] = paragraph
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return paragraph
+
+
+class TemplateEmailDrafter:
+    """
+    Outbox drafter that renders precompiled templates. Selection emails need no LLM at all;
+    rejections call `personalize` (if any) for the feedback paragraph only.
+    """
+
+    def __init__(self, company_name: str, personalize: Optional[Callable[[str, str], str]] = None):
+        self.templates = EmailTemplates(company_name)
+        self.personalize = personalize
+
+    def __call__(self, message: OutboxMessage) -> Tuple[str, str]:
+        if message.decision == "selected":
+            return self.templates.render(message.role, "selected")
+        feedback = message.context.get("feedback", "")
+        if self.personalize is not None and feedback:
+            feedback = self.personalize(message.role, feedback)
+        resources = learning_resources(message.context.get("missing_skills", []))
+        return self.templates.render(message.role, "rejected", feedback=feedback, resources=resources)
@@ -0,0 +1,374 @@
+import contextvars
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pytz
+
+from tracing import tracer
+
+DEFAULT_SCHEDULE_PATH = os.path.join(".cache", "interviews.sqlite3")
+IST = pytz.timezone("Asia/Kolkata")
+
+
+@dataclass
+class InterviewSlot:
+    candidate_email: str
+    role: str
+    interviewer: str
+    start: datetime
+    end: datetime
+    meeting_id: Optional[str] = None
+    join_url: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "candidate_email": self.candidate_email,
+            "role": self.role,
+            "interviewer": self.interviewer,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "meeting_id": self.meeting_id,
+            "join_url": self.join_url,
+            "error": self.error,
+        }
+
+
+@dataclass(frozen=True)
+class Availability:
+    """
+    When one interviewer takes interviews: from `day_start` to `day_end` o'clock (in the
+    scheduler's timezone) on `weekdays` (0 is Monday), outside the `busy` periods of their
+    calendar.
+    """
+
+    day_start: int = 9
+    day_end: int = 17
+    weekdays: Tuple[int, ...] = (0, 1, 2, 3, 4)
+    busy: Tuple[Tuple[datetime, datetime], ...] = ()
+
+    def __post_init__(self):
+        if not 0 <= self.day_start < self.day_end <= 24 or not self.weekdays:
+            raise ValueError(f"Invalid working hours: {self.day_start}-{self.day_end} on {self.weekdays}")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], tz: Any = None) -> "Availability":
+        """
+        Reads one entry of an interviewers file:
+
+            hours: [10, 16]                   # optional, 9 to 17 by default
+            weekdays: [0, 1, 2, 3]            # optional, Monday to Friday by default
+            busy:                             # optional, ISO times; naive ones are in `tz`
+              - ["2030-01-07T13:00", "2030-01-07T14:30"]
+        """
+        def parse(value: Any) -> datetime:
+            moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+            return tz.localize(moment) if moment.tzinfo is None and tz is not None else moment
+
+        day_start, day_end = config.get("hours") or (9, 17)
+        return cls(day_start=int(day_start), day_end=int(day_end),
+                   weekdays=tuple(int(day) for day in config.get("weekdays") or (0, 1, 2, 3, 4)),
+                   busy=tuple((parse(start), parse(end)) for start, end in config.get("busy") or ()))
+
+
+def load_interviewers(path: str, tz: Any = IST) -> Dict[str, Availability]:
+    """Interviewer name -> Availability, from a YAML or JSON file mapping names to from_config entries"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            config = json.load(f)
+        else:
+            import yaml
+            config = yaml.safe_load(f)
+    if not isinstance(config, dict) or not config:
+        raise ValueError(f"{path}: expected a mapping of interviewer names to their availability")
+    return {str(name): Availability.from_config(entry or {}, tz) for name, entry in config.items()}
+
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping booked intervals of one interviewer.
+    Because bookings never overlap, starts and ends are both sorted and one bisect finds
+    the only booking that can collide with a proposed slot.
+    """
+
+    def __init__(self):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+    @classmethod
+    def merged(cls, intervals: Iterable[Tuple[datetime, datetime]]) -> "IntervalIndex":
+        """An index of intervals that may overlap (calendar entries, bookings made before them), merged"""
+        index = cls()
+        for start, end in sorted(intervals):
+            if index.ends and start <= index.ends[-1]:
+                index.ends[-1] = max(index.ends[-1], end)
+            else:
+                index.starts.append(start)
+                index.ends.append(end)
+        return index
+
+    def conflict(self, start: datetime, end: datetime) -> Optional[datetime]:
+        """Returns the end of the booking overlapping [start, end), or None if the slot is free"""
+        i = bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.ends[i]
+        return None
+
+    def add(self, start: datetime, end: datetime) -> None:
+        insort(self.starts, start)
+        insort(self.ends, end)
+
+
+class InterviewScheduler:
+    """
+    Deterministic interview allocator. Each interviewer has their own Availability: working
+    hours (9 AM - 5 PM IST, Monday to Friday, unless given) and busy periods from their
+    calendar; `interviewers` is a list of names, who all get the default hours, or a mapping
+    of names to Availability (see load_interviewers).
+
+    Keeps an IntervalIndex per interviewer, persisted in SQLite, and assigns a batch of
+    candidates with a heap of each interviewer's next free slot, so n candidates over m
+    interviewers cost O(n log m) plus a bisect per booking check. Meetings are created by
+    calling the Zoom tool directly; no LLM is involved.
+
+    Several processes may share the database (e.g. `cli.py serve --workers N`): each batch
+    re-reads the bookings and reserves its slots under SQLite's write lock before any
+    meeting is created, so no two processes hand out the same slot. A reservation whose
+    meeting was never booked (its process died) expires after `reservation_seconds`, and
+    the candidate and slot are then allocated again.
+    """
+
+    def __init__(self, zoom_tool: Any = None, interviewers: Union[Sequence[str], Mapping[str, Availability]] = ("hr",),
+                 duration_minutes: int = 60, path: str = DEFAULT_SCHEDULE_PATH, tz: Any = IST, day_start: int = 9,
+                 day_end: int = 17, reservation_seconds: float = 300.0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.zoom_tool = zoom_tool
+        if not isinstance(interviewers, Mapping):
+            interviewers = {name: Availability(day_start, day_end) for name in interviewers}
+        if not interviewers:
+            raise ValueError("At least one interviewer is needed")
+        self.availability: Dict[str, Availability] = dict(interviewers)
+        self.interviewers = list(self.availability)
+        self.duration = timedelta(minutes=duration_minutes)
+        short = [name for name, hours in self.availability.items()
+                 if timedelta(hours=hours.day_end - hours.day_start) < self.duration]
+        if short:
+            raise ValueError(f"Working hours too short for a {duration_minutes} minute interview: {', '.join(short)}")
+        self.tz = tz
+        self.day_start = day_start
+        self.day_end = day_end
+        self.reservation_seconds = reservation_seconds
+        self._lock = threading.Lock()
+        # Held from allocation until booking so concurrent batches cannot pick the same slot
+        self._schedule_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS interviews (
+                    candidate_email TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    interviewer TEXT NOT NULL,
+                    start_ts REAL NOT NULL,
+                    end_ts REAL NOT NULL,
+                    meeting_id TEXT,
+                    join_url TEXT,
+                    reserved_at REAL,
+                    PRIMARY KEY (candidate_email, role)
+                )"""
+            )
+            # Schedules created before reservations expired; their rows all count as booked
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(interviews)")}
+            if "reserved_at" not in columns:
+                self._conn.execute("ALTER TABLE interviews ADD COLUMN reserved_at REAL")
+        self._index: Dict[str, IntervalIndex] = {}
+        with self._lock:
+            self._reload()
+
+    def _reload(self, after: Optional[datetime] = None) -> None:
+        """
+        Rebuilds the interval indexes from the bookings (those ending after `after`) and each
+        interviewer's busy periods; call with _lock held
+        """
+        blocked = {name: list(availability.busy) for name, availability in self.availability.items()}
+        rows = self._conn.execute("SELECT interviewer, start_ts, end_ts FROM interviews WHERE end_ts > ?",
+                                  (after.timestamp() if after is not None else float("-inf"),))
+        for interviewer, start_ts, end_ts in rows:
+            if interviewer in blocked:
+                blocked[interviewer].append((self._from_ts(start_ts), self._from_ts(end_ts)))
+        self._index = {name: IntervalIndex.merged(intervals) for name, intervals in blocked.items()}
+
+    def _from_ts(self, ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, self.tz)
+
+    def _at(self, day: datetime, hour: int) -> datetime:
+        moment = datetime(day.year, day.month, day.day) + timedelta(hours=hour)
+        return self.tz.localize(moment)
+
+    def _align(self, t: datetime, availability: Availability) -> datetime:
+        """Moves t forward to the next slot boundary inside the interviewer's working hours"""
+        t = t.astimezone(self.tz)
+        while True:
+            day_open = self._at(t, availability.day_start)
+            day_close = self._at(t, availability.day_end)
+            if t.weekday() not in availability.weekdays or t + self.duration > day_close:
+                t = self._at(t.date() + timedelta(days=1), availability.day_start)
+                continue
+            if t < day_open:
+                return day_open
+            # Snap up to the slot grid counted from opening time
+            slots = -(-(t - day_open) // self.duration)
+            aligned = day_open + slots * self.duration
+            if aligned + self.duration > day_close:
+                t = day_close
+                continue
+            return aligned
+
+    def next_free(self, interviewer: str, after: datetime) -> datetime:
+        index, availability = self._index[interviewer], self.availability[interviewer]
+        t = self._align(after, availability)
+        while True:
+            blocked_until = index.conflict(t, t + self.duration)
+            if blocked_until is None:
+                return t
+            t = self._align(blocked_until, availability)
+
+    def default_earliest(self) -> datetime:
+        # Interviews start from the next day, as the manual flow always did
+        tomorrow = datetime.now(self.tz) + timedelta(days=1)
+        return self._at(tomorrow, min(hours.day_start for hours in self.availability.values()))
+
+    def existing(self, candidate_email: str, role: str) -> Optional[InterviewSlot]:
+        with self._lock:
+            return self._existing(candidate_email, role)
+
+    def _existing(self, candidate_email: str, role: str) -> Optional[InterviewSlot]:
+        """The candidate's booking, or their reservation while another batch is still booking it"""
+        row = self._conn.execute(
+            "SELECT interviewer, start_ts, end_ts, meeting_id, join_url FROM interviews "
+            "WHERE candidate_email = ? AND role = ? AND (reserved_at IS NULL OR reserved_at >= ?)",
+            (candidate_email, role, time.time() - self.reservation_seconds)
+        ).fetchone()
+        if row is None:
+            return None
+        return InterviewSlot(candidate_email, role, row[0], self._from_ts(row[1]), self._from_ts(row[2]), row[3], row[4])
+
+    def allocate(self, candidate_emails: List[str], role: str,
+                 earliest: Optional[datetime] = None) -> List[InterviewSlot]:
+        """
+        Assigns each candidate the earliest free slot across all interviewers, without
+        collisions among the batch or with earlier bookings. Does not book anything.
+        """
+        earliest = earliest or self.default_earliest()
+        heap: List[Tuple[datetime, int]] = [(self.next_free(name, earliest), i) for i, name in enumerate(self.interviewers)]
+        heapq.heapify(heap)
+        slots = []
+        for email in candidate_emails:
+            start, i = heapq.heappop(heap)
+            name = self.interviewers[i]
+            end = start + self.duration
+            slots.append(InterviewSlot(email, role, name, start, end))
+            # Each interviewer's slots are handed out in increasing order, so searching from
+            # the end of this one cannot collide with anything else in the batch
+            next_start = self.next_free(name, end)
+            heapq.heappush(heap, (next_start, i))
+        return slots
+
+    def _reserve(self, candidate_emails: List[str], role: str,
+                 earliest: datetime) -> Tuple[Dict[str, Optional[InterviewSlot]], List[InterviewSlot]]:
+        """
+        Looks up existing interviews and allocates and records slots for the other candidates,
+        in one IMMEDIATE transaction: another process allocating at the same time waits for it,
+        then sees these slots when it re-reads the bookings.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Reservations left by a process that died before booking free their slots
+                self._conn.execute("DELETE FROM interviews WHERE reserved_at < ?",
+                                   (time.time() - self.reservation_seconds,))
+                booked = {email: self._existing(email, role) for email in candidate_emails}
+                self._reload(earliest)
+                with tracer.span("slot_allocation"):
+                    slots = self.allocate([email for email, slot in booked.items() if slot is None], role, earliest)
+                self._conn.executemany(
+                    "INSERT INTO interviews (candidate_email, role, interviewer, start_ts, end_ts, reserved_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(slot.candidate_email, slot.role, slot.interviewer, slot.start.timestamp(), slot.end.timestamp(),
+                      time.time()) for slot in slots]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return booked, slots
+
+    def _book(self, slot: InterviewSlot) -> None:
+        with self._lock, self._conn:
+            booked = self._conn.execute(
+                "UPDATE interviews SET meeting_id = ?, join_url = ?, reserved_at = NULL "
+                "WHERE candidate_email = ? AND role = ? AND interviewer = ? AND start_ts = ? AND reserved_at IS NOT NULL",
+                (slot.meeting_id, slot.join_url, slot.candidate_email, slot.role, slot.interviewer, slot.start.timestamp())
+            ).rowcount
+        if not booked:
+            raise RuntimeError("The reservation expired before the meeting was booked; the slot may be taken")
+
+    def _release(self, slot: InterviewSlot) -> None:
+        """Frees a reserved slot whose meeting could not be created"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM interviews WHERE candidate_email = ? AND role = ? AND interviewer = ? AND start_ts = ? "
+                "AND reserved_at IS NOT NULL",
+                (slot.candidate_email, slot.role, slot.interviewer, slot.start.timestamp())
+            )
+
+    def create_meeting(self, slot: InterviewSlot) -> InterviewSlot:
+        """Creates the Zoom meeting for a reserved slot and records it; raises if Zoom fails"""
+        if self.zoom_tool is not None:
+            response = json.loads(self.zoom_tool.schedule_meeting(
+                topic=f"{slot.role} Technical Interview",
+                start_time=slot.start.strftime("%Y-%m-%dT%H:%M:%S"),
+                duration=int(self.duration.total_seconds() // 60),
+                timezone=str(self.tz),
+                invitee=slot.candidate_email,
+            ))
+            if "error" in response:
+                raise RuntimeError(f"Zoom could not create the meeting: {response['error']}")
+            slot.meeting_id = str(response.get("meeting_id"))
+            slot.join_url = response.get("join_url")
+        self._book(slot)
+        return slot
+
+    def schedule(self, candidate_emails: List[str], role: str, earliest: Optional[datetime] = None,
+                 max_workers: int = 4) -> List[InterviewSlot]:
+        """
+        Allocates and books interviews for many candidates at once, creating the Zoom meetings
+        concurrently. Candidates who already have an interview for this role keep it instead of
+        getting a second meeting. A slot whose meeting could not be created carries `error`
+        and is released again.
+        """
+        with tracer.span("schedule", candidates=len(candidate_emails)) as span, self._schedule_lock:
+            booked, slots = self._reserve(candidate_emails, role, earliest or self.default_earliest())
+            span.set(new_slots=len(slots))
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(slots) or 1))) as pool:
+                # Each meeting runs in a copy of this context so its spans join the current trace
+                futures = {pool.submit(contextvars.copy_context().run, self.create_meeting, slot): slot
+                           for slot in slots}
+                for future, slot in futures.items():
+                    try:
+                        booked[slot.candidate_email] = future.result()
+                    except Exception as e:
+                        self._release(slot)
+                        slot.error = str(e)
+                        booked[slot.candidate_email] = slot
+        return [booked[email] for email in candidate_emails]
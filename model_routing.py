@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from role_registry import RoleRegistry, role_registry
+from screening import ANALYZER_MODEL_ID, analyze_prepared, prepare_resume
+from tracing import tracer
+
+# Every resume is screened by the first model, and results within `band` of the `threshold`
+# skill match, or contradicting it, go to the next. A role file's `route` overrides any of these.
+DEFAULT_ROUTE: Dict[str, Any] = {"models": [ANALYZER_MODEL_ID, "gpt-4.1-mini"], "threshold": 0.7, "band": 0.1}
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """
+    Models an analysis may go through, cheapest first. A result is passed on to the next
+    model when its skill match lies within `band` of `threshold` (a close call) or when its
+    verdict contradicts its own skill match (low confidence).
+    """
+
+    models: Tuple[str, ...]
+    threshold: float = 0.7
+    band: float = 0.1
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ModelRoute":
+        return cls(models=tuple(config["models"]), threshold=float(config.get("threshold", 0.7)),
+                   band=float(config.get("band", 0.1)))
+
+
+class RoleRoutes(Mapping):
+    """The model route of every role in a registry, built when a role is first screened"""
+
+    def __init__(self, registry: RoleRegistry):
+        self.registry = registry
+
+    def __getitem__(self, role: str) -> ModelRoute:
+        return ModelRoute.from_config({**DEFAULT_ROUTE, **self.registry.get(role).route})
+
+    def __contains__(self, role: object) -> bool:
+        return role in self.registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.roles())
+
+    def __len__(self) -> int:
+        return len(self.registry)
+
+
+def role_routes(registry: RoleRegistry = role_registry) -> RoleRoutes:
+    return RoleRoutes(registry)
+
+
+def escalation_reason(result: Dict[str, Any], route: ModelRoute) -> Optional[str]:
+    """Why a result should go to a stronger model, or None when it can stand"""
+    matching = result.get("matching_skills") or []
+    total = len(matching) + len(result.get("missing_skills") or [])
+    if not total:
+        return "no_skill_breakdown"
+    match = len(matching) / total
+    if abs(match - route.threshold) <= route.band:
+        return "borderline"
+    if bool(result["selected"]) != (match >= route.threshold):
+        return "inconsistent"
+    return None
+
+
+class RoutingStats:
+    """
+    Per-model call counts and latency, how often and why results were escalated, and how
+    often the stronger model agreed with the cheaper one's verdict. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls: Dict[str, int] = defaultdict(int)
+            self.seconds: Dict[str, float] = defaultdict(float)
+            self.reasons: Dict[str, int] = defaultdict(int)
+            self.screened = 0
+            self.escalated = 0
+            self.agreed = 0
+
+    def record_call(self, model_id: str, seconds: float) -> None:
+        with self._lock:
+            self.calls[model_id] += 1
+            self.seconds[model_id] += seconds
+
+    def record_screening(self, verdicts: List[bool], reasons: List[str]) -> None:
+        with self._lock:
+            self.screened += 1
+            for reason in reasons:
+                self.reasons[reason] += 1
+            if len(verdicts) > 1:
+                self.escalated += 1
+                self.agreed += verdicts[-1] == verdicts[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "screened": self.screened,
+                "escalated": self.escalated,
+                "escalation_rate": self.escalated / self.screened if self.screened else 0.0,
+                "agreement_rate": self.agreed / self.escalated if self.escalated else 1.0,
+                "reasons": dict(self.reasons),
+                "models": {model: {"calls": calls, "mean_ms": self.seconds[model] / calls * 1000}
+                           for model, calls in self.calls.items()},
+            }
+
+
+routing_stats = RoutingStats()
+
+
+def run_routed_analysis(resume_text: str, role: str, analyzer_for: Callable[[str], Any], route: ModelRoute,
+                        stats: RoutingStats = routing_stats, prefilter: Any = None, compactor: Any = None,
+                        **kwargs: Any) -> Dict[str, Any]:
+    """
+    run_analysis through a model cascade: `analyzer_for(model_id)` supplies each tier's analyzer.
+    The prefilter and compactor run once, before the first tier, and every tier is sent the same
+    compacted resume; the remaining keyword arguments (cache, throttle, ...) apply to every tier.
+    Each tier's answer is cached under its own model, so a repeat screening replays the same
+    cascade; only answers that took a model call count towards the per-model stats.
+    The models consulted, their verdicts and the escalation reasons are attached under "routing".
+    """
+    verdicts: List[bool] = []
+    reasons: List[str] = []
+    with tracer.span("model_routing", role=role) as span:
+        prepared = prepare_resume(resume_text, role, prefilter, compactor)
+        if prepared.rejection is not None:
+            # Rejected locally; no model was asked, so there is nothing to escalate
+            return prepared.rejection
+        for tier, model_id in enumerate(route.models):
+            started = time.perf_counter()
+            with tracer.span("analysis", role=role):
+                result, cached = analyze_prepared(prepared, role, analyzer_for(model_id), **kwargs)
+            if not cached:
+                stats.record_call(model_id, time.perf_counter() - started)
+            verdicts.append(bool(result["selected"]))
+            reason = escalation_reason(result, route) if tier + 1 < len(route.models) else None
+            if reason is None:
+                break
+            reasons.append(reason)
+        span.set(model=model_id, escalations=len(reasons))
+    stats.record_screening(verdicts, reasons)
+    result = dict(result)
+    result["routing"] = {"model": model_id, "models": list(route.models[:len(verdicts)]),
+                         "verdicts": verdicts, "reasons": reasons}
+    return result
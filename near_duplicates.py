@@ -0,0 +1,159 @@
+import hashlib
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from analysis_cache import normalize_resume_text
+
+SHINGLE_MIX = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+BAND_MIX = np.uint64(0x100000001B3)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class MinHasher:
+    """
+    MinHash signatures of a resume's word shingles. Only the low 16 bits of each minimum are
+    kept (b-bit MinHash): two unrelated values collide 1 time in 65536, which is negligible
+    next to the sampling error of the estimate, and a signature costs `num_perm * 2` bytes.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-add-shift hashing of 32-bit keys: (a * x + b) mod 2**64, top 32 bits, a odd
+        self._a = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self.version = hashlib.sha256(f"{num_perm}:{shingle_size}:{seed}".encode()).hexdigest()[:16]
+
+    def shingles(self, resume_text: str) -> np.ndarray:
+        """Sorted, unique 32-bit hashes of the normalized text's `shingle_size`-word windows"""
+        words = WORD_PATTERN.findall(normalize_resume_text(resume_text).lower())
+        hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words))
+        if len(hashes) >= self.shingle_size:
+            windows = len(hashes) - self.shingle_size + 1
+            combined = hashes[:windows].copy()
+            for offset in range(1, self.shingle_size):
+                combined = combined * SHINGLE_MIX[offset % 2] + hashes[offset:offset + windows]
+            hashes = (combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+        return np.unique(hashes)
+
+    def signature(self, resume_text: str) -> np.ndarray:
+        shingles = self.shingles(resume_text)
+        if not len(shingles):
+            return np.full(self.num_perm, 0xFFFF, dtype=np.uint16)
+        minima = ((self._a * shingles + self._b) >> np.uint64(32)).min(axis=1)
+        return (minima & np.uint64(0xFFFF)).astype(np.uint16)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Exact Jaccard similarity of two sorted, unique shingle arrays"""
+    if not len(a) and not len(b):
+        return 1.0
+    common = len(np.intersect1d(a, b, assume_unique=True))
+    return common / (len(a) + len(b) - common)
+
+
+class MinHashIndex:
+    """
+    LSH index over MinHash signatures, held in flat NumPy arrays instead of per-band dicts.
+
+    Signatures live in one uint16 matrix. For each of `bands` bands there is a sorted array
+    of band hashes and the rows they came from, so a lookup is one binary search per band.
+    New rows go to an unsorted tail that is scanned directly and merged into the sorted
+    arrays once it holds `merge_every` rows, so no lookup scans more than that many band hashes.
+    Keys are caller ids (candidate ids).
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, merge_every: int = 2048):
+        if num_perm % bands or (num_perm // bands) % 4:
+            raise ValueError("num_perm must split into bands of a multiple of 4 rows")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.merge_every = merge_every
+        self._size = 0
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint16)
+        self._sorted = 0
+        self._band_hashes = np.zeros((bands, 0), dtype=np.uint64)
+        self._band_rows = np.zeros((bands, 0), dtype=np.int32)
+        self._tail_hashes = np.zeros((merge_every, bands), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return (self._keys.nbytes + self._signatures.nbytes + self._band_hashes.nbytes
+                + self._band_rows.nbytes + self._tail_hashes.nbytes)
+
+    def _hash_bands(self, signatures: np.ndarray) -> np.ndarray:
+        """(rows, bands) hashes; each band's 16-bit values are read four at a time as uint64 words"""
+        rows = self.num_perm // self.bands
+        words = np.ascontiguousarray(signatures).reshape(len(signatures), self.bands, rows).view(np.uint64)
+        hashes = words[:, :, 0].copy()
+        for column in range(1, words.shape[2]):
+            hashes = hashes * BAND_MIX ^ words[:, :, column]
+        return hashes
+
+    def _merge(self) -> None:
+        tail = self._tail_hashes[:self._size - self._sorted]
+        hashes = np.concatenate([self._band_hashes, tail.T], axis=1)
+        rows = np.concatenate([self._band_rows, np.broadcast_to(
+            np.arange(self._sorted, self._size, dtype=np.int32), (self.bands, self._size - self._sorted))], axis=1)
+        order = np.argsort(hashes, axis=1, kind="stable")
+        self._band_hashes = np.take_along_axis(hashes, order, axis=1)
+        self._band_rows = np.take_along_axis(rows, order, axis=1)
+        self._sorted = self._size
+
+    def add(self, key: int, signature: np.ndarray) -> None:
+        self.extend(np.asarray([key], dtype=np.int64), signature[None, :])
+
+    def extend(self, keys: np.ndarray, signatures: np.ndarray) -> None:
+        needed = self._size + len(keys)
+        if needed > len(self._keys):
+            capacity = max(64, 2 * len(self._keys), needed)
+            self._keys = np.resize(self._keys, capacity)
+            grown = np.zeros((capacity, self.num_perm), dtype=np.uint16)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        hashes = self._hash_bands(signatures)
+        start = 0
+        while start < len(keys):
+            # Fill the tail, merging it into the sorted arrays each time it is full
+            tail = self._size - self._sorted
+            count = min(len(keys) - start, self.merge_every - tail)
+            self._keys[self._size:self._size + count] = keys[start:start + count]
+            self._signatures[self._size:self._size + count] = signatures[start:start + count]
+            self._tail_hashes[tail:tail + count] = hashes[start:start + count]
+            self._size += count
+            start += count
+            if self._size - self._sorted == self.merge_every:
+                self._merge()
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[Tuple[int, float]]:
+        """(key, estimated Jaccard similarity) of indexed rows at or above `threshold`, most similar first"""
+        if not self._size:
+            return []
+        bands = self._hash_bands(signature[None, :])[0]
+        found = []
+        for band in range(self.bands):
+            hashes = self._band_hashes[band]
+            start = np.searchsorted(hashes, bands[band], side="left")
+            stop = np.searchsorted(hashes, bands[band], side="right")
+            if stop > start:
+                found.append(self._band_rows[band, start:stop])
+        if self._size > self._sorted:
+            tail = self._tail_hashes[:self._size - self._sorted]
+            found.append(np.flatnonzero((tail == bands).any(axis=1)) + self._sorted)
+        if not found:
+            return []
+        rows = np.unique(np.concatenate(found))
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        keep = similarity >= threshold
+        rows, similarity = rows[keep], similarity[keep]
+        order = np.argsort(-similarity, kind="stable")
+        return [(int(self._keys[row]), float(similarity[i])) for i, row in zip(order, rows[order])]
@@ -0,0 +1,393 @@
+import importlib.util
+import io
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tracing import tracer
+
+if TYPE_CHECKING:
+    import PyPDF2
+
+# The PDF libraries are imported on first use (see _reader and _pypdfium2), so the app and the
+# service start without them and only the processes that read PDFs pay for them.
+# Optional; without it pages with no PyPDF2 text layer stay empty.
+HAS_PYPDFIUM2 = importlib.util.find_spec("pypdfium2") is not None
+
+# Optional; without it scanned pages stay empty. Importing it also loads pandas, so it is only
+# imported once a scanned page turns up (see _pytesseract), not by every process that reads PDFs.
+HAS_PYTESSERACT = importlib.util.find_spec("pytesseract") is not None
+
+# Caps for pathological PDFs (portfolios, scanned books mistakenly uploaded as a CV)
+MAX_PDF_BYTES = 20 * 1024 * 1024
+MAX_PDF_PAGES = 50
+
+# Below this many pages a single process is faster than paying for the pool round trip
+PARALLEL_PAGE_THRESHOLD = 16
+
+# A page with fewer characters than this (a lone "Page 2 of 3" footer) is treated as having no text layer
+MIN_PAGE_CHARS = 20
+
+# Wall-clock budget for one document across every tier; OCR is the only tier that comes near it
+DOCUMENT_TIMEOUT = 30.0
+
+# Slack for the pool round trip on top of the budget a worker enforces on itself
+TIMEOUT_GRACE = 5.0
+
+OCR_DPI = 300
+OCR_LANG = "eng"
+
+# Slowest last; a document is counted under the slowest tier any of its pages needed
+TIERS = ("text", "layout", "ocr")
+
+
+class PdfTooLargeError(ValueError):
+    """Raised when a PDF exceeds the byte cap before any parsing is attempted"""
+
+
+def _reader(data: bytes, max_bytes: int = MAX_PDF_BYTES) -> "PyPDF2.PdfReader":
+    import PyPDF2
+
+    if len(data) > max_bytes:
+        raise PdfTooLargeError(f"PDF is {len(data)} bytes, above the {max_bytes} byte limit")
+    # BytesIO over the uploaded buffer; PyPDF2 reads from it without a temp file
+    return PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def iter_page_text(data: bytes, max_pages: int = MAX_PDF_PAGES, max_bytes: int = MAX_PDF_BYTES,
+                   start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields the text of each page of a PDF held in memory, one page at a time.
+    Pages without a text layer yield an empty string; pages past `max_pages` are ignored.
+    """
+    pdf_reader = _reader(data, max_bytes)
+    last = min(len(pdf_reader.pages), max_pages)
+    if stop is not None:
+        last = min(last, stop)
+    for index in range(start, last):
+        yield pdf_reader.pages[index].extract_text() or ""
+
+
+def count_pages(data: bytes, max_pages: int = MAX_PDF_PAGES, max_bytes: int = MAX_PDF_BYTES) -> int:
+    return min(len(_reader(data, max_bytes).pages), max_pages)
+
+
+def extract_text(data: bytes, max_pages: int = MAX_PDF_PAGES, max_bytes: int = MAX_PDF_BYTES) -> str:
+    """Extracts the text layer of a whole PDF, joining pages in one pass with a newline between them"""
+    return "\n".join(iter_page_text(data, max_pages, max_bytes))
+
+
+def _extract_page_range(args: Tuple[bytes, int, int, int]) -> List[str]:
+    data, start, stop, max_bytes = args
+    return list(iter_page_text(data, max_pages=stop, max_bytes=max_bytes, start=start, stop=stop))
+
+
+def _page_ranges(data: bytes, pages: int, workers: int, max_bytes: int) -> List[Tuple[bytes, int, int, int]]:
+    chunk = -(-pages // workers)
+    return [(data, start, min(start + chunk, pages), max_bytes) for start in range(0, pages, chunk)]
+
+
+def _extract_named(args: Tuple[str, bytes, int, int]) -> Tuple[str, str, Optional[str]]:
+    name, data, max_pages, max_bytes = args
+    try:
+        return name, extract_text(data, max_pages, max_bytes), None
+    except Exception as e:
+        return name, "", str(e)
+
+
+def _default_workers() -> int:
+    return max(1, min(8, (os.cpu_count() or 1)))
+
+
+def extract_text_parallel(data: bytes, max_workers: Optional[int] = None, max_pages: int = MAX_PDF_PAGES,
+                          max_bytes: int = MAX_PDF_BYTES) -> str:
+    """
+    Extracts a long PDF by splitting its pages into contiguous ranges across a process pool.
+    Short documents are extracted in-process.
+    """
+    with tracer.span("pdf_parse", bytes=len(data)) as span:
+        pages = count_pages(data, max_pages, max_bytes)
+        workers = max_workers or _default_workers()
+        parallel = pages >= PARALLEL_PAGE_THRESHOLD and workers > 1
+        span.set(pages=pages, parallel=parallel)
+        if not parallel:
+            return extract_text(data, max_pages, max_bytes)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            ranges = pool.map(_extract_page_range, _page_ranges(data, pages, workers, max_bytes))
+            return "\n".join(text for texts in ranges for text in texts)
+
+
+def extract_many(sources: Iterable[Tuple[str, bytes]], max_workers: Optional[int] = None,
+                 max_pages: int = MAX_PDF_PAGES, max_bytes: int = MAX_PDF_BYTES,
+                 ) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Extracts many PDFs on a process pool, yielding (name, text, error) in input order.
+    A failing document yields an error message instead of aborting the batch.
+    """
+    jobs: List[Tuple[str, bytes, int, int]] = [(name, data, max_pages, max_bytes) for name, data in sources]
+    workers = max_workers or _default_workers()
+    if len(jobs) <= 1 or workers == 1:
+        yield from map(_extract_named, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_extract_named, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+def _has_text(text: str, min_chars: int) -> bool:
+    return len(text.strip()) >= min_chars
+
+
+_tesseract_found: Optional[bool] = None
+
+
+def _pypdfium2() -> Any:
+    import pypdfium2
+    return pypdfium2
+
+
+def _pytesseract() -> Any:
+    import pytesseract
+    return pytesseract
+
+
+def ocr_available() -> bool:
+    """True when pytesseract, pdfium (to render pages) and the tesseract binary are all installed"""
+    global _tesseract_found
+    if not HAS_PYTESSERACT or not HAS_PYPDFIUM2:
+        return False
+    if _tesseract_found is None:
+        try:
+            _pytesseract().get_tesseract_version()
+            _tesseract_found = True
+        except Exception:
+            _tesseract_found = False
+    return _tesseract_found
+
+
+def available_tiers() -> List[str]:
+    return [tier for tier, available in zip(TIERS, (True, HAS_PYPDFIUM2, ocr_available())) if available]
+
+
+def render_page_images(data: bytes, max_pages: int = 2, scale: float = 1.0,
+                       max_bytes: int = MAX_PDF_BYTES) -> List[bytes]:
+    """PNG images of the first `max_pages` pages, for previews; empty without pdfium or for a broken PDF"""
+    if not HAS_PYPDFIUM2 or len(data) > max_bytes:
+        return []
+    try:
+        document = _pypdfium2().PdfDocument(data)
+    except Exception:
+        return []
+    images = []
+    try:
+        for index in range(min(max_pages, len(document))):
+            buffer = io.BytesIO()
+            document[index].render(scale=scale).to_pil().save(buffer, format="PNG")
+            images.append(buffer.getvalue())
+    except Exception:
+        return images
+    finally:
+        document.close()
+    return images
+
+
+def _recover_pages(args: Tuple[bytes, List[int], int, float, bool]
+                   ) -> Tuple[Dict[int, Tuple[str, str]], Dict[str, float], bool]:
+    """
+    Runs the slow tiers over the pages PyPDF2 found no text on: pdfium's text layer, then OCR of
+    the rendered page. Returns {page: (text, tier)}, the seconds spent per tier, and whether the
+    budget ran out before every page was tried. Runs in a pool worker, so it never raises.
+    """
+    data, pages, min_chars, budget, ocr = args
+    deadline = time.monotonic() + budget
+    recovered: Dict[int, Tuple[str, str]] = {}
+    seconds: Dict[str, float] = defaultdict(float)
+    try:
+        document = _pypdfium2().PdfDocument(data)
+    except Exception:
+        return recovered, dict(seconds), False
+    try:
+        for index in pages:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return recovered, dict(seconds), True
+            started = time.monotonic()
+            page = document[index]
+            text = page.get_textpage().get_text_range()
+            seconds["layout"] += time.monotonic() - started
+            if _has_text(text, min_chars):
+                recovered[index] = (text, "layout")
+                continue
+            if not ocr:
+                continue
+            started = time.monotonic()
+            try:
+                image = page.render(scale=OCR_DPI / 72, grayscale=True).to_pil()
+                text = _pytesseract().image_to_string(image, lang=OCR_LANG, timeout=deadline - time.monotonic())
+            except RuntimeError:
+                # pytesseract kills tesseract once the timeout passes and raises RuntimeError
+                seconds["ocr"] += time.monotonic() - started
+                return recovered, dict(seconds), True
+            except Exception:
+                seconds["ocr"] += time.monotonic() - started
+                continue
+            seconds["ocr"] += time.monotonic() - started
+            if text.strip():
+                recovered[index] = (text, "ocr")
+    finally:
+        document.close()
+    return recovered, dict(seconds), False
+
+
+class ExtractionStats:
+    """
+    Documents and pages by the tier that produced their text, time spent per tier, and how
+    many documents ran out of time or came out with no text at all. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.documents: Dict[str, int] = defaultdict(int)
+            self.pages: Dict[str, int] = defaultdict(int)
+            self.runs: Dict[str, int] = defaultdict(int)
+            self.seconds: Dict[str, float] = defaultdict(float)
+            self.timeouts = 0
+
+    def record(self, page_tiers: List[str], seconds: Dict[str, float], timed_out: bool) -> str:
+        """Records one document and returns the tier it is counted under ("empty" when no page had text)"""
+        used = [tier for tier in TIERS if tier in page_tiers]
+        tier = used[-1] if len(page_tiers) > page_tiers.count("empty") else "empty"
+        with self._lock:
+            self.documents[tier] += 1
+            for page_tier in page_tiers:
+                self.pages[page_tier] += 1
+            for name, spent in seconds.items():
+                self.runs[name] += 1
+                self.seconds[name] += spent
+            self.timeouts += timed_out
+        return tier
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = sum(self.documents.values())
+            slow = self.documents.get("layout", 0) + self.documents.get("ocr", 0)
+            return {
+                "documents": documents,
+                "slow_path_rate": slow / documents if documents else 0.0,
+                "empty_rate": self.documents.get("empty", 0) / documents if documents else 0.0,
+                "timeouts": self.timeouts,
+                "documents_by_tier": dict(self.documents),
+                "pages_by_tier": dict(self.pages),
+                "tiers": {tier: {"runs": runs, "mean_ms": self.seconds[tier] / runs * 1000}
+                          for tier, runs in self.runs.items()},
+            }
+
+
+extraction_stats = ExtractionStats()
+
+
+class TieredExtractor:
+    """
+    Extracts a PDF's text in tiers, each one only for the pages the tier before left empty:
+    PyPDF2's text layer, then pdfium's layout-aware text layer, then Tesseract OCR of the
+    rendered page. Tiers whose library is not installed are skipped.
+
+    Long documents and the slow tiers run on one bounded process pool, shared by every
+    caller; short documents are read on a small thread pool instead, which saves the round
+    trip. Either way a document gets `timeout` seconds across all tiers, counted from the
+    call: pages the slow tiers could not reach in time stay empty, and a document whose page
+    count or text layer alone overruns raises TimeoutError. The caller is never held past the
+    budget, though a worker stuck on a malformed PDF stays busy until PyPDF2 gives up.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = DOCUMENT_TIMEOUT,
+                 min_chars: int = MIN_PAGE_CHARS, ocr: bool = True, max_pages: int = MAX_PDF_PAGES,
+                 max_bytes: int = MAX_PDF_BYTES, stats: ExtractionStats = extraction_stats):
+        self.max_workers = max_workers or _default_workers()
+        self.timeout = timeout
+        self.min_chars = min_chars
+        self.ocr = ocr
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _bounded(self, deadline: float, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs `fn` on the thread pool and waits for it until `deadline` at most"""
+        with self._lock:
+            if self._threads is None:
+                # Room for a few workers stuck on malformed PDFs without holding up the rest
+                self._threads = ThreadPoolExecutor(max_workers=2 * self.max_workers, thread_name_prefix="pdf-text")
+            future = self._threads.submit(fn, *args)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            self.stats.record([], {}, True)
+            raise TimeoutError(f"PDF text layer took longer than {self.timeout:.0f} s") from None
+
+    def _page_texts(self, data: bytes, pages: int, deadline: float) -> List[str]:
+        if pages < PARALLEL_PAGE_THRESHOLD or self.max_workers == 1:
+            return self._bounded(deadline, lambda: list(iter_page_text(data, self.max_pages, self.max_bytes)))
+        ranges = self._executor().map(_extract_page_range, _page_ranges(data, pages, self.max_workers, self.max_bytes),
+                                      timeout=max(0.0, deadline - time.monotonic()))
+        try:
+            return [text for texts in ranges for text in texts]
+        except FutureTimeoutError:
+            self.stats.record([], {}, True)
+            raise TimeoutError(f"PDF text layer took longer than {self.timeout:.0f} s") from None
+
+    def extract(self, data: bytes) -> str:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with tracer.span("pdf_parse", bytes=len(data)) as span:
+            pages = self._bounded(deadline, count_pages, data, self.max_pages, self.max_bytes)
+            texts = self._page_texts(data, pages, deadline)
+            seconds = {"text": time.monotonic() - started}
+            tiers = ["text" if _has_text(text, self.min_chars) else "empty" for text in texts]
+            missing = [index for index, tier in enumerate(tiers) if tier == "empty"]
+            timed_out = False
+            if missing and HAS_PYPDFIUM2:
+                budget = max(0.0, self.timeout - seconds["text"])
+                with tracer.span("pdf_fallback", pages=len(missing)):
+                    future = self._executor().submit(_recover_pages, (data, missing, self.min_chars, budget,
+                                                                      self.ocr and ocr_available()))
+                    try:
+                        recovered, fallback_seconds, timed_out = future.result(timeout=budget + TIMEOUT_GRACE)
+                    except FutureTimeoutError:
+                        future.cancel()
+                        recovered, fallback_seconds, timed_out = {}, {}, True
+                seconds.update(fallback_seconds)
+                for index, (text, tier) in recovered.items():
+                    texts[index] = text
+                    tiers[index] = tier
+            tier = self.stats.record(tiers, seconds, timed_out)
+            span.set(pages=pages, tier=tier, fallback_pages=len(missing), timed_out=timed_out)
+        return "\n".join(texts)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._threads is not None:
+                self._threads.shutdown(wait=False, cancel_futures=True)
+                self._threads = None
+
+
+# Shared by the app, the pipeline and batch screening; the pool is only started when first needed
+tiered_extractor = TieredExtractor()
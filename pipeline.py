@@ -0,0 +1,519 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_PATH
+from analysis_schema import MULTI_ROLE_RESPONSE_FORMAT
+from application_workflow import Application, ApplicationWorkflow, WorkflowStep, DEFAULT_WORKFLOW_PATH
+from batch_screening import ResumeSource
+from candidate_store import CandidateStore, DEFAULT_STORE_PATH
+from email_outbox import EmailOutbox, SmtpSender, DEFAULT_OUTBOX_PATH, GMAIL_SMTP_HOST, GMAIL_SMTP_SSL_PORT
+from model_routing import ModelRoute, role_routes, run_routed_analysis
+from pdf_extraction import tiered_extractor
+from prefilter import Prefilter
+from prompt_compaction import PromptCompactor, DEFAULT_TOKEN_BUDGET
+from resource_pool import ResourcePool, fingerprint
+from role_registry import role_registry
+from screening import run_analysis, run_multi_role_analysis
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from interview_scheduler import InterviewScheduler
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def find_email(resume_text: str) -> Optional[str]:
+    """The first email address in a resume, used when the caller did not supply one"""
+    match = EMAIL_PATTERN.search(resume_text)
+    return match.group(0) if match else None
+
+
+def contact_key(email: Optional[str], analysis: Dict[str, Any]) -> Optional[str]:
+    """
+    The candidate outbound mail and applications are keyed on, which is not where they are
+    delivered: that is always the current submission's address. A resubmission shares the
+    earlier submission's key, and so is not emailed twice, only when both carry the same
+    address or the earlier analysis was reused (their texts overlap by REUSE_THRESHOLD, not
+    just by a MinHash estimate). Any other near-duplicate is only linked in the store.
+    """
+    duplicate = analysis.get("duplicate") or {}
+    earlier = duplicate.get("email")
+    if earlier and (duplicate.get("reused") or earlier.strip().lower() == (email or "").strip().lower()):
+        return earlier
+    return email
+
+
+@dataclass
+class PipelineSettings:
+    """Everything the pipeline needs to build its agents and stores, without Streamlit"""
+    openai_api_key: str = ""
+    openai_base_url: Optional[str] = None
+    company_name: str = ""
+    email_sender: str = ""
+    email_passkey: str = ""
+    zoom_account_id: str = ""
+    zoom_client_id: str = ""
+    zoom_client_secret: str = ""
+    llm_drafts: bool = False
+    smtp_host: str = GMAIL_SMTP_HOST
+    smtp_port: int = GMAIL_SMTP_SSL_PORT
+    smtp_ssl: bool = True
+    # Zoom's own endpoints when unset
+    zoom_token_url: Optional[str] = None
+    zoom_api_base: Optional[str] = None
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+    # Screen with each role's model cascade (see model_routing) rather than a single model
+    routing: bool = True
+    # Link resubmitted resumes to earlier ones and reuse their analysis when barely changed
+    dedupe: bool = True
+    cache_path: str = DEFAULT_CACHE_PATH
+    store_path: str = DEFAULT_STORE_PATH
+    outbox_path: str = DEFAULT_OUTBOX_PATH
+    # interview_scheduler.DEFAULT_SCHEDULE_PATH when unset
+    schedule_path: Optional[str] = None
+    # YAML or JSON file of interviewers and their availability (see load_interviewers); one "hr" calendar without it
+    interviewers_path: str = ""
+    workflow_path: str = DEFAULT_WORKFLOW_PATH
+
+    @classmethod
+    def from_env(cls) -> "PipelineSettings":
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+            openai_base_url=os.getenv("OPENAI_BASE_URL") or None,
+            company_name=os.getenv("COMPANY_NAME", ""),
+            email_sender=os.getenv("EMAIL_SENDER", ""),
+            email_passkey=os.getenv("EMAIL_PASSKEY", ""),
+            zoom_account_id=os.getenv("ZOOM_ACCOUNT_ID", ""),
+            zoom_client_id=os.getenv("ZOOM_CLIENT_ID", ""),
+            zoom_client_secret=os.getenv("ZOOM_CLIENT_SECRET", ""),
+            llm_drafts=os.getenv("LLM_DRAFTS", "").lower() in ("1", "true", "yes"),
+            smtp_host=os.getenv("SMTP_HOST", GMAIL_SMTP_HOST),
+            smtp_port=int(os.getenv("SMTP_PORT", str(GMAIL_SMTP_SSL_PORT))),
+            smtp_ssl=os.getenv("SMTP_SSL", "true").lower() in ("1", "true", "yes"),
+            zoom_token_url=os.getenv("ZOOM_TOKEN_URL") or None,
+            zoom_api_base=os.getenv("ZOOM_API_BASE") or None,
+            token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET))),
+            routing=os.getenv("ANALYZER_ROUTING", "true").lower() in ("1", "true", "yes"),
+            dedupe=os.getenv("NEAR_DUPLICATES", "true").lower() in ("1", "true", "yes"),
+            cache_path=os.getenv("ANALYSIS_CACHE_PATH", DEFAULT_CACHE_PATH),
+            store_path=os.getenv("CANDIDATE_STORE_PATH", DEFAULT_STORE_PATH),
+            outbox_path=os.getenv("OUTBOX_PATH", DEFAULT_OUTBOX_PATH),
+            schedule_path=os.getenv("INTERVIEW_SCHEDULE_PATH") or None,
+            interviewers_path=os.getenv("INTERVIEWERS_PATH", ""),
+            workflow_path=os.getenv("APPLICATION_WORKFLOW_PATH", DEFAULT_WORKFLOW_PATH),
+        )
+
+    @property
+    def can_email(self) -> bool:
+        return all((self.email_sender, self.email_passkey, self.openai_api_key, self.company_name))
+
+    @property
+    def can_schedule(self) -> bool:
+        return all((self.zoom_account_id, self.zoom_client_id, self.zoom_client_secret))
+
+
+@dataclass
+class PipelineResult:
+    name: str
+    role: str
+    email: Optional[str] = None
+    selected: bool = False
+    feedback: str = ""
+    analysis: Dict[str, Any] = field(default_factory=dict)
+    email_queued: Optional[bool] = None
+    interview: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+    trace_id: Optional[str] = None
+    # Set when the selected candidate's follow-up steps went through the application workflow
+    application_id: Optional[int] = None
+    application_status: Optional[str] = None
+    # The earlier submission this resume nearly repeats (see CandidateStore.find_duplicate)
+    duplicate_of: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "role": self.role,
+            "email": self.email,
+            "selected": self.selected,
+            "feedback": self.feedback,
+            "matching_skills": list(self.analysis.get("matching_skills", [])),
+            "missing_skills": list(self.analysis.get("missing_skills", [])),
+            "experience_level": self.analysis.get("experience_level", ""),
+            "email_queued": self.email_queued,
+            "interview": self.interview,
+            "error": self.error,
+            "seconds": round(self.seconds, 3),
+            "trace_id": self.trace_id,
+            "application_id": self.application_id,
+            "application_status": self.application_status,
+            "duplicate_of": self.duplicate_of,
+        }
+
+
+def build_outbox(sender_email: str, email_passkey: str, api_key: str, company_name: str,
+                 pool: ResourcePool, llm_drafts: bool = False, path: str = DEFAULT_OUTBOX_PATH,
+                 sender: Optional[Any] = None, base_url: Optional[str] = None) -> EmailOutbox:
+    """
+    An outbox for one sender account; its workers draft and send in the background. The email
+    agent (and the agent SDK) is only loaded once the first email needs the LLM.
+    """
+    from email_drafting import draft_with_agent
+    from email_templates import FeedbackPersonalizer, TemplateEmailDrafter
+
+    def build_agent() -> Any:
+        from agents import build_email_agent
+        return build_email_agent(api_key, company_name, http_client = pool.httpx_client(), base_url = base_url)
+
+    # The outbox's workers draft at the same time, so each draft runs on an agent of its own
+    email_agent = pool.leased("email_agent", (fingerprint(api_key), company_name, base_url), build_agent)
+    # Templates by default; the LLM then only writes the feedback paragraph of rejections
+    if llm_drafts:
+        drafter = partial(draft_with_agent, email_agent, company_name)
+    else:
+        drafter = TemplateEmailDrafter(company_name, personalize = FeedbackPersonalizer(email_agent))
+    return EmailOutbox(
+        drafter = drafter,
+        sender = sender or SmtpSender(sender_email, email_passkey),
+        path = path,
+        sender_address = sender_email
+    ).start()
+
+
+def build_scheduler(zoom_account_id: str, zoom_client_id: str, zoom_client_secret: str,
+                    pool: ResourcePool, path: Optional[str] = None, token_url: Optional[str] = None,
+                    api_base: Optional[str] = None, interviewers_path: str = "") -> "InterviewScheduler":
+    """
+    A scheduler for one Zoom account, so every caller books against the same calendar;
+    `interviewers_path` lists the interviewers and their availability. The scheduler and the
+    Zoom SDK (with pytz and requests) are only imported here, once scheduling is configured.
+    """
+    from interview_scheduler import InterviewScheduler, DEFAULT_SCHEDULE_PATH, load_interviewers
+    from zoom_tool import CustomZoomTool, ZOOM_API_BASE, ZOOM_TOKEN_URL
+
+    zoom_tool = CustomZoomTool(
+        account_id = zoom_account_id,
+        client_id = zoom_client_id,
+        client_secret = zoom_client_secret,
+        session = pool.http_session("zoom"),
+        token_url = token_url or ZOOM_TOKEN_URL,
+        api_base = api_base or ZOOM_API_BASE
+    )
+    path = path or DEFAULT_SCHEDULE_PATH
+    if interviewers_path:
+        return InterviewScheduler(zoom_tool, interviewers = load_interviewers(interviewers_path), path = path)
+    return InterviewScheduler(zoom_tool, path = path)
+
+
+def application_steps(outbox: Optional[EmailOutbox], scheduler: Optional["InterviewScheduler"]) -> List[WorkflowStep]:
+    """
+    What follows a selection: queueing the confirmation email and booking the interview.
+    They do not depend on each other, so the workflow runs them at the same time. A step is
+    skipped when its component is missing or the application's context turns it off.
+    """
+
+    def selection_email(applications: List[Application]) -> List[Any]:
+        results = []
+        for application in applications:
+            if outbox is None or not application.context.get("notify", True):
+                results.append({"skipped": True})
+                continue
+            message_id, created = outbox.enqueue(application.address, application.role, "selected",
+                                                 candidate = application.candidate_email)
+            results.append({"message_id": message_id, "queued": created})
+        return results
+
+    def interview(applications: List[Application]) -> List[Any]:
+        results: Dict[int, Any] = {application.id: {"skipped": True} for application in applications}
+        by_role: Dict[str, List[Application]] = {}
+        for application in applications:
+            if scheduler is not None and application.context.get("schedule", True):
+                by_role.setdefault(application.role, []).append(application)
+        # One scheduler call per role, so a batch of candidates is spread across free slots
+        for role, group in by_role.items():
+            slots = scheduler.schedule([application.address for application in group], role)
+            for application, slot in zip(group, slots):
+                results[application.id] = RuntimeError(slot.error) if slot.error else slot.to_dict()
+        return [results[application.id] for application in applications]
+
+    return [WorkflowStep("selection_email", selection_email), WorkflowStep("interview", interview)]
+
+
+def build_workflow(outbox: Optional[EmailOutbox], scheduler: Optional["InterviewScheduler"],
+                   path: str = DEFAULT_WORKFLOW_PATH, **kwargs: Any) -> ApplicationWorkflow:
+    return ApplicationWorkflow(application_steps(outbox, scheduler), path = path, **kwargs)
+
+
+class ScreeningPipeline:
+    """
+    The whole screening flow (extract -> analyze -> notify -> schedule) as a library, with no
+    Streamlit dependency. The Streamlit app, the HTTP service and the CLI all drive this class.
+
+    Each calling thread gets its own analyzer from `analyzer_factory`. Every stage is optional:
+    without an outbox nobody is emailed, without a scheduler no interview is booked.
+    With `routes`, roles listed there are screened through a model cascade (see model_routing)
+    and `analyzer_factory` is called with the `model_id` of each tier. With a `workflow`, the
+    selection email and interview of a selected candidate are recorded as a resumable
+    application (see application_workflow) instead of being run in one go. With a store and
+    `dedupe`, a resume that nearly repeats an earlier submission is linked to it and reuses its
+    analysis when barely changed; mail still goes to the address it was submitted with (see
+    contact_key for when it counts as the same candidate).
+    """
+
+    def __init__(self, analyzer_factory: Callable[[], Any], cache: Optional[AnalysisCache] = None,
+                 prefilter: Optional[Prefilter] = None, compactor: Optional[PromptCompactor] = None,
+                 store: Optional[CandidateStore] = None, outbox: Optional[EmailOutbox] = None,
+                 scheduler: Optional["InterviewScheduler"] = None,
+                 extract: Callable[[bytes], str] = tiered_extractor.extract,
+                 routes: Optional[Mapping[str, ModelRoute]] = None, workflow: Optional[ApplicationWorkflow] = None,
+                 dedupe: bool = True):
+        self.analyzer_factory = analyzer_factory
+        self.cache = cache
+        self.prefilter = prefilter
+        self.compactor = compactor
+        self.store = store
+        self.outbox = outbox
+        self.scheduler = scheduler
+        self.routes = routes if routes is not None else {}
+        self.workflow = workflow
+        self.dedupe = dedupe
+        self._extract = extract
+        self._local = threading.local()
+
+    def _analyzer(self, model_id: Optional[str] = None, multi_role: bool = False) -> Any:
+        analyzers = getattr(self._local, "analyzers", None)
+        if analyzers is None:
+            analyzers = self._local.analyzers = {}
+        analyzer = analyzers.get((model_id, multi_role))
+        if analyzer is None:
+            kwargs: Dict[str, Any] = {} if model_id is None else {"model_id": model_id}
+            if multi_role:
+                kwargs["response_format"] = MULTI_ROLE_RESPONSE_FORMAT
+            analyzer = self.analyzer_factory(**kwargs)
+            analyzers[(model_id, multi_role)] = analyzer
+        return analyzer
+
+    def extract(self, pdf_bytes: bytes) -> str:
+        resume_text = self._extract(pdf_bytes)
+        if not resume_text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+        return resume_text
+
+    def analyze(self, resume_text: str, role: str, analyzer: Any = None) -> Dict[str, Any]:
+        """
+        Screens a resume for a role. The earlier submission it nearly repeats, if any, is attached
+        under "duplicate"; when that one's analysis is reused, no analyzer is called at all.
+        """
+        if role not in role_registry:
+            raise ValueError(f"Unknown role: {role}")
+        duplicate = None
+        if self.store is not None and self.dedupe:
+            duplicate = self.store.find_duplicate(resume_text, role, requirements_version = role_registry.version(role))
+        if duplicate is not None and duplicate.analysis is not None:
+            analysis = dict(duplicate.analysis)
+            analysis.pop("duplicate", None)
+        else:
+            # A budget of 0 means the full resume is sent
+            compactor = self.compactor if self.compactor is not None and self.compactor.token_budget else None
+            if analyzer is None and role in self.routes:
+                analysis = run_routed_analysis(resume_text, role, self._analyzer, self.routes[role], cache=self.cache,
+                                               prefilter=self.prefilter, compactor=compactor)
+            else:
+                analysis = run_analysis(resume_text, role, analyzer or self._analyzer(), cache=self.cache,
+                                        prefilter=self.prefilter, compactor=compactor)
+        if duplicate is not None:
+            analysis = dict(analysis, duplicate = duplicate.to_dict())
+        return analysis
+
+    def record(self, resume_text: str, name: str, email: Optional[str], role: str, analysis: Dict[str, Any]) -> None:
+        if self.store is not None:
+            with tracer.span("candidate_store"):
+                self.store.add(resume_text, name = name, email = email, role = role, analysis = analysis,
+                               duplicate_of = (analysis.get("duplicate") or {}).get("candidate_id"))
+
+    def notify(self, email: str, role: str, analysis: Dict[str, Any]) -> Optional[bool]:
+        """
+        Queues the selection or rejection email. Returns whether a new email was queued,
+        or None when the pipeline has no outbox.
+        """
+        if self.outbox is None:
+            return None
+        candidate = contact_key(email, analysis)
+        with tracer.span("email_enqueue"):
+            if analysis["selected"]:
+                _, created = self.outbox.enqueue(email, role, "selected", candidate = candidate)
+            else:
+                context = {"feedback": analysis["feedback"], "missing_skills": analysis.get("missing_skills") or []}
+                _, created = self.outbox.enqueue(email, role, "rejected", context = context, candidate = candidate)
+        return created
+
+    def schedule(self, emails: List[str], role: str) -> List[Any]:
+        """Books interviews (and Zoom meetings) for selected candidates; empty without a scheduler"""
+        if self.scheduler is None:
+            return []
+        return self.scheduler.schedule(emails, role)
+
+    def apply(self, results: List[PipelineResult], notify: bool = True, schedule: bool = True) -> None:
+        """
+        Records applications for selected candidates and runs their steps together, filling in
+        each result from the recorded step outcomes. A step that failed is retried later by the
+        workflow's workers or `cli.py resume-applications`, without redoing the ones that finished.
+        """
+        ids = [self.workflow.submit(contact_key(result.email, result.analysis), result.role,
+                                    {"notify": notify, "schedule": schedule}, deliver_to = result.email)[0]
+               for result in results]
+        for result, status in zip(results, self.workflow.run(ids)):
+            result.application_id = status["id"]
+            result.application_status = status["status"]
+            email_step, interview_step = status["steps"]["selection_email"], status["steps"]["interview"]
+            if email_step["status"] == "done" and not email_step["result"].get("skipped"):
+                result.email_queued = email_step["result"]["queued"]
+            if interview_step["status"] == "done" and not interview_step["result"].get("skipped"):
+                result.interview = interview_step["result"]
+            elif interview_step["error"]:
+                result.interview = {"error": interview_step["error"]}
+
+    def process(self, name: str, role: str, pdf_bytes: Optional[bytes] = None, resume_text: Optional[str] = None,
+                email: Optional[str] = None, notify: bool = True, schedule: bool = True,
+                apply: bool = True) -> PipelineResult:
+        """
+        Runs one resume through every stage, never raising; failures are reported in `error`.
+        With a workflow and `apply` off, a selected candidate's follow-up steps are left to the caller.
+        """
+        started = time.monotonic()
+        result = PipelineResult(name=name, role=role, email=email)
+        try:
+            with tracer.span("candidate", resume=name, role=role):
+                result.trace_id = tracer.current_trace_id()
+                if resume_text is None:
+                    resume_text = self.extract(pdf_bytes or b"")
+                result.email = email or find_email(resume_text)
+                analysis = self.analyze(resume_text, role)
+                result.analysis = analysis
+                result.selected = bool(analysis["selected"])
+                result.feedback = analysis["feedback"]
+                result.duplicate_of = analysis.get("duplicate")
+                self.record(resume_text, name, result.email, role, analysis)
+                if self.workflow is not None and result.selected and result.email:
+                    if apply and (notify or schedule):
+                        self.apply([result], notify = notify, schedule = schedule)
+                else:
+                    if notify and result.email:
+                        result.email_queued = self.notify(result.email, role, analysis)
+                    if schedule and result.selected and result.email:
+                        slots = self.schedule([result.email], role)
+                        if slots:
+                            result.interview = slots[0].to_dict()
+        except Exception as e:
+            result.error = f"Error while processing resume: {str(e)}"
+        result.seconds = time.monotonic() - started
+        return result
+
+    def match_roles(self, name: str, pdf_bytes: Optional[bytes] = None, resume_text: Optional[str] = None,
+                    roles: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Ranks the roles (every registered one by default) a resume fits, with one analyzer call
+        for all of them (see screening.run_multi_role_analysis). Nothing is recorded, emailed or
+        scheduled: it tells a recruiter which role to screen the candidate for. Never raises;
+        failures are reported under "error". `analyzer_factory` must accept `response_format`.
+        """
+        started = time.monotonic()
+        result: Dict[str, Any] = {"name": name, "roles": [], "fitting_roles": [], "error": None}
+        try:
+            with tracer.span("candidate", resume=name, role="*"):
+                result["trace_id"] = tracer.current_trace_id()
+                if resume_text is None:
+                    resume_text = self.extract(pdf_bytes or b"")
+                unknown = [role for role in roles or [] if role not in role_registry]
+                if unknown:
+                    raise ValueError(f"Unknown role: {', '.join(unknown)}")
+                # A budget of 0 means the full resume is sent
+                compactor = self.compactor if self.compactor is not None and self.compactor.token_budget else None
+                result.update(run_multi_role_analysis(resume_text, self._analyzer(multi_role = True), roles,
+                                                      cache = self.cache, prefilter = self.prefilter,
+                                                      compactor = compactor))
+        except Exception as e:
+            result["error"] = f"Error while processing resume: {str(e)}"
+        result["seconds"] = time.monotonic() - started
+        return result
+
+    def match_many(self, sources: List[ResumeSource], roles: Optional[List[str]] = None,
+                   max_workers: int = 4) -> Iterator[Dict[str, Any]]:
+        """Runs match_roles over many resumes concurrently, yielding results as they finish"""
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline") as pool:
+            futures = [pool.submit(self.match_roles, name, pdf_bytes=data, roles=roles) for name, data in sources]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def process_many(self, sources: List[ResumeSource], role: str, max_workers: int = 4,
+                     notify: bool = True, schedule: bool = True) -> Iterator[PipelineResult]:
+        """
+        Screens many resumes concurrently and yields results as they finish. Selected candidates
+        are scheduled together at the end so the allocator can spread them across free slots.
+        """
+        # With a workflow, selected candidates' emails wait for the batch too: both are application steps
+        deferred = schedule or (notify and self.workflow is not None)
+        selected: List[PipelineResult] = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline") as pool:
+            futures = [pool.submit(self.process, name, role, pdf_bytes=data, notify=notify, schedule=False, apply=False)
+                       for name, data in sources]
+            for future in as_completed(futures):
+                result = future.result()
+                if deferred and result.selected and result.email and not result.error:
+                    selected.append(result)
+                else:
+                    yield result
+        if selected and self.workflow is not None:
+            self.apply(selected, notify = notify, schedule = schedule)
+        elif selected:
+            slots = self.schedule([result.email for result in selected], role)
+            for result, slot in zip(selected, slots):
+                result.interview = slot.to_dict()
+        yield from selected
+
+
+def build_pipeline(settings: PipelineSettings, pool: Optional[ResourcePool] = None,
+                   analyzer_factory: Optional[Callable[[], Any]] = None) -> ScreeningPipeline:
+    """
+    Wires a pipeline from settings. The outbox and scheduler are only built when their
+    credentials are present; `analyzer_factory` replaces the OpenAI analyzer (e.g. in tests)
+    and, unless `settings.routing` is off, must accept a `model_id` keyword.
+    """
+    pool = pool or ResourcePool()
+    if analyzer_factory is None:
+        from agents import build_resume_analyzer
+        if not settings.openai_api_key:
+            raise ValueError("An OpenAI API key is required to analyze resumes")
+        analyzer_factory = partial(build_resume_analyzer, settings.openai_api_key, http_client = pool.httpx_client(),
+                                   base_url = settings.openai_base_url)
+    outbox = None
+    if settings.can_email:
+        outbox = build_outbox(settings.email_sender, settings.email_passkey, settings.openai_api_key,
+                              settings.company_name, pool, llm_drafts = settings.llm_drafts,
+                              path = settings.outbox_path, base_url = settings.openai_base_url,
+                              sender = SmtpSender(settings.email_sender, settings.email_passkey, host = settings.smtp_host,
+                                                  port = settings.smtp_port, use_ssl = settings.smtp_ssl))
+    scheduler = None
+    if settings.can_schedule:
+        scheduler = build_scheduler(settings.zoom_account_id, settings.zoom_client_id, settings.zoom_client_secret,
+                                    pool, path = settings.schedule_path, token_url = settings.zoom_token_url,
+                                    api_base = settings.zoom_api_base, interviewers_path = settings.interviewers_path)
+    return ScreeningPipeline(
+        analyzer_factory = analyzer_factory,
+        cache = AnalysisCache(settings.cache_path),
+        prefilter = Prefilter(),
+        compactor = PromptCompactor(settings.token_budget),
+        store = CandidateStore(settings.store_path),
+        outbox = outbox,
+        scheduler = scheduler,
+        routes = role_routes() if settings.routing else None,
+        dedupe = settings.dedupe,
+        workflow = build_workflow(outbox, scheduler, path = settings.workflow_path) if outbox or scheduler else None
+    )
@@ -0,0 +1,202 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern
+
+DEFAULT_THRESHOLD = float(os.getenv("PREFILTER_THRESHOLD", "0.25"))
+
+# BM25 term-frequency saturation: repeated mentions help, but with diminishing returns.
+# With k1 = 0.5 one mention of a skill is worth 0.67 of the maximum, three are worth 0.86.
+BM25_K1 = 0.5
+
+# Extra spellings for the skills in the role files (see role_registry), keyed by the lowercased requirement text
+SYNONYMS: Dict[str, List[str]] = {
+    "python": ["python3"],
+    "pytorch": ["torch"],
+    "tensorflow": ["tf", "keras"],
+    "machine learning algorithms": ["machine learning", "ml", "scikit-learn", "sklearn", "xgboost", "lightgbm"],
+    "frameworks": ["scikit-learn", "sklearn", "hugging face", "huggingface", "transformers"],
+    "deep learning": ["dl", "cnn", "rnn", "transformer"],
+    "neural networks": ["neural network", "cnn", "rnn", "lstm"],
+    "data preprocessing": ["data cleaning", "feature engineering", "etl"],
+    "analysis": ["data analysis", "pandas", "numpy"],
+    "mlops": ["mlflow", "kubeflow", "sagemaker", "vertex ai"],
+    "model deployment": ["model serving", "inference", "torchserve", "onnx"],
+    "rag": ["retrieval augmented generation", "retrieval-augmented generation", "vector database"],
+    "llms": ["llm", "large language model", "large language models", "gpt", "openai"],
+    "finetuning": ["fine-tuning", "fine tuning", "lora", "peft"],
+    "prompt engineering": ["prompting", "prompt design"],
+    "react": ["react.js", "reactjs", "next.js", "nextjs"],
+    "vue.js": ["vue", "vuejs", "nuxt"],
+    "angular": ["angularjs"],
+    "html5": ["html"],
+    "css3": ["css", "sass", "scss", "tailwind"],
+    "javascript": ["js", "es6", "ecmascript"],
+    "typescript": ["ts"],
+    "responsive design": ["responsive", "mobile-first", "media queries"],
+    "state management": ["redux", "vuex", "pinia", "mobx", "zustand", "ngrx"],
+    "frontend testing": ["jest", "cypress", "playwright", "testing library", "vitest", "unit testing"],
+    "java": ["spring", "spring boot"],
+    "node.js": ["node", "nodejs", "express"],
+    "rest apis": ["rest", "restful", "rest api", "api design", "fastapi", "flask", "django"],
+    "database design": ["sql", "postgresql", "postgres", "mysql", "mongodb", "data modeling"],
+    "management": ["database management", "dbms"],
+    "system architecture": ["system design", "microservices", "distributed systems", "architecture"],
+    "cloud services": ["cloud"],
+    "aws": ["amazon web services", "ec2", "s3", "lambda"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "kubernetes": ["k8s", "helm", "eks", "gke", "aks"],
+    "docker": ["containers", "containerization", "docker compose"],
+    "ci/cd": ["ci", "continuous integration", "continuous delivery", "github actions", "jenkins", "gitlab ci"],
+}
+
+
+@dataclass
+class SkillGroup:
+    """One required skill, met by any of its alternatives (e.g. React/Vue.js/Angular)"""
+    label: str
+    terms: List[str]
+
+
+@dataclass
+class RoleIndex:
+    role: str
+    groups: List[SkillGroup]
+    pattern: Pattern
+    term_to_group: Dict[str, int]
+    # Relative importance of each group in the score; all 1.0 unless the role file sets weights
+    weights: List[float] = field(default_factory=list)
+    # Pass mark for this role; the Prefilter's own threshold when the role file does not set one
+    threshold: Optional[float] = None
+
+
+@dataclass
+class PrefilterResult:
+    score: float
+    passed: bool
+    matching_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"score": round(self.score, 3), "passed": self.passed,
+                "matching_skills": self.matching_skills, "missing_skills": self.missing_skills}
+
+
+def parse_skill_groups(requirements: str, synonyms: Optional[Dict[str, List[str]]] = None) -> List[SkillGroup]:
+    """
+    Turns a free-text bullet list of requirements into skill groups with synonyms.
+    `synonyms` adds to (and for the same term replaces) the shared SYNONYMS.
+    """
+    synonyms = {**SYNONYMS, **synonyms} if synonyms else SYNONYMS
+    groups = []
+    for line in requirements.splitlines():
+        line = line.strip()
+        if not line.startswith("-"):
+            continue
+        for label in (item.strip() for item in line[1:].split(",")):
+            if not label:
+                continue
+            terms = set()
+            # "Cloud Services (AWS/GCP/Azure)" -> "cloud services", "aws", "gcp", "azure"
+            bare = re.sub(r"[()]", "/", label.lower())
+            for alternative in re.split(r"/| and ", bare):
+                alternative = alternative.strip()
+                if alternative:
+                    terms.add(alternative)
+                    terms.update(synonyms.get(alternative, []))
+            # Keep "ci/cd" whole as well as its halves
+            terms.add(label.lower())
+            terms.update(synonyms.get(label.lower(), []))
+            groups.append(SkillGroup(label=label, terms=sorted(terms)))
+    return groups
+
+
+def build_role_index(role: str, requirements: Optional[str] = None, synonyms: Optional[Dict[str, List[str]]] = None,
+                     weights: Optional[Dict[str, float]] = None, threshold: Optional[float] = None) -> RoleIndex:
+    """
+    Compiles a requirement text into skill groups and one pattern matching all their terms.
+    Without `requirements`, the role's compiled index is taken from the role registry.
+    `weights` maps lowercased group labels to their weight; unlisted groups weigh 1.0.
+    """
+    if requirements is None:
+        from role_registry import role_registry
+        return role_registry.get(role).index
+    groups = parse_skill_groups(requirements, synonyms)
+    term_to_group: Dict[str, int] = {}
+    for index, group in enumerate(groups):
+        for term in group.terms:
+            term_to_group.setdefault(term, index)
+    # Longest terms first so "node.js" wins over "node"; one compiled pass finds every term
+    alternation = "|".join(re.escape(term) for term in sorted(term_to_group, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![\w.+#-])(?:{alternation})(?![\w+#])")
+    weights = {label.lower(): float(weight) for label, weight in (weights or {}).items()}
+    return RoleIndex(role=role, groups=groups, pattern=pattern, term_to_group=term_to_group,
+                     weights=[weights.get(group.label.lower(), 1.0) for group in groups], threshold=threshold)
+
+
+class Prefilter:
+    """
+    Deterministic keyword scorer run before the LLM screen.
+
+    Each skill group contributes tf * (k1 + 1) / (tf + k1), the BM25 term-frequency curve,
+    scaled into [0, 1); the score is the mean over all groups, weighted by the role's group
+    weights. Resumes scoring below the pass mark are rejected locally and never reach the
+    model: the role file's `prefilter_threshold` when it sets one, otherwise `threshold`.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.screened = 0
+        self.passed = 0
+        self._lock = threading.Lock()
+
+    def index_for(self, role: str) -> RoleIndex:
+        # The registry caches compiled roles and recompiles one when its file changes
+        return build_role_index(role)
+
+    def score(self, resume_text: str, role: str) -> PrefilterResult:
+        index = self.index_for(role)
+        counts = [0] * len(index.groups)
+        for match in index.pattern.findall(resume_text.lower()):
+            counts[index.term_to_group[match]] += 1
+        saturated = [tf * (BM25_K1 + 1) / (tf + BM25_K1) / (BM25_K1 + 1) for tf in counts]
+        weights = index.weights or [1.0] * len(index.groups)
+        score = sum(w * s for w, s in zip(weights, saturated)) / sum(weights) if index.groups else 1.0
+        result = PrefilterResult(
+            score=score,
+            passed=score >= (self.threshold if index.threshold is None else index.threshold),
+            matching_skills=[g.label for g, tf in zip(index.groups, counts) if tf],
+            missing_skills=[g.label for g, tf in zip(index.groups, counts) if not tf],
+        )
+        with self._lock:
+            self.screened += 1
+            self.passed += result.passed
+        return result
+
+    @property
+    def llm_calls_saved(self) -> int:
+        return self.screened - self.passed
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.screened if self.screened else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"screened": self.screened, "passed": self.passed,
+                "pass_rate": self.pass_rate, "llm_calls_saved": self.llm_calls_saved}
+
+
+def rejection_from_prefilter(result: PrefilterResult, role: str) -> Dict[str, Any]:
+    """Builds an analyzer-shaped result for a resume the pre-filter rejected"""
+    return {
+        "selected": False,
+        "feedback": (f"The resume matches {len(result.matching_skills)} of "
+                     f"{len(result.matching_skills) + len(result.missing_skills)} required skills for the "
+                     f"{role} role. Consider building experience with: {', '.join(result.missing_skills)}."),
+        "matching_skills": result.matching_skills,
+        "missing_skills": result.missing_skills,
+        "experience_level": "",
+        "prefilter": result.to_dict(),
+    }
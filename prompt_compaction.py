@@ -0,0 +1,204 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to the ~4 characters per token rule of thumb
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Sections in the order they are kept when the budget runs short
+SECTION_PRIORITY = ["skills", "experience", "projects", "summary", "education", "other"]
+
+SECTION_HEADINGS: Dict[str, str] = {
+    "skills": r"(technical\s+)?skills|technologies|tech\s+stack|tools|core\s+competencies",
+    "experience": r"(professional\s+|work\s+)?experience|employment(\s+history)?|work\s+history|career",
+    "projects": r"(personal\s+|key\s+|academic\s+)?projects",
+    "education": r"education|academics?|qualifications",
+    "summary": r"summary|profile|objective|about(\s+me)?",
+    "other": r"certifications?|awards|achievements|publications|languages|interests|hobbies|volunteering",
+}
+_HEADING = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items()) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+# "Skills: Python, Docker" opens the skills section and keeps its content
+_INLINE_HEADING = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items()) + r")\s*:\s*(?P<rest>.+)$",
+    re.IGNORECASE,
+)
+
+# Page-number footers ("Page 2 of 3", "2/3", "- 2 -"); a bare number may be a year, so it stays
+_PAGE_NUMBER = re.compile(
+    r"^\s*(?:page\s+\d+(?:\s+of\s+\d+)?|(?P<page>\d{1,3})\s*/\s*(?P<pages>\d{1,3})|-\s*\d+\s*-)\s*$",
+    re.IGNORECASE,
+)
+
+_BOILERPLATE = re.compile(
+    r"^\s*(?:curriculum\s+vitae|resume|references\s+(are\s+)?available\s+(up)?on\s+request\.?)\s*$",
+    re.IGNORECASE,
+)
+
+# Lines this close to the top or bottom of a page can be running headers/footers
+_PAGE_EDGE_LINES = 2
+
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with tiktoken when installed, otherwise estimates ~4 characters per token"""
+    global _encoder
+    if tiktoken is not None:
+        if _encoder is None:
+            _encoder = tiktoken.get_encoding("o200k_base")
+        return len(_encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _is_page_number(line: str) -> bool:
+    match = _PAGE_NUMBER.match(line)
+    # "06/2019" is a date, not page 6 of 2019
+    return bool(match) and (match.group("page") is None or int(match.group("page")) <= int(match.group("pages")))
+
+
+def split_pages(text: str) -> List[List[str]]:
+    """
+    Splits normalized text into pages of non-empty lines. Pages end at form feeds and at
+    page-number footers, which are dropped; text with neither is a single page.
+    """
+    pages: List[List[str]] = [[]]
+    for raw in re.split(r"(\f)|\r\n|\r|\n", unicodedata.normalize("NFKC", text)):
+        if raw is None:
+            continue
+        if raw == "\f":
+            pages.append([])
+            continue
+        line = re.sub(r"[ \t\u00a0]+", " ", raw).strip(" \t•·▪●-*")
+        if _is_page_number(raw):
+            pages.append([])
+        elif line:
+            pages[-1].append(line)
+    return [page for page in pages if page]
+
+
+def normalize_lines(text: str) -> List[str]:
+    """
+    Normalizes unicode and whitespace, drops page-number footers and boilerplate, and removes
+    running headers/footers: a line at the same place near the top or bottom of several pages
+    is kept only where it first appears. Other repeats are content (a skill listed under both
+    Experience and Skills, two jobs with the same dates) and are left alone.
+    """
+    pages = split_pages(text)
+    # A running header or footer sits at the same offset from the top or bottom of each page
+    edges = [{(i, line) for i, line in enumerate(page[:_PAGE_EDGE_LINES])} |
+             {(-1 - i, line) for i, line in enumerate(reversed(page[-_PAGE_EDGE_LINES:]))} for page in pages]
+    counts = Counter(edge for page_edges in edges for edge in page_edges)
+    running = {edge for edge, count in counts.items() if count > 1 and not _HEADING.match(edge[1])}
+    seen = set()
+    kept = []
+    for page in pages:
+        for i, line in enumerate(page):
+            if _BOILERPLATE.match(line):
+                continue
+            if (i, line) in running or (i - len(page), line) in running:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+    return kept
+
+
+def split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """Groups lines under their section heading; lines before the first heading are the summary"""
+    sections: Dict[str, List[str]] = {name: [] for name in SECTION_PRIORITY}
+    current = "summary"
+    for line in lines:
+        match = _HEADING.match(line) or _INLINE_HEADING.match(line)
+        if match:
+            current = next(name for name in SECTION_HEADINGS if match.group(name))
+            rest = match.groupdict().get("rest")
+            if rest:
+                sections[current].append(rest.strip())
+            continue
+        sections[current].append(line)
+    return sections
+
+
+@dataclass
+class CompactedResume:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    kept_sections: List[str] = field(default_factory=list)
+    truncated_sections: List[str] = field(default_factory=list)
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"before": self.tokens_before, "after": self.tokens_after,
+                "truncated_sections": self.truncated_sections}
+
+
+def _fit_lines(lines: List[str], budget: int, counter: Callable[[str], int]) -> Tuple[List[str], int]:
+    kept, used = [], 0
+    for line in lines:
+        cost = counter(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return kept, used
+
+
+def compact_resume(resume_text: str, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                   counter: Callable[[str], int] = count_tokens) -> CompactedResume:
+    """
+    Normalizes, deduplicates and sections a resume, then packs sections into `token_budget`
+    tokens in SECTION_PRIORITY order. A section that does not fit is cut line by line.
+    """
+    tokens_before = counter(resume_text)
+    sections = split_sections(normalize_lines(resume_text))
+    remaining = token_budget
+    blocks, kept, truncated = [], [], []
+    for name in SECTION_PRIORITY:
+        lines = sections[name]
+        if not lines or remaining <= 0:
+            if lines:
+                truncated.append(name)
+            continue
+        heading = f"{name.upper()}:"
+        fitted, used = _fit_lines(lines, remaining - counter(heading) - 1, counter)
+        if not fitted:
+            truncated.append(name)
+            continue
+        if len(fitted) < len(lines):
+            truncated.append(name)
+        blocks.append("\n".join([heading] + fitted))
+        kept.append(name)
+        remaining -= used + counter(heading) + 1
+    text = "\n\n".join(blocks)
+    return CompactedResume(text=text, tokens_before=tokens_before, tokens_after=counter(text),
+                           kept_sections=kept, truncated_sections=truncated)
+
+
+class PromptCompactor:
+    """Callable compaction stage with a fixed budget and running token totals"""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, counter: Optional[Callable[[str], int]] = None):
+        self.token_budget = token_budget
+        self.counter = counter or count_tokens
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def __call__(self, resume_text: str) -> CompactedResume:
+        compacted = compact_resume(resume_text, self.token_budget, self.counter)
+        self.tokens_before += compacted.tokens_before
+        self.tokens_after += compacted.tokens_after
+        return compacted
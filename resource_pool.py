@@ -0,0 +1,148 @@
+import contextlib
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    import requests
+
+
+def fingerprint(secret: str) -> str:
+    """Short, non-reversible id for an API key so raw keys never appear in cache keys or stats"""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16] if secret else ""
+
+
+class ResourcePool:
+    """
+    Process-wide, thread-safe cache of expensive objects (agents, tools, HTTP clients).
+
+    `get(kind, key, factory)` builds a resource once per (kind, key) and hands the same
+    instance to every later caller; concurrent first callers for the same key wait on a
+    per-key lock instead of all building their own. That suits thread-safe objects such as
+    HTTP clients. Agents keep per-run state, so they are leased instead (`lease`, `leased`):
+    each caller gets an instance no other thread is using, and idle instances are kept for
+    the next caller, so no more are built than are ever in use at once. Build (cold) and
+    lookup (warm) latencies are recorded per kind.
+    """
+
+    def __init__(self, pool_maxsize: int = 16):
+        self.pool_maxsize = pool_maxsize
+        self._resources: Dict[Tuple[str, Hashable], Any] = {}
+        self._key_locks: Dict[Tuple[str, Hashable], threading.Lock] = defaultdict(threading.Lock)
+        self._idle: Dict[Tuple[str, Hashable], List[Any]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"cold": [], "warm": []})
+
+    def get(self, kind: str, key: Hashable, factory: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        cache_key = (kind, key)
+        resource = self._resources.get(cache_key)
+        if resource is None:
+            with self._lock:
+                key_lock = self._key_locks[cache_key]
+            with key_lock:
+                resource = self._resources.get(cache_key)
+                if resource is None:
+                    resource = factory()
+                    self._resources[cache_key] = resource
+                    self._record(kind, "cold", started)
+                    return resource
+        self._record(kind, "warm", started)
+        return resource
+
+    @contextlib.contextmanager
+    def lease(self, kind: str, key: Hashable, factory: Callable[[], Any]) -> Iterator[Any]:
+        """Lends an idle instance for (kind, key), building one if all are in use, and takes it back after"""
+        started = time.perf_counter()
+        cache_key = (kind, key)
+        with self._lock:
+            idle = self._idle[cache_key]
+            resource = idle.pop() if idle else None
+        if resource is None:
+            resource = factory()
+            self._record(kind, "cold", started)
+        else:
+            self._record(kind, "warm", started)
+        try:
+            yield resource
+        finally:
+            with self._lock:
+                self._idle[cache_key].append(resource)
+
+    def leased(self, kind: str, key: Hashable, factory: Callable[[], Any]) -> "LeasedResource":
+        """
+        A stand-in for an instance from `lease` that can be shared between threads: each method
+        call runs on a leased instance. Nothing is built until it is first used.
+        """
+        return LeasedResource(self, kind, key, factory)
+
+    def _record(self, kind: str, temperature: str, started: float) -> None:
+        samples = self._timings[kind][temperature]
+        samples.append(time.perf_counter() - started)
+        # Keep a bounded window of recent samples
+        if len(samples) > 1000:
+            del samples[:500]
+
+    def http_session(self, name: str = "default") -> "requests.Session":
+        """A keep-alive requests.Session with a connection pool sized for concurrent sessions"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        def build() -> requests.Session:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+        return self.get("http_session", name, build)
+
+    def httpx_client(self, name: str = "openai") -> Any:
+        """A shared httpx.Client for OpenAIChat, so LLM calls reuse TLS connections"""
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+        return self.get("httpx_client", name, lambda: httpx.Client(limits=limits, timeout=120.0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resources.clear()
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Build count and mean latency (ms) of cold builds versus warm lookups, per kind"""
+        report = {}
+        for kind, timings in self._timings.items():
+            report[kind] = {
+                "cold": len(timings["cold"]),
+                "warm": len(timings["warm"]),
+                "cold_ms": 1000 * sum(timings["cold"]) / len(timings["cold"]) if timings["cold"] else 0.0,
+                "warm_ms": 1000 * sum(timings["warm"]) / len(timings["warm"]) if timings["warm"] else 0.0,
+            }
+        return report
+
+
+class LeasedResource:
+    """
+    Shares a stateful resource between threads by leasing an instance from the pool for each
+    method call, e.g. one email agent handed to every outbox worker. Building it, and importing
+    what it needs, is deferred to its first real use.
+    """
+
+    def __init__(self, pool: ResourcePool, kind: str, key: Hashable, factory: Callable[[], Any]):
+        self._pool = pool
+        self._kind = kind
+        self._key = key
+        self._factory = factory
+
+    def __getattr__(self, name: str) -> Any:
+        with self._pool.lease(self._kind, self._key, self._factory) as resource:
+            value = getattr(resource, name)
+        if not callable(value):
+            return value
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self._pool.lease(self._kind, self._key, self._factory) as resource:
+                return getattr(resource, name)(*args, **kwargs)
+        return call
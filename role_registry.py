@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from prefilter import RoleIndex, SkillGroup, build_role_index
+
+DEFAULT_ROLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "roles")
+
+ROLE_FILE_EXTENSIONS = (".yaml", ".yml", ".json")
+
+# What the selection email says comes next, for roles whose file does not say
+DEFAULT_NEXT_STEPS = "a 60 minute technical interview"
+
+
+@dataclass(frozen=True)
+class CompiledRole:
+    """
+    A role ready to screen against: the requirement text shown to the analyzer and to
+    candidates, its skill groups with weights and synonyms, and the compiled pattern the
+    pre-filter and candidate pool match resumes with, plus what the candidate emails say
+    about it. `version` is a content hash of the role file, so any edit to it yields a new
+    version.
+    """
+
+    role: str
+    title: str
+    version: str
+    requirements: str
+    index: RoleIndex
+    # Overrides of the default model route (see model_routing); empty for the default
+    route: Dict[str, Any] = field(default_factory=dict)
+    source: str = ""
+    next_steps: str = DEFAULT_NEXT_STEPS
+
+    @property
+    def groups(self) -> List[SkillGroup]:
+        return self.index.groups
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "role": self.role,
+            "title": self.title,
+            "version": self.version,
+            "requirements": self.requirements,
+            "next_steps": self.next_steps,
+            "prefilter_threshold": self.index.threshold,
+            "skills": [{"label": group.label, "terms": group.terms, "weight": weight}
+                       for group, weight in zip(self.index.groups, self.index.weights)],
+        }
+
+
+def role_title(role: str, definition: Dict[str, Any]) -> str:
+    return str(definition.get("title") or role.replace("_", " ").title())
+
+
+def compile_role(role: str, definition: Dict[str, Any], source: str = "") -> CompiledRole:
+    """
+    Compiles a role definition:
+
+        title: Backend Engineer
+        requirements:            # one bullet each; "," separates skills, "/" alternatives
+          - Python/Java/Node.js
+          - Kubernetes, Docker, CI/CD
+        weights: {Kubernetes: 2}          # optional, per skill; 1.0 when unlisted
+        synonyms: {rest apis: [grpc]}     # optional, extra spellings on top of prefilter.SYNONYMS
+        route: {band: 0.15}               # optional, overrides of the default model route
+        next_steps: a 60 minute ...       # optional, the interview the selection email announces
+        prefilter_threshold: 0.4          # optional, the keyword score below which the pre-filter rejects
+    """
+    where = source or role
+    requirements = definition.get("requirements")
+    if not isinstance(requirements, list) or not requirements or not all(isinstance(r, str) for r in requirements):
+        raise ValueError(f"{where}: 'requirements' must be a non-empty list of strings")
+    weights = definition.get("weights") or {}
+    if not isinstance(weights, dict) or any(not isinstance(w, (int, float)) or w <= 0 for w in weights.values()):
+        raise ValueError(f"{where}: 'weights' must map skills to positive numbers")
+    synonyms = {term.lower(): [alias.lower() for alias in aliases]
+                for term, aliases in (definition.get("synonyms") or {}).items()}
+    route = definition.get("route") or {}
+    if not isinstance(route, dict):
+        raise ValueError(f"{where}: 'route' must be a mapping")
+    next_steps = definition.get("next_steps") or DEFAULT_NEXT_STEPS
+    if not isinstance(next_steps, str):
+        raise ValueError(f"{where}: 'next_steps' must be a string")
+    threshold = definition.get("prefilter_threshold")
+    if threshold is not None and (isinstance(threshold, bool) or not isinstance(threshold, (int, float))
+                                  or not 0 <= threshold <= 1):
+        raise ValueError(f"{where}: 'prefilter_threshold' must be a number between 0 and 1")
+    text = "Required Skills:\n" + "\n".join(f"- {line.strip()}" for line in requirements)
+    index = build_role_index(role, text, synonyms, weights, None if threshold is None else float(threshold))
+    unknown = {label.lower() for label in weights} - {group.label.lower() for group in index.groups}
+    if unknown:
+        raise ValueError(f"{where}: weights given for skills not in the requirements: {', '.join(sorted(unknown))}")
+    canonical = json.dumps(definition, sort_keys=True, ensure_ascii=False, default=str)
+    return CompiledRole(
+        role=role,
+        title=role_title(role, definition),
+        version=hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12],
+        requirements=text,
+        index=index,
+        route=dict(route),
+        source=source,
+        next_steps=next_steps.strip(),
+    )
+
+
+def load_definition(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            definition = json.load(f)
+        else:
+            # Imported on first use; a registry of JSON files never needs it
+            import yaml
+            definition = yaml.safe_load(f)
+    if not isinstance(definition, dict):
+        raise ValueError(f"{path}: a role file must hold a mapping")
+    return definition
+
+
+def read_title(role: str, path: str) -> Optional[str]:
+    """
+    The title in a role file without parsing all of it: YAML files are scanned for their
+    top-level `title:` line. None when the file has no such line to go by.
+    """
+    if path.endswith(".json"):
+        return role_title(role, load_definition(path))
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("title:"):
+                import yaml
+                try:
+                    header = yaml.safe_load(line)
+                except yaml.YAMLError:
+                    return None
+                return role_title(role, header) if isinstance(header, dict) else None
+    return None
+
+
+class RoleRegistry:
+    """
+    Roles defined by one YAML or JSON file each in `directory`, named after the file.
+
+    Listing roles only reads the directory. A role is parsed and compiled the first time it
+    is asked for and kept until its file changes (checked by modification time and size on
+    every lookup), so a registry of hundreds of roles starts instantly and edited roles are
+    picked up without a restart, under a new version. Thread-safe.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ROLES_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._paths: Dict[str, str] = {}
+        self._listed_at: Optional[Tuple[int, int]] = None
+        self._compiled: Dict[str, Tuple[Tuple[int, int], CompiledRole]] = {}
+        self._titles: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+    def _list(self) -> Dict[str, str]:
+        """Role name -> file path, re-read only when the directory itself changes"""
+        stat = os.stat(self.directory)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._listed_at:
+            paths = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    name, extension = os.path.splitext(entry.name)
+                    if extension in ROLE_FILE_EXTENSIONS and entry.is_file() and not name.startswith("."):
+                        paths[name] = entry.path
+            self._paths, self._listed_at = paths, stamp
+        return self._paths
+
+    def roles(self) -> List[str]:
+        with self._lock:
+            return sorted(self._list())
+
+    def __contains__(self, role: object) -> bool:
+        with self._lock:
+            return role in self._list()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._list())
+
+    def get(self, role: str) -> CompiledRole:
+        """The compiled role; KeyError for a role with no file"""
+        with self._lock:
+            path = self._list().get(role)
+            if path is None:
+                raise KeyError(role)
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = self._compiled.get(role)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        compiled = compile_role(role, load_definition(path), source=path)
+        with self._lock:
+            self._compiled[role] = (stamp, compiled)
+        return compiled
+
+    def title(self, role: str) -> str:
+        """
+        The role's title, read from the head of its file without compiling the role (see
+        read_title), so listing hundreds of roles by title stays cheap; KeyError for a role
+        with no file
+        """
+        with self._lock:
+            path = self._list().get(role)
+            if path is None:
+                raise KeyError(role)
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            compiled = self._compiled.get(role)
+            if compiled is not None and compiled[0] == stamp:
+                return compiled[1].title
+            titled = self._titles.get(role)
+            if titled is not None and titled[0] == stamp:
+                return titled[1]
+        title = read_title(role, path)
+        if title is None:
+            return self.get(role).title
+        with self._lock:
+            self._titles[role] = (stamp, title)
+        return title
+
+    def version(self, role: str) -> str:
+        return self.get(role).version
+
+    def compiled(self) -> List[CompiledRole]:
+        """Every role, compiling those not yet loaded"""
+        return [self.get(role) for role in self.roles()]
+
+
+# Shared by every entry point; ROLES_DIR points it at another set of role files
+role_registry = RoleRegistry(os.getenv("ROLES_DIR", DEFAULT_ROLES_DIR))
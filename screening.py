@@ -0,0 +1,298 @@
+import textwrap
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from analysis_schema import build_retry_prompt, decode_analysis, decode_role_fits, parse_stats
+from role_registry import role_registry
+from tracing import tracer
+
+# Model the resume analyzer agent runs on
+ANALYZER_MODEL_ID = "gpt-4.1-nano"
+
+# Bump whenever build_analysis_prompt (or build_multi_role_prompt) changes so cached analyses are invalidated
+PROMPT_VERSION = "1"
+MULTI_ROLE_PROMPT_VERSION = "1"
+
+# Follow-up calls asking for fields still missing after local JSON repair
+MAX_PARSE_RETRIES = 1
+
+
+# Shared by the single- and multi-role prompts, indented to sit inside them
+EVALUATION_CRITERIA = textwrap.indent("""\
+Evaluation Criteria:
+1. Match at least 70% of required skills.
+2. Consider both theoritical knowledge and pratical knowledge.
+3. Value project experience and real-world applications.
+4. Consider transferrable skills from similar technologies.
+5. Look for evidence for continuous learning and adaptability.
+Important: Return ONLY the JSON object without any formatting or backticks.
+""", " " * 12)
+
+
+def build_analysis_prompt(resume_text: str, role: str) -> str:
+    """Builds the analyzer prompt for a resume against the requirements of a role"""
+    return f"""Please analyze this resume against the following requirements and provide your response in valid JSON format:
+            Role Requirements:
+            {role_registry.get(role).requirements}
+            Resume Text:
+            {resume_text}
+
+            Your response must be a valid JSON object, just like this:
+            {{
+                "selected": true,
+                "feedback": "The resume shows strong alignment with the AI/ML Engineer role, particularly in TensorFlow and Python.",
+                "matching_skills": ["Python", "TensorFlow", "Scikit-learn"],
+                "missing_skills": ["Kubernetes", "Docker"],
+                "experience_level": "mid"
+            }}
+
+{EVALUATION_CRITERIA}            """
+
+
+def build_multi_role_prompt(resume_text: str, roles: List[str]) -> str:
+    """Builds one analyzer prompt that judges a resume against the requirements of every role in `roles`"""
+    sections = "\n".join(f'            Role "{role}" ({role_registry.get(role).title}):\n'
+                          + textwrap.indent(role_registry.get(role).requirements, " " * 12) for role in roles)
+    return f"""Please analyze this resume against each of the following roles and provide your response in valid JSON format:
+            Roles:
+{sections}
+            Resume Text:
+            {resume_text}
+
+            Your response must be a valid JSON object with one entry in "roles" for every role above, just like this:
+            {{
+                "roles": [
+                    {{
+                        "role": "ai_ml_engineer",
+                        "selected": true,
+                        "feedback": "Strong alignment with the AI/ML Engineer role, particularly in TensorFlow and Python.",
+                        "matching_skills": ["Python", "TensorFlow"],
+                        "missing_skills": ["MLOps"]
+                    }}
+                ],
+                "experience_level": "mid"
+            }}
+
+{EVALUATION_CRITERIA}            """
+
+
+def get_assistant_message(resp: Any) -> Optional[str]:
+    """Returns the content of the first assistant message in an agent run response"""
+    return next((msg.content for msg in resp.messages if msg.role == "assistant"), None)
+
+
+def usage_tokens(resp: Any) -> Optional[Tuple[int, int]]:
+    """(input, output) tokens the model reported for a run, if the agent exposes them"""
+    metrics = getattr(resp, "metrics", None)
+    if metrics is None:
+        return None
+    if isinstance(metrics, dict):
+        # Older agno releases keep one entry per model call
+        inputs, outputs = metrics.get("input_tokens"), metrics.get("output_tokens")
+        total = lambda v: sum(v) if isinstance(v, list) else v
+        return (int(total(inputs) or 0), int(total(outputs) or 0)) if inputs is not None else None
+    inputs = getattr(metrics, "input_tokens", None)
+    return (int(inputs), int(getattr(metrics, "output_tokens", 0) or 0)) if inputs is not None else None
+
+
+def get_model_id(analyzer: Any) -> str:
+    """Returns the model id an analyzer agent runs on, or 'unknown' for stand-ins without one"""
+    return str(getattr(getattr(analyzer, "model", None), "id", "unknown"))
+
+
+@dataclass
+class PreparedResume:
+    """A resume after the local steps that precede any model call (see prepare_resume)"""
+    text: str
+    # What the local steps add to the result: "prefilter" and "prompt_tokens"
+    annotations: Dict[str, Any] = field(default_factory=dict)
+    # Set when the prefilter rejected the resume, so no model needs to be asked
+    rejection: Optional[Dict[str, Any]] = None
+
+
+def prepare_resume(resume_text: str, role: str, prefilter: Any = None, compactor: Any = None) -> PreparedResume:
+    """Runs the prefilter and the prompt compactor on a resume, once however many models it is sent to"""
+    annotations: Dict[str, Any] = {}
+    if prefilter is not None:
+        from prefilter import rejection_from_prefilter
+        with tracer.span("prefilter") as span:
+            local = prefilter.score(resume_text, role)
+            span.set(score=round(local.score, 3), passed=local.passed)
+        if not local.passed:
+            rejection = dict(rejection_from_prefilter(local, role), requirements_version=role_registry.version(role))
+            return PreparedResume(resume_text, rejection=rejection)
+        annotations["prefilter"] = local.to_dict()
+    if compactor is not None:
+        with tracer.span("prompt_compaction") as span:
+            compacted = compactor(resume_text)
+            span.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+        resume_text = compacted.text
+        annotations["prompt_tokens"] = compacted.to_dict()
+    return PreparedResume(resume_text, annotations)
+
+
+def analyze_prepared(prepared: PreparedResume, role: str, analyzer: Any, cache: Any = None,
+                     throttle: Optional[Callable[[], None]] = None,
+                     max_retries: int = MAX_PARSE_RETRIES) -> Tuple[Dict[str, Any], bool]:
+    """The model half of run_analysis; returns the result and whether it came from the cache"""
+    version = role_registry.version(role)
+    key = None
+    if cache is not None:
+        from analysis_cache import analysis_cache_key
+        with tracer.span("cache_lookup") as span:
+            key = analysis_cache_key(prepared.text, role, get_model_id(analyzer))
+            cached = cache.get(key)
+            span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached, True
+    if throttle is not None:
+        with tracer.span("throttle"):
+            throttle()
+    with tracer.span("prompt_build") as span:
+        prompt = build_analysis_prompt(prepared.text, role)
+        span.set(prompt_chars=len(prompt))
+    with tracer.span("llm_call", model=get_model_id(analyzer)) as span:
+        resp = analyzer.run(prompt)
+        assistant_message = get_assistant_message(resp)
+        if span.recording:
+            tokens = usage_tokens(resp)
+            if tokens is None:
+                from prompt_compaction import count_tokens
+                tokens = (count_tokens(prompt), count_tokens(assistant_message or ""))
+            span.set(input_tokens=tokens[0], output_tokens=tokens[1])
+    with tracer.span("json_decode") as span:
+        decoded = decode_analysis(assistant_message)
+        span.set(repaired=decoded.repaired, invalid=len(decoded.invalid))
+    retries = 0
+    while decoded.invalid and retries < max_retries:
+        retries += 1
+        with tracer.span("llm_retry", fields=",".join(decoded.invalid)):
+            answer = get_assistant_message(analyzer.run(build_retry_prompt(prompt, decoded.invalid)))
+            decoded = decoded.merge(decode_analysis(answer))
+    parse_stats.record(decoded, retries)
+    if decoded.invalid:
+        raise ValueError(f"Invalid Response Format: missing or invalid {', '.join(decoded.invalid)}")
+    result = decoded.result
+    result["requirements_version"] = version
+    result.update(prepared.annotations)
+    if cache is not None:
+        cache.put(key, result)
+    return result, False
+
+
+def run_analysis(resume_text: str, role: str, analyzer: Any, cache: Any = None,
+                 throttle: Optional[Callable[[], None]] = None, prefilter: Any = None,
+                 compactor: Any = None, max_retries: int = MAX_PARSE_RETRIES) -> Dict[str, Any]:
+    """
+    Runs the analyzer on a resume and returns the decoded JSON result.
+    Has no Streamlit dependency so it can be called from worker threads and scripts.
+    When an AnalysisCache is given, repeat screenings are answered from it without calling the model.
+    `throttle` is called right before the model is, so cache hits are never rate limited.
+    With a Prefilter, resumes scoring below its threshold are rejected locally without a model call,
+    and the local skill match is attached to the result under "prefilter".
+    A PromptCompactor shrinks the resume to its token budget before it is cached or sent;
+    the before/after token counts are attached under "prompt_tokens".
+    The answer is validated against ResumeAnalysis; broken JSON is repaired locally, and fields
+    still missing or invalid are asked for again, at most `max_retries` times, before ValueError.
+    Every result carries the "requirements_version" of the role it was screened against.
+    """
+    with tracer.span("analysis", role=role):
+        prepared = prepare_resume(resume_text, role, prefilter, compactor)
+        if prepared.rejection is not None:
+            return prepared.rejection
+        return analyze_prepared(prepared, role, analyzer, cache=cache, throttle=throttle, max_retries=max_retries)[0]
+
+
+def rank_role_fits(fits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Selected roles first, then by the share of required skills matched"""
+    return sorted(fits, key=lambda fit: (not fit["selected"], -fit["match"]))
+
+
+def run_multi_role_analysis(resume_text: str, analyzer: Any, roles: Optional[List[str]] = None, cache: Any = None,
+                            throttle: Optional[Callable[[], None]] = None, prefilter: Any = None,
+                            compactor: Any = None, max_retries: int = MAX_PARSE_RETRIES) -> Dict[str, Any]:
+    """
+    Judges a resume against several roles (every registered role by default) in a single
+    analyzer call, instead of one full-resume prompt per role. Returns the roles ranked by fit
+    under "roles", each with its verdict, "match" (share of its required skills matched),
+    matching/missing skills and "requirements_version", and the selected ones under "fitting_roles".
+
+    The analyzer must answer in MULTI_ROLE_RESPONSE_FORMAT. With a Prefilter, roles the resume
+    scores below its threshold for are rejected locally and left out of the prompt; if none is
+    left, the model is not called. Roles missing from the answer are asked for again, at most
+    `max_retries` times, before ValueError. Cache, throttle and compactor work as in run_analysis.
+    """
+    roles = list(roles) if roles is not None else role_registry.roles()
+    with tracer.span("multi_role_analysis", roles=len(roles)):
+        versions = {role: role_registry.version(role) for role in roles}
+        fits: Dict[str, Dict[str, Any]] = {}
+        if prefilter is not None:
+            from prefilter import rejection_from_prefilter
+            with tracer.span("prefilter") as span:
+                for role in roles:
+                    local = prefilter.score(resume_text, role)
+                    if not local.passed:
+                        fits[role] = dict(rejection_from_prefilter(local, role), role=role)
+                span.set(rejected=len(fits))
+        pending = [role for role in roles if role not in fits]
+        result: Dict[str, Any] = {"experience_level": ""}
+        compacted = None
+        if pending and compactor is not None:
+            with tracer.span("prompt_compaction") as span:
+                compacted = compactor(resume_text)
+                span.set(tokens_before=compacted.tokens_before, tokens_after=compacted.tokens_after)
+            resume_text = compacted.text
+        answered: Dict[str, Dict[str, Any]] = {}
+        key = cached = None
+        if pending and cache is not None:
+            from analysis_cache import multi_role_cache_key
+            with tracer.span("cache_lookup") as span:
+                key = multi_role_cache_key(resume_text, pending, get_model_id(analyzer))
+                cached = cache.get(key)
+                span.set(cache_hit=cached is not None)
+        if cached is not None:
+            answered, result["experience_level"] = cached["fits"], cached["experience_level"]
+        elif pending:
+            if throttle is not None:
+                with tracer.span("throttle"):
+                    throttle()
+            asked, retries = pending, 0
+            while True:
+                with tracer.span("prompt_build") as span:
+                    prompt = build_multi_role_prompt(resume_text, asked)
+                    span.set(prompt_chars=len(prompt), roles=len(asked))
+                with tracer.span("llm_call" if not retries else "llm_retry", model=get_model_id(analyzer)) as span:
+                    resp = analyzer.run(prompt)
+                    assistant_message = get_assistant_message(resp)
+                    if span.recording:
+                        tokens = usage_tokens(resp)
+                        if tokens is None:
+                            from prompt_compaction import count_tokens
+                            tokens = (count_tokens(prompt), count_tokens(assistant_message or ""))
+                        span.set(input_tokens=tokens[0], output_tokens=tokens[1])
+                with tracer.span("json_decode") as span:
+                    decoded, experience_level, repaired = decode_role_fits(assistant_message)
+                    answered.update({role: decoded[role] for role in asked if role in decoded})
+                    result["experience_level"] = result["experience_level"] or experience_level
+                    span.set(repaired=repaired, missing=len(asked) - len(decoded.keys() & set(asked)))
+                asked = [role for role in pending if role not in answered]
+                if not asked or retries >= max_retries:
+                    break
+                retries += 1
+            if asked:
+                raise ValueError(f"Invalid Response Format: no verdict for {', '.join(asked)}")
+            if cache is not None:
+                cache.put(key, {"fits": answered, "experience_level": result["experience_level"]})
+        fits.update(answered)
+        ranked = []
+        for role in roles:
+            fit = fits[role]
+            total = len(fit["matching_skills"]) + len(fit["missing_skills"])
+            ranked.append(dict(fit, role=role, title=role_registry.get(role).title,
+                               match=len(fit["matching_skills"]) / total if total else 0.0,
+                               requirements_version=versions[role]))
+        result["roles"] = rank_role_fits(ranked)
+        result["fitting_roles"] = [fit["role"] for fit in result["roles"] if fit["selected"]]
+        if compacted is not None:
+            result["prompt_tokens"] = compacted.to_dict()
+        return result
@@ -0,0 +1,337 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, List, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from analysis_schema import parse_stats
+from model_routing import routing_stats
+from pdf_extraction import extraction_stats
+from pipeline import PipelineSettings, ScreeningPipeline, build_pipeline
+from role_registry import role_registry
+from tracing import tracer
+
+# Resumes analyzed at the same time; the rest wait in the queue
+MAX_CONCURRENCY = int(os.getenv("SCREENING_MAX_CONCURRENCY", "4"))
+# Jobs accepted but not finished before new submissions get a 429
+MAX_PENDING = int(os.getenv("SCREENING_MAX_PENDING", "100"))
+# Finished jobs kept around for the status endpoint
+MAX_FINISHED_JOBS = 10_000
+DEFAULT_JOBS_PATH = os.path.join(".cache", "jobs.sqlite3")
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    role: str
+    status: str = "queued"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # The server process running the job
+    pid: int = field(default_factory=os.getpid)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "role": self.role,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # Without signal 0 there is no cheap check; such jobs are left as they are
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobTable:
+    """
+    The service's jobs in SQLite, so that with several server processes (`cli.py serve
+    --workers N`) any of them answers for a job another one accepted. Only the most recent
+    `max_finished` finished jobs are kept. Jobs left queued or running by a process that no
+    longer exists are marked failed when the table is opened. Thread-safe.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH, max_finished: int = MAX_FINISHED_JOBS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    pid INTEGER NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)")
+            orphaned = [pid for (pid,) in self._conn.execute(
+                "SELECT DISTINCT pid FROM jobs WHERE status IN ('queued', 'running')"
+            ) if not _process_alive(pid)]
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = 'The server process running this job exited', "
+                "finished_at = ? WHERE pid = ? AND status IN ('queued', 'running')",
+                [(time.time(), pid) for pid in orphaned]
+            )
+
+    def save(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, name, role, status, result, error, created_at, started_at, "
+                "finished_at, pid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.name, job.role, job.status, json.dumps(job.result) if job.result is not None else None,
+                 job.error, job.created_at, job.started_at, job.finished_at, job.pid)
+            )
+            if job.finished_at is not None:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE finished_at IS NOT NULL "
+                    "ORDER BY finished_at DESC LIMIT -1 OFFSET ?)", (self.max_finished,)
+                )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, name, role, status, result, error, created_at, started_at, finished_at, pid "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(id=row[0], name=row[1], role=row[2], status=row[3], result=json.loads(row[4]) if row[4] else None,
+                   error=row[5], created_at=row[6], started_at=row[7], finished_at=row[8], pid=row[9])
+
+
+class JobQueue:
+    """
+    Job queue of one service process, recording its jobs in a shared JobTable. At most
+    `max_concurrency` jobs run the pipeline at once (each in a worker thread); at most
+    `max_pending` may be queued or running, beyond which `submit` refuses new work so callers
+    back off instead of piling up memory. Both limits are per process.
+    """
+
+    def __init__(self, pipeline: ScreeningPipeline, max_concurrency: int = MAX_CONCURRENCY,
+                 max_pending: int = MAX_PENDING, jobs: Optional[JobTable] = None):
+        self.pipeline = pipeline
+        self.max_pending = max_pending
+        self.jobs = jobs if jobs is not None else JobTable()
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, name: str, role: str, pdf_bytes: bytes, email: Optional[str], notify: bool,
+               schedule: bool) -> Job:
+        job = self._new_job(name, role)
+        return self._start(job, self._run(job, pdf_bytes, email, notify, schedule))
+
+    def submit_match(self, name: str, pdf_bytes: bytes, roles: Optional[List[str]]) -> Job:
+        """Queues a multi-role match (see ScreeningPipeline.match_roles); the job's role is "*" for all roles"""
+        job = self._new_job(name, ",".join(roles) if roles else "*")
+        return self._start(job, self._run_match(job, pdf_bytes, roles))
+
+    def _new_job(self, name: str, role: str) -> Job:
+        if self.pending >= self.max_pending:
+            raise HTTPException(status_code=429, detail="Too many screenings in progress, retry later")
+        job = Job(id=uuid.uuid4().hex, name=name, role=role)
+        self.jobs.save(job)
+        return job
+
+    def _start(self, job: Job, work: Awaitable[None]) -> Job:
+        task = asyncio.create_task(work)
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def _started(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        await run_in_threadpool(self.jobs.save, job)
+
+    async def _finished(self, job: Job, result: Dict[str, Any], error: Optional[str]) -> None:
+        job.result = result
+        job.error = error
+        job.status = "failed" if error else "done"
+        job.finished_at = time.time()
+        await run_in_threadpool(self.jobs.save, job)
+
+    async def _run(self, job: Job, pdf_bytes: bytes, email: Optional[str], notify: bool, schedule: bool) -> None:
+        async with self._semaphore:
+            await self._started(job)
+            result = await run_in_threadpool(
+                self.pipeline.process, job.name, job.role, pdf_bytes=pdf_bytes, email=email,
+                notify=notify, schedule=schedule
+            )
+        await self._finished(job, result.to_dict(), result.error)
+
+    async def _run_match(self, job: Job, pdf_bytes: bytes, roles: Optional[List[str]]) -> None:
+        async with self._semaphore:
+            await self._started(job)
+            result = await run_in_threadpool(self.pipeline.match_roles, job.name, pdf_bytes=pdf_bytes, roles=roles)
+        await self._finished(job, result, result["error"])
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+def create_app(pipeline: Optional[ScreeningPipeline] = None, max_concurrency: int = MAX_CONCURRENCY,
+               max_pending: int = MAX_PENDING, jobs_path: Optional[str] = None) -> FastAPI:
+    """
+    Builds the HTTP service. Without an explicit pipeline one is built from the environment
+    (see PipelineSettings.from_env) when the server starts. Jobs are kept at `jobs_path`,
+    or SERVICE_JOBS_PATH; every server process sharing the file sees every job.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        jobs = JobTable(jobs_path or os.getenv("SERVICE_JOBS_PATH", DEFAULT_JOBS_PATH))
+        app.state.queue = JobQueue(pipeline or build_pipeline(PipelineSettings.from_env()),
+                                   max_concurrency=max_concurrency, max_pending=max_pending, jobs=jobs)
+        workflow = app.state.queue.pipeline.workflow
+        if workflow is not None:
+            # Retries failed steps and picks up applications a previous process left unfinished
+            workflow.start()
+        yield
+        await app.state.queue.shutdown()
+        if workflow is not None:
+            workflow.stop()
+        if app.state.queue.pipeline.outbox is not None:
+            app.state.queue.pipeline.outbox.stop()
+
+    app = FastAPI(title="AI Recruitment Agent", lifespan=lifespan)
+
+    def check_role(role: str) -> None:
+        if role not in role_registry:
+            raise HTTPException(status_code=422, detail=f"Unknown role: {role}")
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        queue: JobQueue = app.state.queue
+        return {"status": "ok", "pending": queue.pending}
+
+    @app.get("/roles")
+    async def roles() -> Dict[str, str]:
+        """Role name -> title; GET /roles/{role} has the requirements and their version"""
+        return {role: role_registry.title(role) for role in role_registry.roles()}
+
+    @app.get("/roles/{role}")
+    async def get_role(role: str) -> Dict[str, Any]:
+        check_role(role)
+        return role_registry.get(role).to_dict()
+
+    @app.post("/screenings", status_code=202)
+    async def create_screening(role: str = Form(...), resume: UploadFile = File(...),
+                               email: Optional[str] = Form(None), notify: bool = Form(True),
+                               schedule: bool = Form(True)) -> Dict[str, Any]:
+        """Queues one resume; poll GET /jobs/{job_id} for the result"""
+        check_role(role)
+        job = app.state.queue.submit(resume.filename or "resume.pdf", role, await resume.read(), email,
+                                     notify, schedule)
+        return job.to_dict()
+
+    @app.post("/screenings/batch", status_code=202)
+    async def create_batch(role: str = Form(...), resumes: List[UploadFile] = File(...),
+                           notify: bool = Form(True), schedule: bool = Form(True)) -> Dict[str, Any]:
+        """Queues several resumes; candidate emails are read from the resumes themselves"""
+        check_role(role)
+        queue: JobQueue = app.state.queue
+        if queue.pending + len(resumes) > queue.max_pending:
+            raise HTTPException(status_code=429, detail="Too many screenings in progress, retry later")
+        jobs = [queue.submit(upload.filename or "resume.pdf", role, await upload.read(), None, notify, schedule)
+                for upload in resumes]
+        return {"jobs": [job.to_dict() for job in jobs]}
+
+    @app.post("/role-matches", status_code=202)
+    async def create_role_match(resume: UploadFile = File(...), roles: Optional[str] = Form(None)) -> Dict[str, Any]:
+        """
+        Queues one resume to be judged against every role (or the comma-separated `roles`) in a
+        single analyzer call; the job's result ranks the roles it fits. Nobody is emailed.
+        """
+        selected = [role.strip() for role in roles.split(",") if role.strip()] if roles else None
+        for role in selected or []:
+            check_role(role)
+        job = app.state.queue.submit_match(resume.filename or "resume.pdf", await resume.read(), selected)
+        return job.to_dict()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> str:
+        """Per-stage Prometheus metrics; empty unless TRACING_ENABLED is set"""
+        return tracer.metrics.render_prometheus()
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        """
+        Which extraction tier each resume needed, how many were near-duplicates of earlier submissions,
+        how analyzer answers were decoded and how screenings were routed
+        """
+        store = app.state.queue.pipeline.store
+        return {"extraction": extraction_stats.stats(), "duplicates": store.duplicate_stats() if store else None,
+                "parsing": parse_stats.stats(), "routing": routing_stats.stats()}
+
+    @app.get("/traces/{trace_id}")
+    async def get_trace(trace_id: str) -> Dict[str, Any]:
+        spans = tracer.get_trace(trace_id)
+        if not spans:
+            raise HTTPException(status_code=404, detail="Unknown or expired trace")
+        return {"trace_id": trace_id, "breakdown": tracer.breakdown(trace_id),
+                "spans": [span.to_dict() for span in spans]}
+
+    @app.get("/applications/{application_id}")
+    async def get_application(application_id: int) -> Dict[str, Any]:
+        """Where a selected candidate's confirmation email and interview booking stand"""
+        workflow = app.state.queue.pipeline.workflow
+        status = workflow.status(application_id) if workflow is not None else None
+        if status is None:
+            raise HTTPException(status_code=404, detail="Unknown application")
+        return status
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        job = await run_in_threadpool(app.state.queue.jobs.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return job.to_dict()
+
+    return app
+
+
+# `uvicorn service:app` builds the pipeline from environment variables on startup
+app = create_app()
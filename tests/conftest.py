@@ -0,0 +1,39 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# The modules live flat at the repository root, as `streamlit run`, cli.py and the benchmarks expect
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from role_registry import DEFAULT_ROLES_DIR, role_registry  # noqa: E402
+
+
+@pytest.fixture
+def roles_dir(tmp_path, monkeypatch):
+    """A private copy of roles/ behind the shared registry, so a test can edit role files"""
+    directory = tmp_path / "roles"
+    shutil.copytree(DEFAULT_ROLES_DIR, directory)
+    monkeypatch.setattr(role_registry, "directory", str(directory))
+    monkeypatch.setattr(role_registry, "_listed_at", None)
+    monkeypatch.setattr(role_registry, "_compiled", {})
+    monkeypatch.setattr(role_registry, "_titles", {})
+    return directory
+
+
+RESUME = """Jane Doe
+jane.doe@example.com
+SKILLS
+Python, Django, REST APIs, PostgreSQL database design and management, system architecture,
+AWS cloud services, Kubernetes, Docker and CI/CD pipelines.
+EXPERIENCE
+Led the migration of a monolith to microservices on Kubernetes.
+"""
+
+
+@pytest.fixture
+def resume_text():
+    return RESUME
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from analysis_cache import AnalysisCache, analysis_cache_key
+from batch_screening import StubAnalyzer
+from role_registry import role_registry
+from screening import run_analysis
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(str(tmp_path / "cache.sqlite3"))
+
+
+def test_repeat_screening_is_answered_from_the_cache(cache, resume_text, roles_dir):
+    analyzer = StubAnalyzer()
+    first = run_analysis(resume_text, "backend_engineer", analyzer, cache=cache)
+    # Whitespace differences normalize to the same resume
+    second = run_analysis("  " + resume_text.replace("\n", "\n\n"), "backend_engineer", analyzer, cache=cache)
+    assert analyzer.calls == 1
+    assert second == first
+    assert first["requirements_version"] == role_registry.version("backend_engineer")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_covers_role_model_and_resume(resume_text, roles_dir):
+    key = analysis_cache_key(resume_text, "backend_engineer", "gpt-4.1-nano")
+    assert key == analysis_cache_key(resume_text + "\n", "backend_engineer", "gpt-4.1-nano")
+    assert key != analysis_cache_key(resume_text, "frontend_engineer", "gpt-4.1-nano")
+    assert key != analysis_cache_key(resume_text, "backend_engineer", "gpt-4.1-mini")
+    assert key != analysis_cache_key(resume_text + " Go", "backend_engineer", "gpt-4.1-nano")
+
+
+def test_editing_the_role_invalidates_cached_analyses(cache, resume_text, roles_dir):
+    analyzer = StubAnalyzer()
+    before = run_analysis(resume_text, "backend_engineer", analyzer, cache=cache)
+    # Make sure the edit changes the file's mtime even on coarse-grained filesystems
+    time.sleep(0.01)
+    with open(roles_dir / "backend_engineer.yaml", "a", encoding="utf-8") as f:
+        f.write("  - Terraform\n")
+    after = run_analysis(resume_text, "backend_engineer", analyzer, cache=cache)
+    assert analyzer.calls == 2
+    assert after["requirements_version"] != before["requirements_version"]
+    assert "Terraform" in after["missing_skills"]
+    run_analysis(resume_text, "backend_engineer", analyzer, cache=cache)
+    assert analyzer.calls == 2
+
+
+def test_other_roles_are_not_served_from_another_roles_entry(cache, resume_text, roles_dir):
+    analyzer = StubAnalyzer()
+    run_analysis(resume_text, "backend_engineer", analyzer, cache=cache)
+    run_analysis(resume_text, "frontend_engineer", analyzer, cache=cache)
+    assert analyzer.calls == 2
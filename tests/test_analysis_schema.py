@@ -0,0 +1,71 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from analysis_schema import decode_analysis, repair_json
+from screening import run_analysis
+
+ANSWER = {"selected": True, "feedback": "Strong backend profile.", "matching_skills": ["Python"],
+          "missing_skills": ["Kubernetes"], "experience_level": "senior"}
+TRUNCATED = '{"selected": true, "feedback": "ok", "matching_skills": ["Python"], "missing_skills": ["Kube'
+
+
+class ScriptedAnalyzer:
+    """Answers each run with the next scripted reply, recording the prompts it was given"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def run(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(messages=[SimpleNamespace(role="assistant", content=self.answers.pop(0))])
+
+
+@pytest.mark.parametrize("text", [
+    f"```json\n{json.dumps(ANSWER)}\n```",
+    f"Here is my assessment:\n{json.dumps(ANSWER)}\nHope this helps.",
+    json.dumps(ANSWER)[:-1] + ",}",
+])
+def test_repair_strips_wrapping_and_trailing_commas(text):
+    assert json.loads(repair_json(text)) == ANSWER
+
+
+def test_repair_cuts_a_truncated_answer_back_to_its_last_complete_member():
+    assert json.loads(repair_json(TRUNCATED)) == {"selected": True, "feedback": "ok", "matching_skills": ["Python"]}
+    # An unterminated string is dropped, not closed
+    assert json.loads(repair_json('{"selected": false, "feedback": "Lacks')) == {"selected": False}
+    with pytest.raises(ValueError):
+        repair_json("The candidate looks good")
+
+
+def test_clean_answer_defaults_its_optional_fields():
+    decoded = decode_analysis(json.dumps({"selected": "yes", "feedback": "ok"}))
+    assert (decoded.invalid, decoded.repaired) == ([], False)
+    assert decoded.result["selected"] is True and decoded.result["missing_skills"] == []
+
+
+def test_repaired_answer_reports_the_fields_it_lost():
+    decoded = decode_analysis(TRUNCATED)
+    assert decoded.repaired and decoded.result is None
+    assert decoded.invalid == ["experience_level", "missing_skills"]
+    # A repaired answer that lost nothing is usable as is
+    assert decode_analysis(f"```json\n{json.dumps(ANSWER)}\n```").result == ANSWER
+
+
+def test_merge_only_takes_the_invalid_fields_from_a_retry():
+    first = decode_analysis(TRUNCATED)
+    retry = decode_analysis(json.dumps({"selected": False, "missing_skills": ["Kubernetes"], "experience_level": "mid"}))
+    merged = first.merge(retry)
+    assert merged.invalid == []
+    assert merged.result == {**ANSWER, "feedback": "ok", "experience_level": "mid"}
+    # Still incomplete after a retry that sent only some of the fields
+    assert first.merge(decode_analysis('{"experience_level": "mid"}')).invalid == ["missing_skills"]
+
+
+def test_truncated_answer_is_completed_by_a_targeted_retry(roles_dir, resume_text):
+    analyzer = ScriptedAnalyzer(TRUNCATED, json.dumps({"missing_skills": ["Kubernetes"], "experience_level": "senior"}))
+    result = run_analysis(resume_text, "backend_engineer", analyzer)
+    assert result["missing_skills"] == ["Kubernetes"] and result["experience_level"] == "senior"
+    assert '"experience_level", "missing_skills"' in analyzer.prompts[1]
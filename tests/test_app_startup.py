@@ -0,0 +1,17 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use (a PDF upload, the first interview booked), never by importing the app
+DEFERRED = ["PyPDF2", "pypdfium2", "phi.tools.zoom", "pytz", "requests", "agno", "phi.agent"]
+
+
+def test_importing_the_app_leaves_heavy_modules_unloaded():
+    # A fresh interpreter, since other tests load these modules into this one
+    script = f"import json, sys, app; print(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))"
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,55 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from application_workflow import ApplicationWorkflow, WorkflowStep
+
+
+@pytest.fixture
+def open_workflow(tmp_path):
+    """Opens workflows on one store whose steps count every application they run for"""
+    runs = Counter()
+    lock = threading.Lock()
+    opened = []
+
+    def step(name):
+        def run(applications):
+            with lock:
+                runs.update((name, application.id) for application in applications)
+            return [name] * len(applications)
+        return run
+
+    def open_workflow(**kwargs):
+        steps = [WorkflowStep("confirm", step("confirm")), WorkflowStep("book", step("book"), after=("confirm",))]
+        workflow = ApplicationWorkflow(steps, path=str(tmp_path / "applications.sqlite3"), **kwargs)
+        opened.append(workflow)
+        return workflow
+
+    open_workflow.runs = runs
+    yield open_workflow
+    for workflow in opened:
+        workflow.stop()
+
+
+def test_reclaimed_run_finishes_each_step_once(open_workflow):
+    crashed = open_workflow()
+    ids = [crashed.submit(f"candidate{i}@example.com", "backend_engineer")[0] for i in range(3)]
+    # The process claimed the applications and died before running any step
+    assert len(crashed._claim()) == 3
+    assert crashed.counts() == {"running": 3}
+    restarted = open_workflow()
+    assert restarted.drain(workers=2, reclaim=True) == {"done": 3}
+    assert open_workflow.runs == Counter({(name, i): 1 for name in ("confirm", "book") for i in ids})
+
+
+def test_workflows_sharing_a_store_run_each_application_once(open_workflow):
+    first, second = open_workflow(batch_size=4), open_workflow(batch_size=4)
+    ids = [first.submit(f"candidate{i}@example.com", "backend_engineer")[0] for i in range(40)]
+    threads = [threading.Thread(target=workflow.drain, kwargs={"workers": 3}) for workflow in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert first.counts() == {"done": 40}
+    assert open_workflow.runs == Counter({(name, i): 1 for name in ("confirm", "book") for i in ids})
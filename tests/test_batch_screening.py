@@ -0,0 +1,104 @@
+import io
+import threading
+import time
+import zipfile
+
+from batch_screening import BatchScreener, RateLimiter, StubAnalyzer, collect_from_folder, collect_from_zip
+
+
+class ConcurrencyProbe:
+    """Counts how many analyzer calls are in flight at once across every worker's analyzer"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.analyzers = 0
+
+    def analyzer(self):
+        with self.lock:
+            self.analyzers += 1
+        stub = StubAnalyzer(latency=0.05)
+        probe = self
+
+        class Probed:
+            def run(self, prompt):
+                with probe.lock:
+                    probe.running += 1
+                    probe.peak = max(probe.peak, probe.running)
+                try:
+                    return stub.run(prompt)
+                finally:
+                    with probe.lock:
+                        probe.running -= 1
+
+        return Probed()
+
+
+def sources(resume_text, count):
+    # Distinct resumes, so none is answered from another's analysis
+    return [(f"resume{i}.pdf", f"{resume_text}\nCandidate number {i}".encode()) for i in range(count)]
+
+
+def test_concurrency_is_bounded_by_max_workers(resume_text, roles_dir):
+    probe = ConcurrencyProbe()
+    screener = BatchScreener(probe.analyzer, "backend_engineer", max_workers=3, extract=bytes.decode)
+    results = list(screener.screen(sources(resume_text, 12)))
+    assert len(results) == 12 and not any(result.error for result in results)
+    assert probe.peak == 3
+    # One analyzer per worker thread, reused for its later resumes
+    assert probe.analyzers == 3
+    assert (screener.stats.completed, screener.stats.selected) == (12, 12)
+
+
+def test_rate_limiter_spaces_one_workers_calls():
+    limiter = RateLimiter(requests_per_minute=600)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.wait()
+    assert 0.3 <= time.monotonic() - started < 0.6
+    unlimited = RateLimiter(0)
+    started = time.monotonic()
+    for _ in range(100):
+        unlimited.wait()
+    assert time.monotonic() - started < 0.05
+
+
+def test_batch_is_paced_by_requests_per_minute(resume_text, roles_dir):
+    screener = BatchScreener(StubAnalyzer, "backend_engineer", max_workers=1, requests_per_minute=600,
+                             extract=bytes.decode)
+    started = time.monotonic()
+    list(screener.screen(sources(resume_text, 4)))
+    assert time.monotonic() - started >= 0.3
+
+
+def test_one_failing_resume_does_not_abort_the_batch(resume_text, roles_dir):
+    def extract(data):
+        if data == b"broken":
+            raise ValueError("not a PDF")
+        return data.decode()
+
+    batch = sources(resume_text, 3) + [("broken.pdf", b"broken"), ("scanned.pdf", b"  ")]
+    screener = BatchScreener(StubAnalyzer, "backend_engineer", max_workers=2, extract=extract)
+    results = {result.name: result for result in screener.screen(batch)}
+    assert "not a PDF" in results["broken.pdf"].error
+    assert "No text could be extracted" in results["scanned.pdf"].error
+    assert all(results[f"resume{i}.pdf"].selected for i in range(3))
+    assert (screener.stats.completed, screener.stats.failed) == (5, 2)
+
+
+def test_zip_collection_keeps_only_pdfs(tmp_path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("resumes/", "")
+        archive.writestr("resumes/jane.pdf", b"%PDF jane")
+        archive.writestr("resumes/JOHN.PDF", b"%PDF john")
+        archive.writestr("resumes/notes.txt", b"not a resume")
+        archive.writestr("__MACOSX/resumes/._jane.pdf", b"resource fork")
+    assert collect_from_zip(io.BytesIO(buffer.getvalue())) == [("jane.pdf", b"%PDF jane"), ("JOHN.PDF", b"%PDF john")]
+    # A folder yields its PDFs and the PDFs of the zips in it, skipping everything else
+    (tmp_path / "batch.zip").write_bytes(buffer.getvalue())
+    (tmp_path / "amy.pdf").write_bytes(b"%PDF amy")
+    (tmp_path / "cover_letter.docx").write_bytes(b"docx")
+    (tmp_path / "archive").mkdir()
+    assert [name for name, _ in collect_from_folder(str(tmp_path))] == ["amy.pdf", "jane.pdf", "JOHN.PDF"]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from batch_screening import StubAnalyzer
+from candidate_store import CandidateStore
+from pipeline import ScreeningPipeline
+from role_registry import role_registry
+
+EXPERIENCE = """Senior Backend Engineer, Acme Payments, 2019 - 2024
+Designed the ledger service handling four million transactions a day with PostgreSQL and Python.
+Split the billing monolith into twelve services deployed on Kubernetes with Docker and Helm.
+Introduced contract tests between services and cut integration incidents by half.
+Ran the on-call rotation and wrote the runbooks for the payments platform.
+Backend Engineer, Globex Logistics, 2016 - 2019
+Built REST APIs for route planning used by three hundred warehouses across the country.
+Moved nightly batch jobs to AWS Lambda and S3, saving forty percent of the compute bill.
+Set up CI/CD pipelines in GitHub Actions with staged rollouts and automatic rollback.
+Mentored four junior engineers and ran the weekly architecture review.
+"""
+
+
+@pytest.fixture
+def store(tmp_path, roles_dir):
+    return CandidateStore(str(tmp_path / "candidates.sqlite3"))
+
+
+@pytest.fixture
+def analyzer():
+    return StubAnalyzer()
+
+
+@pytest.fixture
+def pipeline(store, analyzer):
+    return ScreeningPipeline(lambda: analyzer, store=store, routes={})
+
+
+def test_lightly_edited_resubmission_reuses_the_earlier_analysis(pipeline, analyzer, store, resume_text):
+    original = resume_text + EXPERIENCE
+    first = pipeline.process("jane.pdf", "backend_engineer", resume_text=original, notify=False, schedule=False)
+    assert first.error is None and first.duplicate_of is None
+    # The same resume sent again with one word changed
+    edited = original.replace("four junior engineers", "five junior engineers")
+    again = pipeline.process("jane_v2.pdf", "backend_engineer", resume_text=edited, notify=False, schedule=False)
+    assert analyzer.calls == 1
+    assert again.duplicate_of["reused"] and again.duplicate_of["email"] == "jane.doe@example.com"
+    assert again.analysis["feedback"] == first.analysis["feedback"]
+    assert len(store) == 2 and store.duplicate_stats()["reused"] == 1
+
+
+def test_edit_that_adds_a_skill_is_linked_but_analyzed_again(pipeline, analyzer, store, resume_text):
+    original = resume_text + EXPERIENCE
+    pipeline.process("jane.pdf", "backend_engineer", resume_text=original, notify=False, schedule=False)
+    edited = original.replace("ran the weekly architecture review", "ran the weekly Angular review")
+    again = pipeline.process("jane_v2.pdf", "backend_engineer", resume_text=edited, notify=False, schedule=False)
+    assert analyzer.calls == 2
+    assert again.duplicate_of is not None and not again.duplicate_of["reused"]
+
+
+def test_distinct_resumes_are_not_merged(pipeline, analyzer, store, resume_text):
+    other = """Priya Nair
+priya.nair@example.com
+SKILLS
+React, TypeScript, HTML5, CSS3, Redux and Jest.
+EXPERIENCE
+Frontend Engineer at Initech, building the customer dashboard and its design system.
+Shipped a responsive checkout flow that raised mobile conversion by a fifth.
+"""
+    first = pipeline.process("jane.pdf", "backend_engineer", resume_text=resume_text + EXPERIENCE,
+                             notify=False, schedule=False)
+    second = pipeline.process("priya.pdf", "backend_engineer", resume_text=other, notify=False, schedule=False)
+    assert second.duplicate_of is None
+    assert analyzer.calls == 2
+    assert first.selected and not second.selected
+    assert len(store) == 2
+
+
+def test_rank_follows_the_skill_matrix(store):
+    people = {
+        "strong": "Python, REST APIs, PostgreSQL, system design, AWS, Kubernetes, Docker, CI/CD",
+        "partial": "Java, REST APIs, Docker",
+        "frontend": "React, TypeScript, CSS3",
+        "kube_only": "Kubernetes and Helm charts",
+    }
+    ids = {name: store.add(text, name=name, email=f"{name}@example.com") for name, text in people.items()}
+    ranked = store.rank("backend_engineer", top_k=10)
+    assert [candidate.name for candidate in ranked] == ["strong", "partial", "kube_only", "frontend"]
+    # Each score is the role's weighted group score over that candidate's row of the matrix
+    index = role_registry.get("backend_engineer").index
+    expected = store._group_scores(index.groups, index.weights)
+    rows = {int(candidate_id): row for row, candidate_id in enumerate(store._ids[:store._size])}
+    for candidate in ranked:
+        assert candidate.score == pytest.approx(float(expected[rows[candidate.candidate_id]]))
+    assert np.all(np.diff([candidate.score for candidate in ranked]) <= 0)
+    # must_have keeps only candidates mentioning the skill (or an alias, "k8s", "helm")
+    assert [c.candidate_id for c in store.rank("backend_engineer", ["Kubernetes"])] == [ids["strong"], ids["kube_only"]]
+    assert [c.name for c in store.rank("backend_engineer", top_k=2)] == ["strong", "partial"]
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeSmtpServer
+from email_outbox import EmailOutbox, SmtpSender
+
+
+@pytest.fixture
+def smtp():
+    server = FakeSmtpServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def open_outbox(tmp_path, smtp):
+    """Opens the outbox at one path, as the app does again after every restart"""
+    opened = []
+
+    def open_outbox(**kwargs):
+        sender = SmtpSender("hr@acme.test", "passkey", host="127.0.0.1", port=smtp.port, use_ssl=False)
+        outbox = EmailOutbox(drafter=lambda message: (f"Your {message.role} application", "Hello"),
+                             sender=sender, path=str(tmp_path / "outbox.sqlite3"), **kwargs)
+        opened.append(outbox)
+        return outbox
+
+    yield open_outbox
+    for outbox in opened:
+        outbox.stop()
+
+
+def test_one_email_per_candidate_role_and_decision(open_outbox, smtp):
+    outbox = open_outbox()
+    first_id, created = outbox.enqueue("jane@example.com", "backend_engineer", "rejected")
+    assert created
+    assert outbox.enqueue("Jane@Example.com ", "backend_engineer", "rejected") == (first_id, False)
+    outbox.drain()
+    # After a restart the sent message still counts, and other decisions or roles are separate
+    restarted = open_outbox()
+    assert restarted.enqueue("jane@example.com", "backend_engineer", "rejected") == (first_id, False)
+    assert restarted.enqueue("jane@example.com", "backend_engineer", "selected")[1]
+    assert restarted.enqueue("jane@example.com", "frontend_engineer", "rejected")[1]
+    restarted.drain()
+    assert len(smtp.messages) == 3
+    assert restarted.counts() == {"sent": 3}
+
+
+def test_transient_smtp_failure_is_retried_after_a_backoff(open_outbox, smtp):
+    smtp.fail_next = 1
+    outbox = open_outbox(base_delay=0.2)
+    message_id, _ = outbox.enqueue("jane@example.com", "backend_engineer", "selected")
+    before = time.time()
+    outbox.drain()
+    status = outbox.status(message_id)
+    assert (status["status"], status["attempts"], smtp.refused) == ("pending", 1, 1)
+    assert "451" in status["last_error"]
+    # Not due yet: the backoff (0.2 s plus up to half again of jitter) has not passed
+    outbox.drain()
+    assert smtp.messages == []
+    time.sleep(max(0.0, before + 0.35 - time.time()))
+    outbox.drain()
+    assert outbox.status(message_id)["status"] == "sent"
+    assert outbox.status(message_id)["attempts"] == 2
+    assert len(smtp.messages) == 1
+
+
+def test_batch_is_sent_over_one_connection(open_outbox, smtp):
+    outbox = open_outbox()
+    for i in range(5):
+        outbox.enqueue(f"candidate{i}@example.com", "backend_engineer", "rejected")
+    outbox.drain()
+    assert len(smtp.messages) == 5
+    assert (smtp.connections, outbox.sender.connections_opened) == (1, 1)
+
+
+def test_delivery_interrupted_by_a_crash_is_not_resent(open_outbox, smtp):
+    crashed = open_outbox()
+    message_id, _ = crashed.enqueue("jane@example.com", "backend_engineer", "selected")
+    # A worker claimed the message and began the SMTP send, then the process died
+    crashed._claim()
+    crashed._update("UPDATE outbox SET send_started_at = ? WHERE id = ?", (time.time(), message_id))
+    restarted = open_outbox(lease_seconds=0)
+    restarted.drain()
+    assert restarted.status(message_id)["status"] == "failed"
+    assert restarted.enqueue("jane@example.com", "backend_engineer", "selected") == (message_id, False)
+    assert smtp.messages == []
+
+
+def test_outboxes_sharing_a_file_send_each_message_once(open_outbox, smtp):
+    first, second = open_outbox(), open_outbox()
+    recipients = [f"candidate{i}@example.com" for i in range(60)]
+    for to_email in recipients:
+        first.enqueue(to_email, "backend_engineer", "rejected")
+    # Both instances drain the same queue at once, as two server processes would
+    threads = [threading.Thread(target=outbox.drain) for outbox in (first, second) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sent_to = [line.split(":", 1)[1].strip() for message in smtp.messages
+               for line in message.splitlines() if line.lower().startswith("to:")]
+    assert sorted(sent_to) == sorted(recipients)
+    assert first.counts() == {"sent": len(recipients)}
@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from interview_scheduler import IST, InterviewScheduler
+
+MONDAY = IST.localize(datetime(2030, 1, 7, 9))
+
+
+class FailingZoom:
+    def schedule_meeting(self, **kwargs):
+        return json.dumps({"error": "rate limited"})
+
+
+def test_schedulers_sharing_a_database_do_not_double_book(tmp_path):
+    path = str(tmp_path / "interviews.sqlite3")
+    # Both open before either books, as two server processes would
+    first, second = InterviewScheduler(path=path), InterviewScheduler(path=path)
+    a = first.schedule(["a@example.com", "b@example.com"], "backend_engineer", earliest=MONDAY)
+    b = second.schedule(["c@example.com"], "backend_engineer", earliest=MONDAY)
+    starts = [slot.start for slot in a + b]
+    assert len(set(starts)) == 3
+    assert b[0].start == MONDAY.replace(hour=11)
+    # Either process finds the other's booking for the same candidate
+    assert first.schedule(["c@example.com"], "backend_engineer", earliest=MONDAY)[0].start == b[0].start
+
+
+def test_slot_of_a_failed_meeting_is_released(tmp_path):
+    path = str(tmp_path / "interviews.sqlite3")
+    failed = InterviewScheduler(FailingZoom(), path=path).schedule(["a@example.com"], "backend_engineer",
+                                                                  earliest=MONDAY)[0]
+    assert failed.error and "rate limited" in failed.error
+    retried = InterviewScheduler(path=path).schedule(["a@example.com"], "backend_engineer", earliest=MONDAY)[0]
+    assert (retried.error, retried.start) == (None, MONDAY)
+
+
+@pytest.mark.parametrize("count", [1, 9])
+def test_batch_fills_business_hours_in_order(tmp_path, count):
+    slots = InterviewScheduler(path=str(tmp_path / "interviews.sqlite3")).schedule(
+        [f"{i}@example.com" for i in range(count)], "backend_engineer", earliest=MONDAY)
+    assert [slot.start.hour for slot in slots][:8] == list(range(9, 9 + min(count, 8)))
+    if count > 8:
+        assert slots[8].start == MONDAY.replace(day=8)
+
+
+def test_reservation_left_by_a_crashed_process_expires(tmp_path):
+    path = str(tmp_path / "interviews.sqlite3")
+    # The process reserved a slot and died before creating the meeting
+    crashed = InterviewScheduler(path=path)
+    crashed._reserve(["a@example.com"], "backend_engineer", MONDAY)
+    # While the reservation is live, the slot and the candidate stay taken
+    live = InterviewScheduler(path=path)
+    assert live.existing("a@example.com", "backend_engineer").meeting_id is None
+    assert live.schedule(["b@example.com"], "backend_engineer", earliest=MONDAY)[0].start == MONDAY.replace(hour=10)
+    restarted = InterviewScheduler(path=path, reservation_seconds=0)
+    assert restarted.existing("a@example.com", "backend_engineer") is None
+    slots = restarted.schedule(["a@example.com", "c@example.com"], "backend_engineer", earliest=MONDAY)
+    assert [slot.start.hour for slot in slots] == [9, 11]
+    assert InterviewScheduler(path=path).existing("a@example.com", "backend_engineer").start == MONDAY
@@ -0,0 +1,80 @@
+import pytest
+
+from agents import build_resume_analyzer
+from analysis_cache import AnalysisCache
+from benchmarks.fakes import FakeOpenAIServer
+from model_routing import ModelRoute, RoutingStats, run_routed_analysis
+from prefilter import Prefilter
+from prompt_compaction import PromptCompactor
+
+CHEAP, STRONG = "gpt-4.1-nano", "gpt-4.1-mini"
+ROUTE = ModelRoute((CHEAP, STRONG), threshold=0.7, band=0.1)
+# Backend skills a resume may list; the role's CI/CD requirement is met by any of them
+SKILLS = ["Python", "REST APIs", "Database Design", "System Architecture", "GCP", "Kubernetes", "Docker"]
+
+
+def resumes():
+    return [f"Candidate {k}\nSkills: {', '.join(SKILLS[:k])}\n" for k in range(len(SKILLS) + 1)]
+
+
+def skill_match(result):
+    matching = len(result["matching_skills"])
+    return matching / (matching + len(result["missing_skills"]))
+
+
+@pytest.fixture
+def screen(tmp_path, roles_dir):
+    servers = []
+
+    def screen(texts, cheap_noise=0.0, cache=None, **kwargs):
+        llm = FakeOpenAIServer(latency=0.0, jitter=0.0, model_noise={CHEAP: cheap_noise}).start()
+        servers.append(llm)
+        analyzers = {model: build_resume_analyzer("fake-key", base_url=llm.base_url, model_id=model)
+                     for model in ROUTE.models}
+        stats = RoutingStats()
+        results = [run_routed_analysis(text, "backend_engineer", analyzers.get, ROUTE, stats=stats, cache=cache,
+                                       **kwargs) for text in texts]
+        return results, stats.stats(), llm
+
+    yield screen
+    for llm in servers:
+        llm.stop()
+
+
+def test_only_close_calls_are_escalated(screen):
+    results, stats, llm = screen(resumes())
+    escalated = [len(result["routing"]["models"]) == 2 for result in results]
+    assert escalated == [abs(skill_match(result) - 0.7) <= 0.1 for result in results]
+    assert 0 < sum(escalated) < len(results)
+    # Both models answer alike without noise
+    assert (stats["escalated"], stats["agreement_rate"]) == (sum(escalated), 1.0)
+    assert llm.calls_by_model == {CHEAP: len(results), STRONG: sum(escalated)}
+
+
+def test_contradicted_verdicts_are_escalated_and_count_as_disagreements(screen):
+    # The cheap model flips every verdict within 0.2 of the threshold; the strong one never does
+    results, stats, _ = screen(resumes(), cheap_noise=1.0)
+    for result in results:
+        close = abs(skill_match(result) - 0.7) <= 0.2 + 1e-9
+        assert (len(result["routing"]["models"]) == 2) == close
+        if close:
+            assert result["routing"]["verdicts"][0] != result["routing"]["verdicts"][-1]
+    assert stats["agreement_rate"] == 0.0
+    assert stats["escalation_rate"] == sum(len(r["routing"]["models"]) == 2 for r in results) / len(results)
+
+
+def test_local_stages_run_once_and_cache_hits_are_not_model_calls(screen, tmp_path):
+    texts = resumes()
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    prefilter, compactor = Prefilter(threshold=0.0), PromptCompactor(token_budget=10_000)
+    first, stats, llm = screen(texts, cache=cache, prefilter=prefilter, compactor=compactor)
+    escalations = sum(len(result["routing"]["models"]) == 2 for result in first)
+    assert (prefilter.screened, prefilter.passed) == (len(texts), len(texts))
+    assert compactor.tokens_before == sum(result["prompt_tokens"]["before"] for result in first)
+    assert stats["models"][CHEAP]["calls"] == llm.calls_by_model[CHEAP] == len(texts)
+    assert stats["models"][STRONG]["calls"] == llm.calls_by_model[STRONG] == escalations
+
+    again, stats, llm = screen(texts, cache=cache, prefilter=prefilter, compactor=compactor)
+    assert [result["routing"] for result in again] == [result["routing"] for result in first]
+    assert llm.calls_by_model == {} and stats["models"] == {}
+    assert prefilter.screened == 2 * len(texts)
@@ -0,0 +1,40 @@
+import threading
+import time
+
+import pytest
+
+import pdf_extraction
+from benchmarks.fixtures import make_resume_pdf
+from pdf_extraction import ExtractionStats, TieredExtractor
+
+
+@pytest.fixture
+def extractor():
+    extractor = TieredExtractor(max_workers=2, timeout=0.5, ocr=False, stats=ExtractionStats())
+    yield extractor
+    extractor.close()
+
+
+def test_short_document_is_read_in_full(extractor):
+    text = extractor.extract(make_resume_pdf(seed=3, pages=2))
+    assert "SKILLS" in text.upper()
+    assert extractor.stats.stats()["documents_by_tier"] == {"text": 1}
+
+
+def test_slow_text_layer_of_a_short_document_times_out(extractor, monkeypatch):
+    release = threading.Event()
+
+    def stuck(data, max_pages, max_bytes):
+        release.wait(5)
+        return iter(["never returned in time"])
+
+    monkeypatch.setattr(pdf_extraction, "iter_page_text", stuck)
+    started = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError):
+            extractor.extract(make_resume_pdf(seed=3, pages=1))
+    finally:
+        release.set()
+    # The caller gets its answer within the document budget, not when the parse gives up
+    assert time.monotonic() - started < 1.5
+    assert extractor.stats.stats()["timeouts"] == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from pipeline import PipelineResult, ScreeningPipeline, build_workflow, contact_key
+
+
+class RecordingOutbox:
+    """Stands in for EmailOutbox: records what would be queued, idempotent per candidate key"""
+
+    def __init__(self):
+        self.sent = []
+        self.keys = set()
+
+    def enqueue(self, to_email, role, decision, context=None, candidate=None):
+        key = ((candidate or to_email).lower(), role, decision)
+        created = key not in self.keys
+        self.keys.add(key)
+        if created:
+            self.sent.append((to_email, role, decision))
+        return len(self.sent), created
+
+
+def duplicate(email, reused):
+    return {"selected": True, "feedback": "", "duplicate": {"candidate_id": 1, "email": email, "similarity": 0.85,
+                                                            "reused": reused}}
+
+
+def test_estimated_duplicate_keeps_its_own_address():
+    assert contact_key("new@example.com", duplicate("old@example.com", reused=False)) == "new@example.com"
+
+
+def test_reused_or_same_address_duplicate_shares_the_earlier_key():
+    assert contact_key("new@example.com", duplicate("old@example.com", reused=True)) == "old@example.com"
+    assert contact_key("Old@Example.com", duplicate("old@example.com", reused=False)) == "old@example.com"
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    outbox = RecordingOutbox()
+    workflow = build_workflow(outbox, None, path=str(tmp_path / "applications.sqlite3"))
+    return ScreeningPipeline(lambda: None, outbox=outbox, workflow=workflow)
+
+
+def test_selection_goes_to_the_current_address(pipeline):
+    first = PipelineResult(name="a.pdf", role="backend_engineer", email="old@example.com", selected=True,
+                           analysis={"selected": True, "feedback": ""})
+    # Similar resume, different person: linked, but mailed and applied for in their own right
+    second = PipelineResult(name="b.pdf", role="backend_engineer", email="new@example.com", selected=True,
+                            analysis=duplicate("old@example.com", reused=False))
+    pipeline.apply([first])
+    pipeline.apply([second], schedule=False)
+    assert pipeline.outbox.sent == [("old@example.com", "backend_engineer", "selected"),
+                                    ("new@example.com", "backend_engineer", "selected")]
+    assert second.application_id != first.application_id
+    assert pipeline.workflow.status(second.application_id)["deliver_to"] == "new@example.com"
+
+
+def test_reused_resubmission_is_not_mailed_twice(pipeline):
+    first = PipelineResult(name="a.pdf", role="backend_engineer", email="old@example.com", selected=True,
+                           analysis={"selected": True, "feedback": ""})
+    again = PipelineResult(name="b.pdf", role="backend_engineer", email="new@example.com", selected=True,
+                           analysis=duplicate("old@example.com", reused=True))
+    pipeline.apply([first])
+    pipeline.apply([again])
+    assert pipeline.outbox.sent == [("old@example.com", "backend_engineer", "selected")]
+    assert again.application_id == first.application_id
+
+
+def test_rejection_of_an_estimated_duplicate_is_sent(pipeline):
+    pipeline.outbox.enqueue("old@example.com", "backend_engineer", "rejected")
+    analysis = dict(duplicate("old@example.com", reused=False), selected=False, feedback="Needs Go")
+    assert pipeline.notify("new@example.com", "backend_engineer", analysis) is True
+    assert pipeline.outbox.sent[-1] == ("new@example.com", "backend_engineer", "rejected")
@@ -0,0 +1,56 @@
+import pytest
+
+from batch_screening import StubAnalyzer
+from prefilter import Prefilter
+from role_registry import role_registry
+from screening import run_analysis
+
+UNRELATED = """Sam Lee
+Barista at Blue Bottle Coffee. Latte art, inventory and opening shifts.
+"""
+
+# Three of the eight backend skill groups, mentioned once each: a score of exactly 0.25
+BORDERLINE = """Alex Kim
+Wrote Python scripts and packaged them with Docker for a small Kubernetes cluster.
+"""
+
+
+def test_resume_meeting_no_requirement_is_rejected_without_an_analyzer_call(roles_dir):
+    analyzer, prefilter = StubAnalyzer(), Prefilter(threshold=0.25)
+    result = run_analysis(UNRELATED, "backend_engineer", analyzer, prefilter=prefilter)
+    assert analyzer.calls == 0
+    assert result["selected"] is False
+    assert result["prefilter"]["score"] == 0.0 and not result["prefilter"]["passed"]
+    assert "REST APIs" in result["missing_skills"]
+    assert result["requirements_version"] == role_registry.version("backend_engineer")
+    assert prefilter.llm_calls_saved == 1
+
+
+def test_borderline_resume_goes_to_the_analyzer(roles_dir):
+    analyzer, prefilter = StubAnalyzer(), Prefilter(threshold=0.25)
+    assert prefilter.score(BORDERLINE, "backend_engineer").score == pytest.approx(0.25)
+    result = run_analysis(BORDERLINE, "backend_engineer", analyzer, prefilter=prefilter)
+    assert analyzer.calls == 1
+    assert result["prefilter"]["passed"]
+    assert prefilter.llm_calls_saved == 0
+
+
+def test_threshold_comes_from_the_role_file(roles_dir):
+    with open(roles_dir / "backend_engineer.yaml", "a", encoding="utf-8") as f:
+        f.write("prefilter_threshold: 0.5\n")
+    prefilter = Prefilter(threshold=0.25)
+    assert role_registry.get("backend_engineer").to_dict()["prefilter_threshold"] == 0.5
+    assert not prefilter.score(BORDERLINE, "backend_engineer").passed
+    # Roles that do not set one keep the pre-filter's own threshold
+    assert prefilter.score("Built a React and TypeScript app with HTML5 and CSS3.", "frontend_engineer").passed
+    analyzer = StubAnalyzer()
+    assert run_analysis(BORDERLINE, "backend_engineer", analyzer, prefilter=prefilter)["selected"] is False
+    assert analyzer.calls == 0
+
+
+@pytest.mark.parametrize("value", ["high", 1.5, True])
+def test_invalid_role_threshold_is_reported(roles_dir, value):
+    with open(roles_dir / "backend_engineer.yaml", "a", encoding="utf-8") as f:
+        f.write(f"prefilter_threshold: {value}\n")
+    with pytest.raises(ValueError, match="prefilter_threshold"):
+        role_registry.get("backend_engineer")
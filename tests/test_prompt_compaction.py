@@ -0,0 +1,44 @@
+from prompt_compaction import compact_resume, normalize_lines, split_sections
+
+TWO_PAGES = """Jane Doe | jane.doe@example.com
+EXPERIENCE
+Backend Engineer, Acme
+2019
+Built billing services in Python and Go.
+Page 1 of 2
+Jane Doe | jane.doe@example.com
+Data Engineer, Initech
+2016
+Maintained ETL jobs in Python.
+SKILLS
+Python
+Go
+Page 2 of 2
+"""
+
+
+def test_page_numbers_and_running_headers_are_dropped():
+    lines = normalize_lines(TWO_PAGES)
+    assert not any(line.startswith("Page") for line in lines)
+    assert lines.count("Jane Doe | jane.doe@example.com") == 1
+    assert lines[0] == "Jane Doe | jane.doe@example.com"
+
+
+def test_year_lines_are_kept():
+    lines = normalize_lines(TWO_PAGES)
+    assert "2019" in lines and "2016" in lines
+    # A month/year is a date, not a "N/M" page number
+    assert normalize_lines("Backend Engineer\n06/2019\n2/3\nShipped") == ["Backend Engineer", "06/2019", "Shipped"]
+
+
+def test_skill_repeated_in_another_section_stays_in_skills():
+    resume = "EXPERIENCE\nPython\nPostgreSQL\nSKILLS\nPython\nDocker\n"
+    sections = split_sections(normalize_lines(resume))
+    assert sections["experience"] == ["Python", "PostgreSQL"]
+    assert sections["skills"] == ["Python", "Docker"]
+    assert "Python" in compact_resume(TWO_PAGES).text.split("SKILLS:")[1]
+
+
+def test_same_dates_on_two_jobs_are_kept():
+    resume = "EXPERIENCE\nAcme\n2019 - 2021\nGlobex\n2019 - 2021\nInitech\n2019 - 2021\n"
+    assert normalize_lines(resume).count("2019 - 2021") == 3
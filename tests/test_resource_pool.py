@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from resource_pool import ResourcePool
+
+
+class StatefulAgent:
+    """Like an agno Agent, keeps the current run on the instance, so it must not run two at once"""
+
+    def __init__(self):
+        self.model = SimpleNamespace(id="gpt-4.1-nano")
+        self.run_prompt = None
+        self.overlaps = 0
+
+    def run(self, prompt):
+        if self.run_prompt is not None:
+            self.overlaps += 1
+        self.run_prompt = prompt
+        time.sleep(0.01)
+        answer, self.run_prompt = self.run_prompt, None
+        return answer
+
+
+def in_threads(count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_first_callers_share_one_build():
+    pool, built = ResourcePool(), []
+
+    def build():
+        time.sleep(0.02)
+        built.append(object())
+        return built[-1]
+
+    resources = in_threads(8, lambda i: pool.get("http_session", "zoom", build))
+    assert len(built) == 1 and all(resource is built[0] for resource in resources)
+    assert pool.stats()["http_session"]["cold"] == 1
+
+
+def test_leases_are_exclusive_and_reused():
+    pool = ResourcePool()
+    with pool.lease("agent", "k", object) as first:
+        with pool.lease("agent", "k", object) as second:
+            assert first is not second
+    # Idle instances are handed out again instead of building more
+    with pool.lease("agent", "k", object) as third:
+        assert third in (first, second)
+    with pool.lease("agent", "other", object) as other:
+        assert other not in (first, second)
+    assert pool.stats()["agent"]["cold"] == 3
+
+
+def test_leased_agent_never_runs_two_prompts_at_once():
+    pool, agents = ResourcePool(), []
+
+    def build():
+        agents.append(StatefulAgent())
+        return agents[-1]
+
+    agent = pool.leased("email_agent", "k", build)
+    assert agents == []
+    answers = in_threads(6, lambda i: agent.run(f"prompt {i}"))
+    assert answers == [f"prompt {i}" for i in range(6)]
+    assert sum(a.overlaps for a in agents) == 0
+    assert 1 <= len(agents) <= 6
+    # Later calls, and plain attribute reads, reuse the idle agents
+    built = len(agents)
+    assert agent.run("again") == "again" and agent.model.id == "gpt-4.1-nano"
+    assert len(agents) == built
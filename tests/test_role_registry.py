@@ -0,0 +1,47 @@
+import json
+
+from candidate_store import CandidateStore
+from email_templates import EmailTemplates
+from role_registry import role_registry
+
+
+def test_titles_are_read_without_compiling_roles(roles_dir):
+    titles = {role: role_registry.title(role) for role in role_registry.roles()}
+    assert titles == {"ai_ml_engineer": "AI/ML Engineer", "backend_engineer": "Backend Engineer",
+                      "frontend_engineer": "Frontend Engineer"}
+    assert role_registry._compiled == {}
+    # Files without a title line, and JSON files, still get one
+    (roles_dir / "data_engineer.yaml").write_text("requirements:\n  - SQL, Spark\n")
+    (roles_dir / "sre.json").write_text(json.dumps({"title": "Site Reliability Engineer", "requirements": ["Linux"]}))
+    assert role_registry.title("data_engineer") == "Data Engineer"
+    assert role_registry.title("sre") == "Site Reliability Engineer"
+
+
+def test_edited_title_is_picked_up(roles_dir):
+    assert role_registry.title("backend_engineer") == "Backend Engineer"
+    path = roles_dir / "backend_engineer.yaml"
+    path.write_text(path.read_text().replace("title: Backend Engineer", "title: 'Platform Engineer'"))
+    assert role_registry.title("backend_engineer") == "Platform Engineer"
+    assert role_registry.get("backend_engineer").title == "Platform Engineer"
+
+
+def test_emails_take_title_and_next_steps_from_the_role_file(roles_dir):
+    templates = EmailTemplates("Acme")
+    subject, body = templates.render("backend_engineer", "selected")
+    assert subject == "Your application for the Backend Engineer position at Acme"
+    assert "the next step is a 60 minute technical interview on API and system design." in body
+    path = roles_dir / "backend_engineer.yaml"
+    path.write_text(path.read_text().replace("on API and system design", "with the platform team"))
+    assert "the next step is a 60 minute technical interview with the platform team." in \
+        templates.render("backend_engineer", "selected")[1]
+    # A role without a file gets generic wording
+    assert "the next step is a 60 minute technical interview." in templates.render("data_engineer", "selected")[1]
+
+
+def test_candidate_store_builds_its_vocabulary_on_first_use(tmp_path, roles_dir, monkeypatch, resume_text):
+    compiled = []
+    monkeypatch.setattr(role_registry, "compiled", lambda: compiled.append(1) or [])
+    store = CandidateStore(str(tmp_path / "candidates.sqlite3"))
+    assert compiled == []
+    store.add(resume_text, name="Jane Doe", email="jane.doe@example.com")
+    assert compiled == [1]
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from analysis_schema import decode_role_fits
+from batch_screening import StubAnalyzer
+from prefilter import Prefilter
+from role_registry import role_registry
+from screening import build_multi_role_prompt, run_multi_role_analysis
+
+ROLES = ["ai_ml_engineer", "backend_engineer", "frontend_engineer"]
+
+
+def fit(role, selected=False):
+    return {"role": role, "selected": selected, "feedback": "ok", "matching_skills": ["Python"], "missing_skills": []}
+
+
+class RecordingAnalyzer(StubAnalyzer):
+    """The keyword stub, keeping the prompts it was given and optionally tampering with its first answers"""
+
+    def __init__(self, tamper=None, times=1):
+        super().__init__()
+        self.prompts = []
+        self.tamper = tamper
+        self.times = times
+
+    def run(self, prompt):
+        self.prompts.append(prompt)
+        resp = super().run(prompt)
+        if self.tamper is not None and len(self.prompts) <= self.times:
+            answer = json.loads(resp.messages[0].content)
+            resp.messages[0].content = self.tamper(answer)
+        return resp
+
+
+def asked_roles(prompt):
+    return [match.group(1) for match in StubAnalyzer.ROLE_HEADER.finditer(prompt.partition("Resume Text:")[0])]
+
+
+def test_decode_keeps_only_valid_verdicts():
+    answer = {"roles": [fit("backend_engineer", True), {"role": "ai_ml_engineer", "feedback": "no verdict"},
+                        fit("backend_engineer")], "experience_level": "senior"}
+    fits, level, repaired = decode_role_fits(f"```json\n{json.dumps(answer)}\n```")
+    assert list(fits) == ["backend_engineer"] and fits["backend_engineer"]["selected"] is True
+    assert (level, repaired) == ("senior", True)
+    assert decode_role_fits('{"selected": true}') == ({}, "", False)
+    assert decode_role_fits(None) == ({}, "", False)
+
+
+def test_one_call_judges_every_role(roles_dir, resume_text):
+    analyzer = RecordingAnalyzer()
+    result = run_multi_role_analysis(resume_text, analyzer)
+    assert analyzer.calls == 1
+    assert sorted(asked_roles(analyzer.prompts[0])) == sorted(role_registry.roles()) == ROLES
+    assert [fit["role"] for fit in result["roles"]][0] == "backend_engineer"
+    assert result["fitting_roles"] == ["backend_engineer"]
+    assert result["roles"][0]["match"] == pytest.approx(7 / 8)
+    assert {fit["role"]: fit["requirements_version"] for fit in result["roles"]} == \
+        {role: role_registry.version(role) for role in ROLES}
+
+
+def test_only_missing_or_invalid_roles_are_asked_again(roles_dir, resume_text):
+    def drop_and_break(answer):
+        entries = {entry["role"]: entry for entry in answer["roles"]}
+        del entries["ai_ml_engineer"]
+        del entries["frontend_engineer"]["selected"]
+        return json.dumps({"roles": list(entries.values()), "experience_level": "mid"})
+
+    analyzer = RecordingAnalyzer(tamper=drop_and_break)
+    result = run_multi_role_analysis(resume_text, analyzer)
+    assert analyzer.calls == 2
+    assert asked_roles(analyzer.prompts[1]) == ["ai_ml_engineer", "frontend_engineer"]
+    assert {fit["role"] for fit in result["roles"]} == set(ROLES)
+    assert result["fitting_roles"] == ["backend_engineer"]
+
+
+def test_a_role_never_answered_is_an_error(roles_dir, resume_text):
+    def drop(answer):
+        return json.dumps({"roles": [e for e in answer["roles"] if e["role"] != "frontend_engineer"]})
+
+    analyzer = RecordingAnalyzer(tamper=drop, times=3)
+    with pytest.raises(ValueError, match="frontend_engineer"):
+        run_multi_role_analysis(resume_text, analyzer, max_retries=2)
+    assert analyzer.calls == 3
+
+
+def test_roles_rejected_by_the_prefilter_never_reach_the_prompt(roles_dir, resume_text):
+    analyzer, prefilter = RecordingAnalyzer(), Prefilter(threshold=0.05)
+    result = run_multi_role_analysis(resume_text, analyzer, prefilter=prefilter)
+    assert asked_roles(analyzer.prompts[0]) == ["ai_ml_engineer", "backend_engineer"]
+    assert "Frontend Engineer" not in analyzer.prompts[0]
+    frontend = next(fit for fit in result["roles"] if fit["role"] == "frontend_engineer")
+    assert frontend["selected"] is False and frontend["prefilter"]["passed"] is False
+    assert frontend["requirements_version"] == role_registry.version("frontend_engineer")
+    # With every role rejected, the model is not called at all
+    analyzer = RecordingAnalyzer()
+    result = run_multi_role_analysis("Barista. Latte art.", analyzer, prefilter=Prefilter(threshold=0.05))
+    assert analyzer.calls == 0 and result["fitting_roles"] == []
+
+
+def test_prompt_lists_each_role_once_with_its_requirements(roles_dir):
+    prompt = build_multi_role_prompt("resume", ["backend_engineer", "frontend_engineer"])
+    assert asked_roles(prompt) == ["backend_engineer", "frontend_engineer"]
+    assert role_registry.get("backend_engineer").requirements.splitlines()[0].strip() in prompt
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import time
+
+from service import Job, JobTable
+
+
+def test_jobs_are_visible_to_every_process_sharing_the_table(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    accepted_by, asked = JobTable(path), JobTable(path)
+    job = Job(id="abc", name="resume.pdf", role="backend_engineer")
+    accepted_by.save(job)
+    assert asked.get("abc").status == "queued"
+    job.status, job.result, job.finished_at = "done", {"selected": True}, time.time()
+    accepted_by.save(job)
+    assert asked.get("abc").to_dict() == job.to_dict()
+    assert asked.get("missing") is None
+
+
+def test_jobs_of_a_dead_process_are_failed_on_open(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    JobTable(path).save(Job(id="orphan", name="resume.pdf", role="backend_engineer", status="running",
+                            pid=int(exited.stdout)))
+    JobTable(path).save(Job(id="live", name="resume.pdf", role="backend_engineer", status="running"))
+    reopened = JobTable(path)
+    assert reopened.get("orphan").status == "failed"
+    assert reopened.get("live").status == "running"
+
+
+def test_only_the_latest_finished_jobs_are_kept(tmp_path):
+    jobs = JobTable(str(tmp_path / "jobs.sqlite3"), max_finished=2)
+    for i in range(4):
+        jobs.save(Job(id=str(i), name="resume.pdf", role="backend_engineer", status="done", finished_at=float(i)))
+    assert [jobs.get(str(i)) is not None for i in range(4)] == [False, False, True, True]
@@ -0,0 +1,153 @@
+import contextvars
+import threading
+
+import pytest
+from opentelemetry import trace
+
+from tracing import NOOP_SPAN, OtelExporter, Tracer
+
+
+def test_spans_nest_within_a_trace():
+    tracer = Tracer(enabled=True)
+    with tracer.span("candidate", resume="jane.pdf") as root:
+        with tracer.span("llm_call") as child:
+            child.set(input_tokens=120)
+        with pytest.raises(ValueError):
+            with tracer.span("json_decode"):
+                raise ValueError("bad JSON")
+    spans = {span.name: span for span in tracer.get_trace(root.trace_id)}
+    assert spans["candidate"].parent_id is None
+    assert spans["llm_call"].parent_id == spans["json_decode"].parent_id == root.span_id
+    assert spans["json_decode"].error == "ValueError: bad JSON"
+    assert spans["candidate"].duration >= spans["llm_call"].duration
+    # A later span with no parent starts its own trace; `trace_id` continues an earlier one
+    with tracer.span("candidate") as other:
+        pass
+    with tracer.span("email", trace_id=root.trace_id):
+        pass
+    assert other.trace_id != root.trace_id
+    assert len(tracer.get_trace(root.trace_id)) == 4
+    breakdown = tracer.breakdown(root.trace_id)
+    assert breakdown[0]["stage"] == "candidate"
+    assert {row["stage"]: row["errors"] for row in breakdown}["json_decode"] == 1
+
+
+def test_oldest_traces_are_evicted():
+    tracer = Tracer(enabled=True, max_traces=2)
+    ids = []
+    for i in range(3):
+        with tracer.span("candidate") as span:
+            ids.append(span.trace_id)
+    assert tracer.get_trace(ids[0]) == []
+    assert all(tracer.get_trace(trace_id) for trace_id in ids[1:])
+    # Metrics still count every span
+    assert 'recruitment_stage_duration_seconds_count{stage="candidate"} 3' in tracer.metrics.render_prometheus()
+
+
+def test_tracing_can_be_turned_on_for_one_session_only():
+    tracer = Tracer(enabled=False)
+    assert tracer.span("candidate") is NOOP_SPAN
+    recorded = {}
+
+    def other_session():
+        recorded["other"] = tracer.span("candidate") is not NOOP_SPAN
+
+    with tracer.session(True):
+        assert tracer.active
+        with tracer.span("candidate") as span:
+            # Work handed to a thread in a copy of the context is traced too, in the same trace
+            worker = threading.Thread(target=contextvars.copy_context().run,
+                                      args=(lambda: recorded.setdefault("child", tracer.span("pdf_parse").__enter__()),))
+            worker.start()
+            worker.join()
+        # Another session's thread keeps the process-wide setting
+        thread = threading.Thread(target=other_session)
+        thread.start()
+        thread.join()
+    assert recorded["other"] is False
+    assert recorded["child"].parent_id == span.span_id
+    assert not tracer.active and tracer.span("candidate") is NOOP_SPAN
+    enabled = Tracer(enabled=True)
+    with enabled.session(False):
+        assert enabled.span("candidate") is NOOP_SPAN
+    with enabled.session(None):
+        assert enabled.span("candidate") is not NOOP_SPAN
+
+
+def test_prometheus_export():
+    tracer = Tracer(enabled=True)
+    with tracer.span("llm_call", input_tokens=100, output_tokens=20):
+        pass
+    with tracer.span("llm_call", input_tokens=50):
+        pass
+    for hit in (True, False, False):
+        with tracer.span("cache_lookup", cache_hit=hit):
+            pass
+    with pytest.raises(RuntimeError):
+        with tracer.span("email_send"):
+            raise RuntimeError("451")
+    text = tracer.metrics.render_prometheus()
+    lines = text.splitlines()
+    assert "# TYPE recruitment_stage_duration_seconds histogram" in lines
+    assert 'recruitment_stage_duration_seconds_bucket{stage="llm_call",le="+Inf"} 2' in lines
+    assert 'recruitment_stage_duration_seconds_bucket{stage="llm_call",le="30.0"} 2' in lines
+    assert 'recruitment_tokens_total{stage="llm_call",kind="input"} 150' in lines
+    assert 'recruitment_tokens_total{stage="llm_call",kind="output"} 20' in lines
+    assert 'recruitment_cache_lookups_total{stage="cache_lookup",result="hit"} 1' in lines
+    assert 'recruitment_cache_lookups_total{stage="cache_lookup",result="miss"} 2' in lines
+    assert 'recruitment_stage_errors_total{stage="email_send"} 1' in lines
+    # Bucket counts are cumulative
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in lines
+               if line.startswith('recruitment_stage_duration_seconds_bucket{stage="cache_lookup"')]
+    assert buckets == sorted(buckets) and buckets[-1] == 3
+
+
+class RecordingOtelTracer:
+    """Stands in for an OpenTelemetry SDK tracer, keeping every span it was asked to start"""
+
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, context=None, start_time=None, attributes=None):
+        parent = trace.get_current_span(context) if context is not None else None
+        span = RecordedOtelSpan(name, parent, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+class RecordedOtelSpan(trace.NonRecordingSpan):
+    def __init__(self, name, parent, start_time, attributes):
+        super().__init__(trace.INVALID_SPAN_CONTEXT)
+        self.name, self.parent, self.start_time, self.attributes = name, parent, start_time, attributes
+        self.status = None
+        self.end_time = None
+
+    def set_status(self, status, description=None):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+def test_otel_export_keeps_timestamps_and_parents():
+    exporter = OtelExporter()
+    otel = exporter._tracer = RecordingOtelTracer()
+    tracer = Tracer(enabled=True)
+    tracer.exporters.append(exporter)
+    with tracer.span("candidate", resume="jane.pdf", analysis={"not": "exported"}) as root:
+        with tracer.span("llm_call", model="gpt-4.1-nano") as child:
+            pass
+        # Nothing is exported before the root span finishes
+        assert otel.spans == []
+        with pytest.raises(TimeoutError):
+            with tracer.span("pdf_parse"):
+                raise TimeoutError("slow")
+    exported = {span.name: span for span in otel.spans}
+    assert [span.name for span in otel.spans][0] == "candidate"
+    assert exported["candidate"].parent is None
+    assert exported["llm_call"].parent is exported["candidate"]
+    assert exported["candidate"].attributes == {"resume": "jane.pdf"}
+    assert exported["llm_call"].start_time == int(child.start * 1e9)
+    assert exported["candidate"].end_time == int(root.start * 1e9) + int(root.duration * 1e9)
+    assert exported["pdf_parse"].status.status_code == trace.StatusCode.ERROR
+    assert exported["llm_call"].status is None
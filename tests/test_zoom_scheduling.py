@@ -0,0 +1,87 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from benchmarks.fakes import FakeZoomServer
+from interview_scheduler import IST, Availability, InterviewScheduler, load_interviewers
+from zoom_tool import CustomZoomTool
+
+MONDAY = IST.localize(datetime(2030, 1, 7, 9))
+
+
+@pytest.fixture
+def zoom():
+    server = FakeZoomServer(latency=0.05).start()
+    yield server
+    server.stop()
+
+
+def zoom_tool(zoom):
+    # Each fake server has its own token URL, so it gets its own process-wide token provider
+    return CustomZoomTool(account_id="acct", client_id="client", client_secret="secret",
+                          token_url=zoom.token_url, api_base=zoom.api_base)
+
+
+def test_concurrent_callers_share_one_token_refresh(zoom):
+    tool = zoom_tool(zoom)
+    start = threading.Barrier(8)
+
+    def token(_):
+        start.wait()
+        return tool.get_access_token()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(token, range(8))) == {"fake-token"}
+    assert zoom.token_requests == tool.token_provider.fetches == 1
+    # Once it expires, the next caller refreshes it
+    tool.token_provider.token_expires_at = 0.0
+    tool.get_access_token()
+    assert zoom.token_requests == 2
+
+
+def test_scheduling_creates_one_meeting_per_candidate(zoom, tmp_path):
+    scheduler = InterviewScheduler(zoom_tool(zoom), path=str(tmp_path / "interviews.sqlite3"))
+    slots = scheduler.schedule(["a@example.com", "b@example.com"], "backend_engineer", earliest=MONDAY)
+    assert [slot.error for slot in slots] == [None, None]
+    # Meetings are created concurrently, so they may arrive in any order
+    by_invitee = {meeting["settings"]["meeting_invitees"][0]["email"]: meeting for meeting in zoom.meetings}
+    for slot in slots:
+        meeting = by_invitee[slot.candidate_email]
+        assert meeting["start_time"] == slot.start.strftime("%Y-%m-%dT%H:%M:%S")
+        assert (meeting["timezone"], meeting["duration"]) == ("Asia/Kolkata", 60)
+        assert slot.join_url.endswith(f"/j/{slot.meeting_id}")
+    assert zoom.token_requests <= 1
+    # Scheduling them again returns the booked meetings without creating new ones
+    again = scheduler.schedule(["b@example.com", "a@example.com"], "backend_engineer", earliest=MONDAY)
+    assert [slot.meeting_id for slot in again] == [slots[1].meeting_id, slots[0].meeting_id]
+    assert len(zoom.meetings) == 2
+
+
+def test_interviewers_are_booked_within_their_own_availability(tmp_path):
+    interviewers = {
+        "priya": Availability(day_start=10, day_end=13, weekdays=(0,),
+                              busy=((MONDAY.replace(hour=10), MONDAY.replace(hour=11, minute=30)),)),
+        "arjun": Availability(day_start=14, day_end=16, weekdays=(1,)),
+    }
+    scheduler = InterviewScheduler(interviewers=interviewers, path=str(tmp_path / "interviews.sqlite3"))
+    slots = scheduler.schedule([f"{i}@example.com" for i in range(4)], "backend_engineer", earliest=MONDAY)
+    booked = [(slot.interviewer, slot.start.strftime("%a %d %H:%M")) for slot in slots]
+    # Priya is busy until 11:30, so her first slot on the hourly grid is noon and her next one
+    # a week later; Arjun only works Tuesday afternoons
+    assert booked == [("priya", "Mon 07 12:00"), ("arjun", "Tue 08 14:00"), ("arjun", "Tue 08 15:00"),
+                      ("priya", "Mon 14 10:00")]
+
+def test_availability_file(tmp_path):
+    path = tmp_path / "interviewers.json"
+    path.write_text(json.dumps({"priya": {"hours": [10, 16], "busy": [["2030-01-07T13:00", "2030-01-07T14:30"]]},
+                                "arjun": {}}))
+    interviewers = load_interviewers(str(path))
+    assert interviewers["arjun"] == Availability()
+    assert interviewers["priya"].busy == ((IST.localize(datetime(2030, 1, 7, 13)),
+                                           IST.localize(datetime(2030, 1, 7, 14, 30))),)
+    with pytest.raises(ValueError):
+        InterviewScheduler(interviewers={"priya": Availability(day_start=9, day_end=10)}, duration_minutes=90,
+                           path=str(tmp_path / "interviews.sqlite3"))
@@ -0,0 +1,301 @@
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram buckets (seconds) for stage durations, from a cache lookup up to a slow LLM call
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Span ids only need to be unique within the process; a counter is far cheaper than uuid4
+_span_ids = itertools.count(1)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+# Set by Tracer.session: whether this context records spans regardless of Tracer.enabled
+_session_enabled: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("tracing_enabled", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    recording = True
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """What every span call returns while tracing is off: no clock reads, no allocation"""
+
+    recording = False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self._token: Optional[contextvars.Token] = None
+        self._started = 0.0
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        self._started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.span.duration = time.perf_counter() - self._started
+        if exc is not None and self.span.error is None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.tracer._finish(self.span)
+
+
+class Metrics:
+    """
+    Aggregates finished spans into Prometheus-style series: a duration histogram and an
+    error counter per stage, token counters from `input_tokens`/`output_tokens` attributes
+    and cache hit/miss counters from a `cache_hit` attribute.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, List[float]] = {}
+        self._sums: Dict[str, float] = defaultdict(float)
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._tokens: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._cache: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def observe(self, span: Span) -> None:
+        with self._lock:
+            counts = self._histograms.setdefault(span.name, [0] * (len(self.buckets) + 1))
+            counts[bisect_left(self.buckets, span.duration)] += 1
+            self._sums[span.name] += span.duration
+            self._counts[span.name] += 1
+            if span.error:
+                self._errors[span.name] += 1
+            for kind in ("input", "output"):
+                tokens = span.attributes.get(f"{kind}_tokens")
+                if tokens:
+                    self._tokens[(span.name, kind)] += int(tokens)
+            if "cache_hit" in span.attributes:
+                self._cache[(span.name, "hit" if span.attributes["cache_hit"] else "miss")] += 1
+
+    def render_prometheus(self, prefix: str = "recruitment") -> str:
+        """The Prometheus text exposition format, for a /metrics endpoint"""
+        lines = [f"# HELP {prefix}_stage_duration_seconds Time spent per pipeline stage",
+                 f"# TYPE {prefix}_stage_duration_seconds histogram"]
+        with self._lock:
+            for stage, counts in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{stage}"}} {self._sums[stage]:.6f}')
+                lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{stage}"}} {self._counts[stage]}')
+            lines += [f"# HELP {prefix}_stage_errors_total Stages that raised",
+                      f"# TYPE {prefix}_stage_errors_total counter"]
+            lines += [f'{prefix}_stage_errors_total{{stage="{stage}"}} {n}' for stage, n in sorted(self._errors.items())]
+            lines += [f"# HELP {prefix}_tokens_total LLM tokens per stage",
+                      f"# TYPE {prefix}_tokens_total counter"]
+            lines += [f'{prefix}_tokens_total{{stage="{stage}",kind="{kind}"}} {n}'
+                      for (stage, kind), n in sorted(self._tokens.items())]
+            lines += [f"# HELP {prefix}_cache_lookups_total Cache lookups per stage and result",
+                      f"# TYPE {prefix}_cache_lookups_total counter"]
+            lines += [f'{prefix}_cache_lookups_total{{stage="{stage}",result="{result}"}} {n}'
+                      for (stage, result), n in sorted(self._cache.items())]
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """
+    Records nested, timed spans for the pipeline stages and keeps the most recent traces
+    in memory. Spans started with no active span begin a new trace; `trace_id` continues
+    an existing one (e.g. one candidate across Streamlit reruns).
+
+    `enabled` is the process-wide setting (TRACING_ENABLED). `session()` overrides it for the
+    current context only, e.g. one Streamlit session's script run, without affecting other
+    sessions or the background workers. While disabled, `span()` returns a shared no-op object,
+    so instrumented code pays one flag check per stage.
+    """
+
+    def __init__(self, enabled: bool = False, max_traces: int = 200):
+        self.enabled = enabled
+        self.max_traces = max_traces
+        self.metrics = Metrics()
+        self.exporters: List[Callable[[Span], None]] = []
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether spans started in the current context are recorded"""
+        enabled = _session_enabled.get()
+        return self.enabled if enabled is None else enabled
+
+    @contextlib.contextmanager
+    def session(self, enabled: Optional[bool]) -> Iterator[None]:
+        """
+        Turns tracing on or off for code run in this context, and in the threads it hands work
+        to through contextvars.copy_context; None keeps the process-wide setting.
+        """
+        token = _session_enabled.set(enabled)
+        try:
+            yield
+        finally:
+            _session_enabled.reset(token)
+
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Any:
+        enabled = _session_enabled.get()
+        if not (self.enabled if enabled is None else enabled):
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if trace_id is None and parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            parent_id = None
+        span = Span(name=name, trace_id=trace_id or uuid.uuid4().hex, span_id=f"{next(_span_ids):016x}",
+                    parent_id=parent_id, start=time.time(), attributes=attributes)
+        return _ActiveSpan(self, span)
+
+    def current_trace_id(self) -> Optional[str]:
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+    def _finish(self, span: Span) -> None:
+        self.metrics.observe(span)
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                if len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+        for export in self.exporters:
+            try:
+                export(span)
+            except Exception:
+                # Observability must never break the pipeline
+                pass
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return sorted(self._traces.get(trace_id, []), key=lambda s: s.start)
+
+    def breakdown(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Total time, calls and errors per stage of one trace, slowest stage first"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.get_trace(trace_id):
+            row = totals.setdefault(span.name, {"stage": span.name, "calls": 0, "total_ms": 0.0, "errors": 0})
+            row["calls"] += 1
+            row["total_ms"] += span.duration * 1000
+            row["errors"] += bool(span.error)
+        return sorted(totals.values(), key=lambda row: row["total_ms"], reverse=True)
+
+
+class OtelExporter:
+    """
+    Re-emits finished traces through the OpenTelemetry API with their original timestamps
+    and parent links. Spans are buffered until their root finishes, because children end
+    before their parents. Nothing leaves the process unless an SDK tracer provider is set.
+    """
+
+    def __init__(self, service_name: str = "ai-recruitment-agent", max_pending_traces: int = 1000):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(service_name)
+        self.max_pending_traces = max_pending_traces
+        self._pending: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                if len(self._pending) > self.max_pending_traces:
+                    self._pending.popitem(last=False)
+                return
+            del self._pending[span.trace_id]
+        contexts: Dict[str, Any] = {}
+        for item in sorted(spans, key=lambda s: s.start):
+            start_ns = int(item.start * 1e9)
+            otel_span = self._tracer.start_span(
+                item.name, context=contexts.get(item.parent_id), start_time=start_ns,
+                attributes={k: v for k, v in item.attributes.items() if isinstance(v, (str, bool, int, float))}
+            )
+            if item.error:
+                otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, item.error))
+            contexts[item.span_id] = self._trace.set_span_in_context(otel_span)
+            otel_span.end(end_time=start_ns + int(item.duration * 1e9))
+
+
+def configure_otlp(endpoint: str, service_name: str = "ai-recruitment-agent") -> bool:
+    """Installs an OpenTelemetry SDK provider exporting over OTLP/HTTP; False if the SDK is missing"""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        return False
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+def configure_from_env(tracer: "Tracer") -> "Tracer":
+    """TRACING_ENABLED turns tracing on; OTEL_EXPORTER_OTLP_ENDPOINT also ships spans to a collector"""
+    tracer.enabled = os.getenv("TRACING_ENABLED", "").lower() in ("1", "true", "yes")
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    if tracer.enabled and endpoint and configure_otlp(endpoint.rstrip("/") + "/v1/traces"):
+        tracer.exporters.append(OtelExporter())
+    return tracer
+
+
+# The process-wide tracer every module instruments against
+tracer = configure_from_env(Tracer())
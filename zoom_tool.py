@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from phi.tools.zoom import ZoomTool
+from phi.utils.log import logger
+
+from tracing import tracer
+
+ZOOM_TOKEN_URL = "https://zoom.us/oauth/token"
+ZOOM_API_BASE = "https://api.zoom.us/v2"
+
+# Refresh this many seconds before Zoom says the token expires
+TOKEN_EXPIRY_MARGIN = 60
+
+
+class ZoomTokenProvider:
+    """
+    One OAuth token per Zoom account, shared by every tool instance and session in the process.
+
+    A refresh lock makes sure that when the token expires only one caller hits the OAuth
+    endpoint; everyone else waits for it and reuses the fresh token.
+    """
+
+    _providers: Dict[Tuple[str, str, str], "ZoomTokenProvider"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, account_id: str, client_id: str, client_secret: str,
+                 session: Optional[requests.Session] = None, token_url: str = ZOOM_TOKEN_URL):
+        self.account_id = account_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.session = session
+        self.token_url = token_url
+        self.access_token: Optional[str] = None
+        self.token_expires_at = 0.0
+        self.fetches = 0
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def for_credentials(cls, account_id: str, client_id: str, client_secret: str,
+                        session: Optional[requests.Session] = None,
+                        token_url: str = ZOOM_TOKEN_URL) -> "ZoomTokenProvider":
+        key = (account_id or "", client_id or "", token_url)
+        with cls._registry_lock:
+            provider = cls._providers.get(key)
+            if provider is None or provider.client_secret != client_secret:
+                provider = cls(account_id, client_id, client_secret, session, token_url)
+                cls._providers[key] = provider
+            return provider
+
+    def _valid(self) -> bool:
+        return bool(self.access_token) and time.time() < self.token_expires_at
+
+    def get_token(self) -> str:
+        # If token exists and hasn't expired, return it (avoids unnecessary API calls).
+        if self._valid():
+            return str(self.access_token)
+        with self._refresh_lock:
+            # Another caller may have refreshed the token while we waited for the lock
+            if self._valid():
+                return str(self.access_token)
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            data = {
+                "grant_type": "account_credentials",
+                "account_id": self.account_id
+            }
+            try:
+                with tracer.span("zoom_token_fetch"):
+                    resp = (self.session or requests).post(
+                        self.token_url,
+                        headers=headers,
+                        data=data,
+                        auth=(self.client_id, self.client_secret),
+                        timeout=30
+                    )
+                    resp.raise_for_status()
+                token_info = resp.json()
+                self.fetches += 1
+                self.access_token = token_info["access_token"]
+                self.token_expires_at = time.time() + token_info["expires_in"] - TOKEN_EXPIRY_MARGIN
+                return str(self.access_token)
+            # Logs and safely handles any network or response issues.
+            except requests.RequestException as e:
+                logger.error(f"Error Fetching access token: {e}")
+                return ""
+
+
+# Class for controlling zoom access
+class CustomZoomTool(ZoomTool):
+    def __init__(self, *, account_id: Optional[str] = None, client_id: Optional[str] = None,
+                 client_secret: Optional[str] = None, name: str = "zoom_tool",
+                 session: Optional[requests.Session] = None, token_url: str = ZOOM_TOKEN_URL,
+                 api_base: str = ZOOM_API_BASE):
+        super().__init__(account_id=account_id, client_id=client_id, client_secret=client_secret, name=name)
+        self.token_url = token_url
+        self.api_base = api_base.rstrip("/")
+        self.session = session
+        self.token_provider = ZoomTokenProvider.for_credentials(
+            account_id or "", client_id or "", client_secret or "", session=session, token_url=token_url
+        )
+
+    # This method returns a valid Zoom access token from the process-wide provider.
+    def get_access_token(self) -> str:
+        token = self.token_provider.get_token()
+        self._set_parent_token(token)
+        return token
+
+    def schedule_meeting(self, topic: str, start_time: str, duration: int, timezone: str = "UTC",
+                         invitee: Optional[str] = None) -> str:
+        """
+        Schedule a new Zoom meeting over the shared HTTP session, optionally inviting a candidate.
+
+        Args:
+            topic (str): The topic or title of the meeting.
+            start_time (str): The start time of the meeting in ISO 8601 format.
+            duration (int): The duration of the meeting in minutes.
+            timezone (str): The timezone for the meeting (e.g., "Asia/Kolkata").
+            invitee (str): Optional email address to add as a meeting invitee.
+
+        Returns:
+            A JSON-formatted string with the scheduled meeting details, or an error message.
+        """
+        token = self.get_access_token()
+        if not token:
+            logger.error("Unable to obtain access token.")
+            return json.dumps({"error": "Failed to obtain access token"})
+
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        settings = {
+            "host_video": True,
+            "participant_video": True,
+            "join_before_host": False,
+            "mute_upon_entry": False,
+            "watermark": True,
+            "audio": "voip",
+            "auto_recording": "none",
+        }
+        if invitee:
+            settings["meeting_invitees"] = [{"email": invitee}]
+        data = {
+            "topic": topic,
+            "type": 2,
+            "start_time": start_time,
+            "duration": duration,
+            "timezone": timezone,
+            "settings": settings,
+        }
+        try:
+            with tracer.span("zoom_meeting_create"):
+                response = (self.session or requests).post(f"{self.api_base}/users/me/meetings", json=data,
+                                                           headers=headers, timeout=30)
+                response.raise_for_status()
+            meeting_info = response.json()
+            logger.info(f"Meeting scheduled successfully. ID: {meeting_info['id']}")
+            return json.dumps({
+                "message": "Meeting scheduled successfully!",
+                "meeting_id": meeting_info["id"],
+                "topic": meeting_info["topic"],
+                "start_time": meeting_info["start_time"],
+                "duration": meeting_info["duration"],
+                "join_url": meeting_info["join_url"],
+            })
+        except requests.RequestException as e:
+            logger.error(f"Error scheduling meeting: {e}")
+            return json.dumps({"error": str(e)})
+
+    def _set_parent_token(self, token: str) -> None:
+        """
+        Helper Function to set the token in parent ZoomTool class
+        """
+        if token:
+            self._ZoomTool__access_token = token